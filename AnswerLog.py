@@ -0,0 +1,216 @@
+import math
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Learning statistics need numpy (pip install numpy); it is only imported when used
+# Column files of the log (<name>.bin) and their array typecodes; gap is the time
+# since the previous answer to the same word (-1 for the first), kept for the
+# forgetting curve so it needs no sort
+COLUMNS = {"word": "I", "time": "d", "correct": "B", "seconds": "f", "kind": "B", "gap": "f"}
+DAY = 24 * 3600
+# Forgetting curve bins: time since the previous answer to the same word
+CURVE_EDGES = (0, 60, 600, 3600, 6 * 3600, DAY, 3 * DAY, 7 * DAY, 14 * DAY, 30 * DAY, 90 * DAY, 365 * DAY)
+CURVE_LABELS = ("< 1 min", "1-10 min", "10-60 min", "1-6 h", "6-24 h", "1-3 days", "3-7 days",
+                "1-2 weeks", "2-4 weeks", "1-3 months", "3-12 months", "> 1 year")
+# Words answered fewer times are left out of the weakest-words ranking
+MIN_ANSWERS = 3
+# Curve bins with fewer answers are not used to fit the half-life
+MIN_BIN_ANSWERS = 20
+
+
+class AnswerLog:
+    """Append-only log of every quiz answer, stored column by column.
+
+    The log is a directory next to the deck (e.g. learned_words.answers/)
+    with one binary file per column: word id, time, correctness,
+    response time, question kind and the gap since the word was last
+    answered. words.txt maps word ids to words in order of first answer and
+    last.bin holds each word's last answer time. Appending writes a few bytes
+    to each file; stats() memory-maps the columns and computes everything
+    with NumPy, so millions of answers are summarized in a fraction of a second.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        words_file = self.path / "words.txt"
+        self.names: List[str] = words_file.read_text(encoding="utf-8").splitlines() if words_file.exists() else []
+        self.ids: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.rows = self._repair()
+        last_file = self.path / "last.bin"
+        self.last = array("d")
+        if last_file.exists():
+            self.last.frombytes(last_file.read_bytes()[:len(self.names) * self.last.itemsize])
+        self._words_file = open(words_file, "a", encoding="utf-8")
+        self._last_file = open(last_file, "r+b" if last_file.exists() else "w+b")
+        self._files = {name: open(self._column_path(name), "ab") for name in COLUMNS}
+
+    def _column_path(self, name: str) -> Path:
+        return self.path / f"{name}.bin"
+
+    def _repair(self) -> int:
+        """Cuts every column to the shortest one, dropping a row that was cut short by a crash."""
+        sizes = {}
+        for name in COLUMNS:
+            column = self._column_path(name)
+            sizes[name] = column.stat().st_size if column.exists() else 0
+        rows = min(sizes[name] // array(code).itemsize for name, code in COLUMNS.items())
+        for name, code in COLUMNS.items():
+            if sizes[name] != rows * array(code).itemsize:
+                with open(self._column_path(name), "r+b") as f:
+                    f.truncate(rows * array(code).itemsize)
+        return rows
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _word_id(self, word: str) -> int:
+        word_id = self.ids.get(word)
+        if word_id is None:
+            word_id = self.ids[word] = len(self.names)
+            self.names.append(word)
+            self._words_file.write(word + "\n")
+            self._words_file.flush()
+        return word_id
+
+    def append(self, word: str, correct: bool, seconds: float, kind: int, when: Optional[float] = None) -> None:
+        """Records one answer."""
+        word_id = self._word_id(word)
+        when = time.time() if when is None else when
+        while len(self.last) <= word_id:
+            self.last.append(0.0)
+        previous = self.last[word_id]
+        row = {
+            "word": word_id,
+            "time": when,
+            "correct": int(correct),
+            "seconds": seconds,
+            "kind": kind,
+            "gap": when - previous if previous > 0 else -1.0,
+        }
+        for name, code in COLUMNS.items():
+            f = self._files[name]
+            f.write(array(code, [row[name]]).tobytes())
+            f.flush()
+        self.rows += 1
+        self.last[word_id] = when
+        self._last_file.seek(word_id * self.last.itemsize)
+        self._last_file.write(array("d", [when]).tobytes())
+        self._last_file.flush()
+
+    def columns(self) -> Dict[str, Any]:
+        """The columns as read-only NumPy arrays (memory-mapped when not empty)."""
+        import numpy as np
+        columns = {}
+        for name, code in COLUMNS.items():
+            dtype = np.dtype(code)
+            if self.rows:
+                columns[name] = np.memmap(self._column_path(name), dtype=dtype, mode="r", shape=(self.rows,))
+            else:
+                columns[name] = np.empty(0, dtype=dtype)
+        return columns
+
+    def stats(self, limit: int = 20, now: Optional[float] = None) -> Dict[str, Any]:
+        return compute_stats(self.columns(), self.names, self.last, limit, now)
+
+    def close(self) -> None:
+        for f in self._files.values():
+            f.close()
+        self._words_file.close()
+        self._last_file.close()
+
+
+def compute_stats(columns: Dict[str, Any], names: List[str], last_seen, limit: int = 20,
+                  now: Optional[float] = None) -> Dict[str, Any]:
+    """Per-word accuracy, the weakest words, accuracy per question kind and the forgetting curve.
+
+    last_seen holds the last answer time per word id (0 if unknown).
+    """
+    import numpy as np
+    now = time.time() if now is None else now
+    # Plain arrays: indexing a memmap goes through its slower subclass machinery
+    words = columns["word"].astype(np.intp)
+    correct = columns["correct"].astype(np.float64)
+    seconds = np.asarray(columns["seconds"])
+    n_words = len(names)
+
+    answers = np.bincount(words, minlength=n_words)
+    right = np.bincount(words, weights=correct, minlength=n_words)
+    total_seconds = np.bincount(words, weights=seconds, minlength=n_words)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        accuracy = right / answers
+        mean_seconds = total_seconds / answers
+
+    # Smoothed accuracy keeps a word with one miss from outranking one with many
+    smoothed = (right + 1) / (answers + 2)
+    candidates = np.flatnonzero(answers >= MIN_ANSWERS)
+    if len(candidates) > limit:
+        candidates = candidates[np.argpartition(smoothed[candidates], limit)[:limit]]
+    # Slower answers break ties between equally weak words
+    candidates = candidates[np.lexsort((-mean_seconds[candidates], smoothed[candidates]))]
+    weakest = [{
+        "word": names[i],
+        "answers": int(answers[i]),
+        "accuracy": float(accuracy[i]),
+        "mean_seconds": float(mean_seconds[i]),
+        "days_since": (now - last_seen[i]) / DAY if i < len(last_seen) and last_seen[i] > 0 else None,
+    } for i in candidates]
+
+    kinds = np.asarray(columns["kind"])
+    kind_answers = np.bincount(kinds)
+    kind_right = np.bincount(kinds, weights=correct, minlength=len(kind_answers))
+    by_kind = {int(kind): {"answers": int(count), "accuracy": float(kind_right[kind] / count)}
+               for kind, count in enumerate(kind_answers) if count}
+
+    return {
+        "answers": int(len(words)),
+        "words": int(np.count_nonzero(answers)),
+        "accuracy": float(correct.mean()) if len(words) else 0.0,
+        "mean_seconds": float(seconds.mean()) if len(words) else 0.0,
+        "per_word": {"answers": answers, "accuracy": accuracy, "mean_seconds": mean_seconds},
+        "weakest": weakest,
+        "by_kind": by_kind,
+        "curve": forgetting_curve(np.asarray(columns["gap"]), np.asarray(columns["correct"])),
+    }
+
+
+def forgetting_curve(gaps, correct) -> Dict[str, Any]:
+    """Recall rate by time since the previous answer to the same word, and the fitted half-life."""
+    import numpy as np
+    repeat = gaps >= 0
+    gaps = gaps[repeat]
+    recalled = correct[repeat]
+    bins = np.searchsorted(np.array(CURVE_EDGES, dtype=gaps.dtype), gaps, side="right") - 1
+    size = len(CURVE_EDGES)
+    counts = np.bincount(bins, minlength=size)[:size]
+    hits = np.bincount(bins, weights=recalled, minlength=size)[:size]
+    gap_sums = np.bincount(bins, weights=gaps, minlength=size)[:size]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        recall = hits / counts
+        mean_gaps = gap_sums / counts
+    # Recall = 2 ** (-gap / half_life), fitted through the origin on -log2(recall)
+    usable = (counts >= MIN_BIN_ANSWERS) & (recall > 0) & (recall < 1)
+    half_life = None
+    if usable.any():
+        x = mean_gaps[usable]
+        y = -np.log2(recall[usable])
+        weights = counts[usable]
+        half_life = float((weights * x * x).sum() / (weights * x * y).sum())
+    return {
+        "bins": [{"label": label, "answers": int(counts[i]),
+                  "recall": None if not counts[i] else float(recall[i]),
+                  "mean_gap": None if not counts[i] else float(mean_gaps[i])}
+                 for i, label in enumerate(CURVE_LABELS)],
+        "half_life": half_life,
+    }
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None or not math.isfinite(seconds):
+        return "-"
+    for unit, size in (("days", DAY), ("h", 3600), ("min", 60)):
+        if seconds >= size:
+            return f"{seconds / size:.1f} {unit}"
+    return f"{seconds:.0f} s"
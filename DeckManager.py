@@ -0,0 +1,380 @@
+from collections import OrderedDict
+from AnswerLog import AnswerLog
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Set, Tuple
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from LazyDeck import LazyDeck
+from QuestionBank import QuestionBank
+from Scheduler import ReviewScheduler
+from SearchIndex import SearchIndex
+from WordGraph import WordGraph
+from WordStore import WordStore, open_store
+
+# Resident decks are evicted, least recently used first, once their estimated size passes this
+DEFAULT_BUDGET = 256 * 1024 * 1024
+# How many recently opened decks are offered in the deck chooser
+MAX_RECENT = 10
+# Rough per-item costs (bytes) behind Deck.estimated_bytes
+KEY_BYTES = 120
+DECODED_ENTRY_FACTOR = 5
+INDEXED_WORD_BYTES = 600
+GRAPH_NODE_BYTES = 150
+QUESTION_BYTES = 40
+DISTRACTOR_BYTES = 620
+
+
+class Deck:
+    """One open words file and everything derived from it.
+
+    The review scheduler, quiz question bank and answer log are opened on
+    first use and stay with the deck, so switching back to a resident deck
+    does not rebuild them. The search index and related-words graph are built
+    by a DeckIndexTask once the deck becomes current; until then both are
+    None and the words edited meanwhile are noted in edited.
+    """
+    __slots__ = ("path", "store", "words", "scheduler", "search_index", "word_graph", "question_bank",
+                 "answer_log", "indexing", "edited")
+
+    def __init__(self, path: Path, store: WordStore, words):
+        self.path = path
+        self.store = store
+        self.words = words
+        self.scheduler: Optional[ReviewScheduler] = None
+        self.search_index: Optional[SearchIndex] = None
+        self.word_graph: Optional[WordGraph] = None
+        self.question_bank: Optional[QuestionBank] = None
+        self.answer_log: Optional[AnswerLog] = None
+        self.indexing: Optional[DeckIndexTask] = None
+        self.edited: Optional[Set[str]] = None
+
+    @property
+    def name(self) -> str:
+        return self.path.stem
+
+    def get_scheduler(self) -> ReviewScheduler:
+        """Review progress is kept next to the words file, e.g. learned_words.review.sqlite."""
+        if self.scheduler is None:
+            review_file = self.path.with_name(self.path.stem + ".review.sqlite")
+            self.scheduler = ReviewScheduler(review_file, self.words)
+        return self.scheduler
+
+    def word_stored(self, word: str, info: Mapping[str, Any]) -> None:
+        """Keeps the search index, word graph and scheduler in step with an added or changed entry."""
+        if self.scheduler is not None:
+            self.scheduler.add(word)
+        if self.edited is not None:
+            self.edited.add(word)
+        if self.search_index is not None:
+            self.search_index.add(word, info)
+        if self.word_graph is not None:
+            self.word_graph.add(word, info)
+
+    def word_deleted(self, word: str) -> None:
+        if self.edited is not None:
+            self.edited.add(word)
+        if self.search_index is not None:
+            self.search_index.remove(word)
+        if self.word_graph is not None:
+            self.word_graph.remove(word)
+
+    def words_cleared(self) -> None:
+        if self.indexing is not None:
+            # Nothing left to index
+            self.indexing.cancel()
+            self.indexing = self.edited = None
+            self.search_index = SearchIndex(self.words)
+            self.word_graph = WordGraph(self.words)
+        elif self.search_index is not None:
+            self.search_index.clear()
+            self.word_graph.clear()
+
+    def indexed(self, search_index: SearchIndex, word_graph: WordGraph) -> None:
+        """Takes over indexes built in the background and catches up with the edits made meanwhile."""
+        edited = self.edited
+        self.indexing = self.edited = None
+        self.search_index = search_index
+        self.word_graph = word_graph
+        for word in edited:
+            info = self.words.get(word)
+            if info is None:
+                search_index.remove(word)
+                word_graph.remove(word)
+            else:
+                search_index.add(word, info)
+                word_graph.add(word, info)
+
+    def get_question_bank(self) -> QuestionBank:
+        """Compiled quiz questions are kept next to the words file, e.g. learned_words.questions.bin.
+
+        With numpy installed, so is the bank's index of hard distractors (learned_words.distractors.npz).
+        """
+        if self.question_bank is None:
+            self.question_bank = QuestionBank.open(
+                self.words, self.path.with_name(self.path.stem + ".questions.bin"))
+            try:
+                from DistractorIndex import DistractorIndex
+            except ImportError:
+                # No numpy: wrong answers are drawn at random
+                pass
+            else:
+                self.question_bank.index = DistractorIndex.open(
+                    self.path.with_name(self.path.stem + ".distractors.npz"))
+        return self.question_bank
+
+    def get_answer_log(self) -> AnswerLog:
+        """Quiz answers are logged next to the words file, e.g. learned_words.answers/."""
+        if self.answer_log is None:
+            self.answer_log = AnswerLog(self.path.with_name(self.path.stem + ".answers"))
+        return self.answer_log
+
+    def estimated_bytes(self) -> int:
+        """A rough estimate of the memory held by the deck, used for the resident budget."""
+        count = len(self.words)
+        try:
+            file_size = self.path.stat().st_size
+        except OSError:
+            file_size = 0
+        if isinstance(self.words, LazyDeck):
+            entry_size = file_size / count if count else 0
+            size = count * KEY_BYTES + self.words.loaded_count() * entry_size * DECODED_ENTRY_FACTOR
+        else:
+            size = count * KEY_BYTES + file_size * DECODED_ENTRY_FACTOR
+        if self.search_index is not None:
+            size += len(self.search_index) * INDEXED_WORD_BYTES
+        if self.word_graph is not None:
+            size += len(self.word_graph.names) * GRAPH_NODE_BYTES
+        if self.question_bank is not None:
+            size += len(self.question_bank) * QUESTION_BYTES
+            if self.question_bank.index is not None:
+                size += self.question_bank.index.size * DISTRACTOR_BYTES
+        return int(size)
+
+    def close(self) -> None:
+        if self.indexing is not None:
+            self.indexing.cancel()
+            self.indexing = None
+        if self.scheduler is not None:
+            self.scheduler.close()
+            self.scheduler = None
+        if self.answer_log is not None:
+            self.answer_log.close()
+            self.answer_log = None
+        if self.question_bank is not None:
+            try:
+                self.question_bank.save()
+            except OSError:
+                pass
+        self.store.close()
+
+
+def load_deck(path, progress=None) -> Deck:
+    path = Path(path)
+    store = open_store(path)
+    return Deck(path, store, store.load(progress))
+
+
+class DeckLoadSignals(QObject):
+    progress = Signal(str, int)  # path, percent
+    finished = Signal(str, object)  # path, Deck
+    failed = Signal(str, object)  # path, exception
+
+
+class DeckLoadTask(QRunnable):
+    """Opens a deck (and builds its index if needed) on a worker thread."""
+
+    def __init__(self, path: Path):
+        super().__init__()
+        self.path = path
+        self.signals = DeckLoadSignals()
+
+    def run(self):
+        key = str(self.path)
+        try:
+            deck = load_deck(self.path, lambda done, total: self.signals.progress.emit(
+                key, int(done * 100 / total) if total else 0))
+        except Exception as e:
+            self.signals.failed.emit(key, e)
+        else:
+            self.signals.finished.emit(key, deck)
+
+
+class DeckIndexSignals(QObject):
+    finished = Signal(object, object)  # DeckIndexTask, None or the exception that stopped it
+
+
+class DeckIndexTask(QRunnable):
+    """Builds a deck's search index and related-words graph on a worker thread.
+
+    Entries of a LazyDeck are decoded one at a time and not kept, so indexing
+    does not load the whole deck. The results are left in search_index and
+    word_graph for Deck.indexed() to take over on the GUI thread.
+    """
+
+    def __init__(self, deck: Deck):
+        super().__init__()
+        self.deck = deck
+        self.cancelled = False
+        self.search_index: Optional[SearchIndex] = None
+        self.word_graph: Optional[WordGraph] = None
+        self.signals = DeckIndexSignals()
+
+    def records(self) -> Iterator[Tuple[str, Mapping[str, Any]]]:
+        words = self.deck.words
+        peek = words.peek if isinstance(words, LazyDeck) else words.get
+        for word in list(words):
+            if self.cancelled:
+                return
+            info = peek(word)
+            if info is not None:
+                yield word, info
+
+    def run(self):
+        search_index = SearchIndex()
+        word_graph = WordGraph()
+
+        def records():
+            # One pass over the deck feeds both
+            for word, info in self.records():
+                word_graph.add(word, info)
+                yield word, info
+
+        try:
+            search_index.add_many(records())
+        except Exception as e:
+            self.signals.finished.emit(self, e)
+        else:
+            search_index.words = word_graph.words = self.deck.words
+            self.search_index = search_index
+            self.word_graph = word_graph
+            self.signals.finished.emit(self, None)
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class DeckManager(QObject):
+    """Keeps recently used decks open and switches between them.
+
+    Decks that are not resident are loaded in the background and become
+    current when ready, unless another deck was chosen in the meantime.
+    Resident decks are kept under a memory budget; the least recently used
+    one is closed first and the current deck is never closed. A deck's search
+    index and word graph are built in the background when it first becomes
+    current.
+    """
+    deckChanged = Signal(object)  # Deck
+    indexReady = Signal(object)  # Deck
+    indexFailed = Signal(object, object)  # Deck, exception
+    loadStarted = Signal(str)
+    loadProgress = Signal(str, int)
+    loadFailed = Signal(str, object)
+
+    def __init__(self, parent=None, budget: int = DEFAULT_BUDGET):
+        super().__init__(parent)
+        self.budget = budget
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.resident: "OrderedDict[str, Deck]" = OrderedDict()
+        self.current: Optional[Deck] = None
+        self.recent: List[Path] = []
+        self._tasks: Dict[str, DeckLoadTask] = {}
+        self._requested: Optional[str] = None
+
+    @staticmethod
+    def _key(path) -> str:
+        return str(Path(path).resolve())
+
+    def open_now(self, path) -> Deck:
+        """Opens a deck on the calling thread and makes it current (used at startup)."""
+        key = self._key(path)
+        deck = self.resident.get(key) or load_deck(key)
+        self._requested = key
+        self._activate(key, deck)
+        return deck
+
+    def reload(self) -> Deck:
+        """Reopens the current deck from disk."""
+        key = self._key(self.current.path)
+        self.resident.pop(key).close()
+        return self.open_now(key)
+
+    def switch_to(self, path) -> None:
+        """Makes a deck current: at once if resident, otherwise once it has loaded."""
+        key = self._key(path)
+        self._requested = key
+        if key in self.resident:
+            self._activate(key, self.resident[key])
+            return
+        if key in self._tasks:
+            return
+        task = DeckLoadTask(Path(key))
+        task.signals.progress.connect(self.loadProgress)
+        task.signals.finished.connect(self._on_loaded)
+        task.signals.failed.connect(self._on_failed)
+        self._tasks[key] = task
+        self.loadStarted.emit(key)
+        self.pool.start(task)
+
+    def is_loading(self) -> bool:
+        return bool(self._tasks)
+
+    def _on_loaded(self, key: str, deck: Deck):
+        self._tasks.pop(key, None)
+        if key == self._requested:
+            self._activate(key, deck)
+        else:
+            # Chosen and then abandoned while loading; keep it for a quick switch back
+            self.resident[key] = deck
+            self.resident.move_to_end(key, last=False)
+            self._evict()
+
+    def _on_failed(self, key: str, error: Exception):
+        self._tasks.pop(key, None)
+        self.loadFailed.emit(key, error)
+
+    def _activate(self, key: str, deck: Deck) -> None:
+        self.resident[key] = deck
+        self.resident.move_to_end(key)
+        self.current = deck
+        self.recent = [deck.path] + [path for path in self.recent if path != deck.path][:MAX_RECENT - 1]
+        self._evict()
+        self._index(deck)
+        self.deckChanged.emit(deck)
+
+    def _index(self, deck: Deck) -> None:
+        if deck.search_index is not None or deck.indexing is not None:
+            return
+        task = deck.indexing = DeckIndexTask(deck)
+        deck.edited = set()
+        task.signals.finished.connect(self._on_indexed)
+        QThreadPool.globalInstance().start(task)
+
+    def _on_indexed(self, task: DeckIndexTask, error):
+        deck = task.deck
+        if deck.indexing is not task:
+            # Cancelled: the deck was cleared or closed meanwhile
+            return
+        if error is not None:
+            deck.indexing = deck.edited = None
+            self.indexFailed.emit(deck, error)
+            return
+        deck.indexed(task.search_index, task.word_graph)
+        self.indexReady.emit(deck)
+
+    def _evict(self) -> None:
+        total = sum(deck.estimated_bytes() for deck in self.resident.values())
+        for key in list(self.resident):
+            if total <= self.budget:
+                break
+            deck = self.resident[key]
+            if deck is self.current:
+                continue
+            total -= deck.estimated_bytes()
+            del self.resident[key]
+            deck.close()
+
+    def close_all(self) -> None:
+        for deck in self.resident.values():
+            deck.close()
+        self.resident.clear()
+        self.current = None
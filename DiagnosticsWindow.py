@@ -0,0 +1,55 @@
+from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+                               QPushButton, QPlainTextEdit, QFileDialog)
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QFont
+from Metrics import metrics
+
+
+class DiagnosticsWindow(QMainWindow):
+    """Hidden window (Ctrl+Shift+D in the main window) showing the live performance metrics."""
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Diagnostics")
+        self.setMinimumSize(800, 500)
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        layout = QVBoxLayout(central_widget)
+
+        self.report = QPlainTextEdit()
+        self.report.setReadOnly(True)
+        self.report.setFont(QFont("Monospace"))
+        layout.addWidget(self.report)
+
+        button_layout = QHBoxLayout()
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.refresh)
+        button_layout.addWidget(refresh_button)
+        prometheus_button = QPushButton("Export Prometheus...")
+        prometheus_button.clicked.connect(lambda: self.export("metrics.prom", "Prometheus text (*.prom *.txt)"))
+        button_layout.addWidget(prometheus_button)
+        json_button = QPushButton("Export JSON...")
+        json_button.clicked.connect(lambda: self.export("metrics.json", "JSON (*.json)"))
+        button_layout.addWidget(json_button)
+        layout.addLayout(button_layout)
+
+        # Refresh while open, unless the user is scrolled into the stall samples
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(1000)
+        self.refresh()
+
+    def refresh(self):
+        scrollbar = self.report.verticalScrollBar()
+        if scrollbar.value() > 0:
+            return
+        self.report.setPlainText(metrics.report())
+
+    def export(self, default_name: str, file_filter: str):
+        path, _ = QFileDialog.getSaveFileName(self, "Export metrics", default_name, file_filter)
+        if path:
+            metrics.export(path)
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        super().closeEvent(event)
@@ -0,0 +1,496 @@
+import os
+import re
+import threading
+import zipfile
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Collection, Dict, List, Mapping, Optional
+
+import numpy as np
+
+from SearchIndex import tokenize
+from VocabExtractor import STOPWORDS
+
+# Hard distractors need numpy (pip install numpy); without it the quiz draws them at random
+# Width of the hashed TF-IDF vectors; float32, so 512 bytes per word
+DIMENSIONS = 128
+# Document frequencies are counted in this many hash buckets
+DF_BUCKETS = 1 << 20
+# Nearest neighbours kept per word
+TOP_K = 12
+# Rows compared per matrix product while building
+BLOCK_ROWS = 128
+# Bigger groups of one part of speech are compared with a random sample of this many words
+MAX_CANDIDATES = 65536
+# Columns per chunk in top_k()
+CHUNK_WIDTH = 64
+# Definitions per word that make up its vector
+MAX_DEFINITIONS = 3
+# A saved index missing more than this share of the deck is rebuilt rather than extended
+REBUILD_RATIO = 0.25
+PARTS_OF_SPEECH = ("noun", "verb", "adjective", "adverb")
+# Any other or unknown part of speech
+OTHER = len(PARTS_OF_SPEECH)
+ALIASES = {"adj": "adjective", "adv": "adverb", "proper noun": "noun"}
+# Older records have no parts of speech; the way a definition opens usually gives it away
+LEGACY_OPENINGS = (
+    ("to ", "verb"),
+    ("in a ", "adverb"), ("in an ", "adverb"),
+    ("of or relating to ", "adjective"), ("relating to ", "adjective"), ("having ", "adjective"),
+    ("characterized by ", "adjective"), ("full of ", "adjective"), ("showing ", "adjective"),
+    ("a ", "noun"), ("an ", "noun"), ("the ", "noun"), ("one who ", "noun"), ("someone ", "noun"),
+    ("something ", "noun"), ("any ", "noun"),
+)
+# Qualifiers such as "(obsolete outside law)" in front of a definition
+QUALIFIER_RE = re.compile(r"^(?:\([^)]*\)\s*)+")
+
+
+def part_of_speech(info: Mapping[str, Any]) -> int:
+    """Code of a word's main part of speech (an index into PARTS_OF_SPEECH, or OTHER).
+
+    That is the part of speech of its first definition; for records stored
+    without parts of speech, the most common guess over its first definitions.
+    """
+    parts = info.get("partOfSpeech") or []
+    if isinstance(parts, str):
+        parts = [parts]
+    part = parts[0].lower() if parts and parts[0] else ""
+    if not part:
+        guesses = Counter(guess for guess in map(guess_part_of_speech, (info.get("definition") or [])[:MAX_DEFINITIONS])
+                          if guess)
+        part = guesses.most_common(1)[0][0] if guesses else ""
+    part = ALIASES.get(part, part)
+    return PARTS_OF_SPEECH.index(part) if part in PARTS_OF_SPEECH else OTHER
+
+
+def guess_part_of_speech(definition: str) -> str:
+    text = QUALIFIER_RE.sub("", definition.strip()).lower()
+    return next((part for opening, part in LEGACY_OPENINGS if text.startswith(opening)), "")
+
+
+def feature_hashes(info: Mapping[str, Any]) -> List[int]:
+    """CRC32 hashes of the words and word pairs of a record's first definitions."""
+    terms: List[str] = []
+    for text in (info.get("definition") or [])[:MAX_DEFINITIONS]:
+        tokens = [token for token in tokenize(text) if len(token) > 1 and token not in STOPWORDS]
+        terms += tokens
+        terms += [first + " " + second for first, second in zip(tokens, tokens[1:])]
+    return [zlib.crc32(term.encode("utf-8")) for term in terms]
+
+
+def weigh(hashes, tf, df, docs: int):
+    """TF-IDF weights of distinct feature hashes with their term counts, signed and folded into columns.
+
+    Returns (columns, weights); the caller sums them per row and normalizes.
+    """
+    idf = np.log((docs + 1) / (df[hashes % DF_BUCKETS] + 1.0)) + 1.0
+    # Low bits pick the df bucket, the next ones the column, the top bit the sign
+    columns = ((hashes >> 20) % DIMENSIONS).astype(np.intp)
+    signs = np.where(hashes >> 31, -1.0, 1.0)
+    return columns, (signs * (1.0 + np.log(tf)) * idf).astype(np.float32)
+
+
+def top_k(sims, k: int):
+    """Column ids of the k largest similarities in each row, largest first.
+
+    The row length must be a multiple of CHUNK_WIDTH. Columns are split into
+    interleaved chunks (c, c + n/CHUNK_WIDTH, ...); the k largest values lie
+    in the k chunks with the largest maxima, so only those are partitioned.
+    """
+    rows, n = sims.shape
+    chunks = n // CHUNK_WIDTH
+    if chunks <= k:
+        candidates = np.broadcast_to(np.arange(n), sims.shape)
+    else:
+        maxima = sims.reshape(rows, CHUNK_WIDTH, chunks).max(axis=1)
+        best_chunks = np.argpartition(maxima, -k, axis=1)[:, -k:]
+        candidates = (best_chunks[:, :, None] + np.arange(CHUNK_WIDTH) * chunks).reshape(rows, -1)
+    values = np.take_along_axis(sims, candidates, axis=1)
+    best = np.argpartition(values, -k, axis=1)[:, -k:]
+    best_values = np.take_along_axis(values, best, axis=1)
+    order = np.argsort(-best_values, axis=1, kind="stable")
+    best = np.take_along_axis(best, order, axis=1)
+    return np.take_along_axis(candidates, best, axis=1), np.take_along_axis(best_values, order, axis=1)
+
+
+def normalize_rows(matrix) -> None:
+    norms = np.linalg.norm(matrix, axis=1)
+    norms[norms == 0] = 1.0
+    matrix /= norms[:, None]
+
+
+class DistractorIndex:
+    """Nearest neighbours of deck words by definition, for hard quiz distractors.
+
+    Each word's first definitions become a TF-IDF vector of hashed words and
+    word pairs, folded into DIMENSIONS columns and L2-normalized, so the dot
+    product of two rows is their cosine similarity. build() computes every
+    word's TOP_K most similar words of the same part of speech with blocked
+    matrix products (in very big decks, among a sample of MAX_CANDIDATES
+    words of that part of speech); looking up a word's distractors afterwards only reads
+    its row of neighbour ids. add() vectorizes a new word with the current
+    document frequencies, finds its neighbours with one matrix-vector
+    product and links it into the lists of the words it is now close to;
+    remove() only marks the row dead, and a list that ran out of live
+    neighbours is recomputed when asked. Each live word's feature hashes are
+    kept so that replacing or removing it takes its share back out of the
+    document frequencies. The index is saved as
+    <deck>.distractors.npz.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path is not None else None
+        self.built = False
+        self.dirty = False
+        self._lock = threading.RLock()
+        # Words added or removed while build() works on a snapshot of the deck
+        self._edited: Optional[set] = None
+        self._reset()
+
+    def _reset(self, capacity: int = 0) -> None:
+        self.names: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.vectors = np.zeros((capacity, DIMENSIONS), dtype=np.float32)
+        self.pos = np.full(capacity, OTHER, dtype=np.int8)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.top_ids = np.full((capacity, TOP_K), -1, dtype=np.int32)
+        self.top_sims = np.full((capacity, TOP_K), -np.inf, dtype=np.float32)
+        # Distinct feature hashes of each live word, counted in df
+        self.hashes: Dict[str, Any] = {}
+        self.df = np.zeros(DF_BUCKETS, dtype=np.int32)
+        self.docs = 0
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def size(self) -> int:
+        """Rows in use, dead ones included."""
+        return len(self.names)
+
+    @classmethod
+    def open(cls, path) -> "DistractorIndex":
+        """Loads the saved index for a deck, or starts an empty one."""
+        index = cls(path)
+        try:
+            index._load()
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            index = cls(path)
+        return index
+
+    def _load(self) -> None:
+        with np.load(self.path, allow_pickle=False) as data:
+            names = data["names"].tobytes().decode("utf-8").split("\n") if len(data["names"]) else []
+            arrays = {key: data[key] for key in ("vectors", "pos", "alive", "top_ids", "top_sims", "df")}
+            docs = int(data["docs"])
+            hash_counts, hash_values = data["hash_counts"], data["hash_values"]
+        if (arrays["vectors"].shape != (len(names), DIMENSIONS) or arrays["top_ids"].shape != (len(names), TOP_K)
+                or len(arrays["df"]) != DF_BUCKETS or len(hash_counts) != len(names)
+                or int(hash_counts.sum()) != len(hash_values)):
+            raise ValueError(f"{self.path} does not match this version of the index")
+        self.names = names
+        for key, value in arrays.items():
+            setattr(self, key, value)
+        self.docs = docs
+        self.rows = {name: row for row, name in enumerate(names) if self.alive[row]}
+        row_hashes = np.split(hash_values, np.cumsum(hash_counts)[:-1]) if len(names) else []
+        self.hashes = {name: row_hashes[row] for name, row in self.rows.items()}
+
+    def save(self) -> None:
+        """Writes the index next to the deck (temporary file, then rename)."""
+        if self.path is None:
+            return
+        with self._lock:
+            if len(self.rows) * 2 < self.size:
+                self._compact()
+            n = self.size
+            empty = np.zeros(0, dtype=np.uint32)
+            row_hashes = [self.hashes.get(name, empty) if self.alive[row] else empty
+                          for row, name in enumerate(self.names)]
+            hash_counts = np.fromiter(map(len, row_hashes), dtype=np.int64, count=n)
+            hash_values = np.concatenate(row_hashes) if row_hashes else empty
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "wb") as f:
+                np.savez(f, names=np.frombuffer("\n".join(self.names).encode("utf-8"), dtype=np.uint8),
+                         vectors=self.vectors[:n], pos=self.pos[:n], alive=self.alive[:n],
+                         top_ids=self.top_ids[:n], top_sims=self.top_sims[:n], df=self.df,
+                         docs=np.int64(self.docs), hash_counts=hash_counts, hash_values=hash_values)
+            os.replace(tmp, self.path)
+            self.dirty = False
+
+    def _compact(self) -> None:
+        """Drops dead rows and renumbers the neighbour lists."""
+        keep = np.flatnonzero(self.alive[:self.size])
+        renumber = np.full(self.size + 1, -1, dtype=np.int32)
+        renumber[keep] = np.arange(len(keep), dtype=np.int32)
+        # -1 (no neighbour) maps through the extra last entry to -1 again
+        top_ids = renumber[self.top_ids[keep]]
+        top_sims = np.where(top_ids >= 0, self.top_sims[keep], -np.inf).astype(np.float32)
+        self.names = [self.names[row] for row in keep]
+        self.rows = {name: row for row, name in enumerate(self.names)}
+        self.vectors = self.vectors[keep]
+        self.pos = self.pos[keep]
+        self.alive = self.alive[keep]
+        self.top_ids = top_ids
+        self.top_sims = top_sims
+
+    def _new_row(self, word: str) -> int:
+        row = self.size
+        if row == len(self.alive):
+            capacity = max(1024, row * 2)
+            grown = DistractorIndex.__new__(DistractorIndex)
+            DistractorIndex._reset(grown, capacity)
+            for key in ("vectors", "pos", "alive", "top_ids", "top_sims"):
+                getattr(grown, key)[:row] = getattr(self, key)[:row]
+                setattr(self, key, getattr(grown, key))
+        self.names.append(word)
+        self.rows[word] = row
+        return row
+
+    def add(self, word: str, info: Mapping[str, Any]) -> None:
+        """Indexes a word after it was added or changed."""
+        self.add_many({word: info})
+
+    def add_many(self, records: Mapping[str, Mapping[str, Any]]) -> None:
+        """Indexes a batch of words with one matrix product against the whole index."""
+        if not records:
+            return
+        with self._lock:
+            new_rows = []
+            for word, info in records.items():
+                if self._edited is not None:
+                    self._edited.add(word)
+                old = self.rows.get(word)
+                if old is not None:
+                    self.alive[old] = False
+                    self._forget(word)
+                hashes, tf = np.unique(np.asarray(feature_hashes(info), dtype=np.uint32), return_counts=True)
+                np.add.at(self.df, hashes % DF_BUCKETS, 1)
+                self.docs += 1
+                self.hashes[word] = hashes
+                row = self._new_row(word)
+                vector = np.zeros(DIMENSIONS, dtype=np.float32)
+                if len(hashes):
+                    columns, weights = weigh(hashes, tf, self.df, self.docs)
+                    np.add.at(vector, columns, weights)
+                    norm = np.linalg.norm(vector)
+                    if norm:
+                        vector /= norm
+                self.vectors[row] = vector
+                self.pos[row] = part_of_speech(info)
+                self.alive[row] = True
+                new_rows.append(row)
+            n = self.size
+            all_sims = self.vectors[new_rows] @ self.vectors[:n].T
+            # The new rows' own lists already take each other into account
+            linkable = np.ones(n, dtype=bool)
+            linkable[new_rows] = False
+            kth = self.top_sims[:n, -1].copy()
+            excluded = {}
+            for sims, row in zip(all_sims, new_rows):
+                code = int(self.pos[row])
+                if code not in excluded:
+                    excluded[code] = ~self.alive[:n] | (self.pos[:n] != code)
+                sims[excluded[code]] = -np.inf
+                sims[row] = -np.inf
+                self._set_neighbours(row, sims)
+                # Words that now count this one among their nearest
+                for other in np.flatnonzero((sims > kth) & linkable).tolist():
+                    ids, scores = self.top_ids[other], self.top_sims[other]
+                    at = int(np.searchsorted(-scores, -sims[other]))
+                    ids[at + 1:] = ids[at:-1].copy()
+                    scores[at + 1:] = scores[at:-1].copy()
+                    ids[at] = row
+                    scores[at] = sims[other]
+                    kth[other] = scores[-1]
+            self.dirty = True
+
+    def remove(self, word: str) -> None:
+        with self._lock:
+            if self._edited is not None:
+                self._edited.add(word)
+            row = self.rows.pop(word, None)
+            if row is not None:
+                self.alive[row] = False
+                self._forget(word)
+                self.dirty = True
+
+    def _forget(self, word: str) -> None:
+        """Takes a word's previous definitions back out of the document frequencies."""
+        hashes = self.hashes.pop(word, None)
+        if hashes is not None:
+            np.subtract.at(self.df, hashes % DF_BUCKETS, 1)
+            self.docs -= 1
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._edited is not None:
+                self._edited.clear()
+            self._reset()
+            self.dirty = True
+
+    def _similarities(self, row: int):
+        """Cosine similarity of a row to every row, -inf for itself, dead rows and other parts of speech."""
+        n = self.size
+        sims = self.vectors[:n] @ self.vectors[row]
+        sims[~self.alive[:n] | (self.pos[:n] != self.pos[row])] = -np.inf
+        sims[row] = -np.inf
+        return sims
+
+    def _set_neighbours(self, row: int, sims) -> None:
+        # Partitioning only the finite entries; runs of -inf make argpartition crawl
+        candidates = np.flatnonzero(sims > -np.inf)
+        k = min(TOP_K, len(candidates))
+        self.top_ids[row] = -1
+        self.top_sims[row] = -np.inf
+        if k:
+            values = sims[candidates]
+            best = np.argpartition(values, -k)[-k:]
+            best = best[np.argsort(-values[best], kind="stable")]
+            self.top_ids[row, :k] = candidates[best]
+            self.top_sims[row, :k] = values[best]
+
+    def neighbours(self, word: str, n: int = TOP_K, exclude: Collection[str] = ()) -> List[str]:
+        """Up to n words most similar to word with the same part of speech, nearest first."""
+        with self._lock:
+            row = self.rows.get(word)
+            if row is None:
+                return []
+            found = self._live_neighbours(row, n, exclude)
+            if len(found) < n and any(other >= 0 and not self.alive[other] for other in self.top_ids[row].tolist()):
+                # Some neighbours were removed since the list was made
+                self._set_neighbours(row, self._similarities(row))
+                found = self._live_neighbours(row, n, exclude)
+            return found
+
+    def _live_neighbours(self, row: int, n: int, exclude: Collection[str]) -> List[str]:
+        found: List[str] = []
+        for other in self.top_ids[row].tolist():
+            if other < 0 or not self.alive[other]:
+                continue
+            name = self.names[other]
+            if name not in exclude:
+                found.append(name)
+                if len(found) == n:
+                    break
+        return found
+
+    def build(self, words: Mapping[str, Mapping[str, Any]], cancelled: Callable[[], bool] = lambda: False,
+              progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """Indexes every deck word missing from the index; returns how many were missing.
+
+        A few missing words are added in batches; otherwise the whole deck is
+        indexed from scratch on the calling thread, without holding up
+        lookups, add() or remove() on others.
+        """
+        missing = [word for word in list(words) if word not in self.rows]
+        if not missing:
+            self.built = True
+            return 0
+        if self.rows and len(missing) <= REBUILD_RATIO * len(self.rows):
+            for start in range(0, len(missing), BLOCK_ROWS):
+                if cancelled():
+                    return len(missing)
+                batch = {}
+                for word in missing[start:start + BLOCK_ROWS]:
+                    info = words.get(word)
+                    if info is not None:
+                        batch[word] = info
+                self.add_many(batch)
+        elif not self._rebuild(words, cancelled, progress):
+            return len(missing)
+        self.built = True
+        return len(missing)
+
+    def _rebuild(self, words, cancelled, progress) -> bool:
+        with self._lock:
+            self._edited = set()
+        try:
+            names: List[str] = []
+            pos: List[int] = []
+            row_hashes: List[List[int]] = []
+            for word in list(words):
+                info = words.get(word)
+                if info is None:
+                    continue
+                names.append(word)
+                pos.append(part_of_speech(info))
+                row_hashes.append(feature_hashes(info))
+            if cancelled():
+                return False
+            index = DistractorIndex.__new__(DistractorIndex)
+            DistractorIndex._reset(index, len(names))
+            index.names = names
+            index.rows = {name: row for row, name in enumerate(names)}
+            index.pos[:] = pos
+            index.alive[:] = True
+            index.docs = len(names)
+
+            # Unique (row, hash) pairs give both document frequencies and term counts
+            lengths = np.fromiter(map(len, row_hashes), dtype=np.intp, count=len(row_hashes))
+            rows = np.repeat(np.arange(len(names), dtype=np.uint64), lengths)
+            hashes = np.fromiter((h for row in row_hashes for h in row), dtype=np.uint64, count=int(lengths.sum()))
+            pairs, tf = np.unique((rows << np.uint64(32)) | hashes, return_counts=True)
+            rows = (pairs >> np.uint64(32)).astype(np.intp)
+            hashes = (pairs & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+            index.df = np.bincount(hashes % DF_BUCKETS, minlength=DF_BUCKETS).astype(np.int32)
+            # pairs are sorted, so each row's distinct hashes are one run
+            row_ends = np.cumsum(np.bincount(rows, minlength=len(names)))[:-1]
+            index.hashes = dict(zip(names, np.split(hashes, row_ends)))
+            columns, weights = weigh(hashes, tf, index.df, index.docs)
+            index.vectors = np.bincount(rows * DIMENSIONS + columns, weights=weights,
+                                        minlength=len(names) * DIMENSIONS).astype(np.float32).reshape(-1, DIMENSIONS)
+            normalize_rows(index.vectors)
+
+            done = 0
+            sampler = np.random.default_rng(0)
+            for code in range(OTHER + 1):
+                group = np.flatnonzero(index.pos == code)
+                k = min(TOP_K, len(group) - 1)
+                if k < 1:
+                    done += len(group)
+                    continue
+                candidates = group
+                if len(group) > MAX_CANDIDATES:
+                    candidates = np.sort(sampler.choice(group, MAX_CANDIDATES, replace=False))
+                # Zero rows pad the candidates to whole chunks; their similarities are masked
+                padded = -(-len(candidates) // CHUNK_WIDTH) * CHUNK_WIDTH
+                matrix = np.zeros((padded, DIMENSIONS), dtype=np.float32)
+                matrix[:len(candidates)] = index.vectors[candidates]
+                for start in range(0, len(group), BLOCK_ROWS):
+                    if cancelled():
+                        return False
+                    block = group[start:start + BLOCK_ROWS]
+                    sims = index.vectors[block] @ matrix.T
+                    sims[:, len(candidates):] = -np.inf
+                    # A word is not its own neighbour
+                    at = np.minimum(np.searchsorted(candidates, block), len(candidates) - 1)
+                    own = np.flatnonzero(candidates[at] == block)
+                    sims[own, at[own]] = -np.inf
+                    best, best_sims = top_k(sims, k)
+                    index.top_ids[block, :k] = candidates[best]
+                    index.top_sims[block, :k] = best_sims
+                    done += len(block)
+                    if progress is not None:
+                        progress(done, len(names))
+
+            with self._lock:
+                edited = self._edited
+                self._edited = None
+                for key in ("names", "rows", "vectors", "pos", "alive", "top_ids", "top_sims", "hashes", "df", "docs"):
+                    setattr(self, key, getattr(index, key))
+                self.dirty = True
+                # Catch up with the deck edits made while building
+                batch = {}
+                for word in edited:
+                    info = words.get(word)
+                    if info is not None:
+                        batch[word] = info
+                    else:
+                        self.remove(word)
+                self.add_many(batch)
+            return True
+        finally:
+            with self._lock:
+                self._edited = None
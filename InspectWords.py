@@ -2,8 +2,10 @@ import random
 from typing import List, Dict
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, 
                               QHBoxLayout , QPushButton, 
-                              QListWidget, QListWidgetItem)
-from PySide6.QtCore import Qt
+                              QListView, QLabel, QComboBox, QLineEdit)
+from PySide6.QtCore import Qt, QModelIndex
+from Metrics import metrics
+from WordListModel import WordListModel, SORT_ADDED, SORT_ALPHABETICAL, SORT_ACCURACY
 class InspectWordsWindow(QMainWindow):
     def __init__(self, learned_words: Dict, mainWind):
         super().__init__()
@@ -18,10 +20,27 @@ class InspectWordsWindow(QMainWindow):
         self.setCentralWidget(self.central_widget)
         self.central_widget.setLayout(main_layout)
 
-        # Create the list of learned words
-        self.word_list = QListWidget()
-        self.word_list.setSelectionMode(QListWidget.SingleSelection)
-        self.word_list.itemDoubleClicked.connect(self.delete_word)
+        # Create the sort order dropdown
+        sort_layout = QHBoxLayout()
+        sort_layout.addWidget(QLabel("Sort by:"))
+        self.sort_dropdown = QComboBox()
+        self.sort_dropdown.addItems([SORT_ADDED, SORT_ALPHABETICAL, SORT_ACCURACY])
+        self.sort_dropdown.currentTextChanged.connect(self.sort_words)
+        sort_layout.addWidget(self.sort_dropdown)
+        # Filter as you type through the main window's search index
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Search...")
+        self.filter_input.textChanged.connect(self.filter_words)
+        sort_layout.addWidget(self.filter_input)
+        main_layout.addLayout(sort_layout)
+
+        # Create the list of learned words; only the visible rows are rendered
+        self.word_model = WordListModel(self.learned_words, self.word_accuracy, self)
+        self.word_list = QListView()
+        self.word_list.setUniformItemSizes(True)
+        self.word_list.setSelectionMode(QListView.SingleSelection)
+        self.word_list.setModel(self.word_model)
+        self.word_list.doubleClicked.connect(self.delete_word)
         main_layout.addWidget(self.word_list)
 
         # Create the buttons
@@ -31,23 +50,48 @@ class InspectWordsWindow(QMainWindow):
         button_layout.addWidget(clear_button)
         main_layout.addLayout(button_layout)
 
-        # Populate the word list
-        self.populate_word_list()
+        # Keep the list in sync with words added from the other windows
+        self.mainWind.wordAdded.connect(self.word_model.insert_word)
+        self.mainWind.wordRemoved.connect(self.word_model.remove_word)
+        self.mainWind.deckChanged.connect(self.on_deck_changed)
+        self.mainWind.indexReady.connect(lambda: self.filter_words(self.filter_input.text()))
+
+    def on_deck_changed(self, deck):
+        self.learned_words = deck.words
+        self.filter_input.blockSignals(True)
+        self.filter_input.clear()
+        self.filter_input.blockSignals(False)
+        self.word_model.set_words(deck.words)
 
+    @metrics.timed("word_list_populate_seconds")
     def populate_word_list(self):
-        self.word_list.clear()
-        for word, info in self.learned_words.items():
-            item = QListWidgetItem(f"{word} - {info["definition"]}")
-            item.setData(Qt.UserRole, word)
-            self.word_list.addItem(item)
-
-    def delete_word(self, item: QListWidgetItem):
-        word = item.data(Qt.UserRole)
-        del self.learned_words[word]
-        self.word_list.takeItem(self.word_list.row(item))
-        self.mainWind.save_words()
+        self.word_model.sort_by(self.word_model.sort_key)
+
+    def word_accuracy(self, word: str):
+        return self.mainWind.get_scheduler().accuracy(word)
+
+    def sort_words(self, sort_key: str):
+        self.word_model.sort_by(sort_key)
+
+    def filter_words(self, query: str):
+        if not query.strip():
+            self.word_model.set_filter(None)
+            return
+        search_index = self.mainWind.search_index
+        if search_index is None:
+            # Filtered again once the index is built
+            self.word_model.set_filter([])
+            self.statusBar().showMessage("Indexing learned words...")
+            return
+        self.statusBar().clearMessage()
+        results = search_index.search(query, limit=500)
+        self.word_model.set_filter([word for word, _ in results])
+
+    def delete_word(self, index: QModelIndex):
+        word = self.word_model.word_at(index.row())
+        # MainWind emits wordRemoved, which removes the row from the model
+        self.mainWind.delete_word(word)
 
     def clear_all_words(self):
-        self.learned_words.clear()
-        self.populate_word_list()
-        self.mainWind.save_words()
\ No newline at end of file
+        self.mainWind.clear_words()
+        self.word_model.clear()
@@ -0,0 +1,277 @@
+import json
+import mmap
+import os
+import threading
+from array import array
+from collections.abc import MutableMapping
+from json.decoder import scanstring
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+INDEX_VERSION = 1
+_MISSING = object()
+# How many entries scan_deck parses between progress reports
+PROGRESS_EVERY = 5000
+_WHITESPACE = " \t\n\r"
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".idx")
+
+
+def scan_deck(text: str, progress: Optional[Callable[[int, int], None]] = None) -> Tuple[List[str], array]:
+    """Finds the key and value span of every top-level entry of a JSON deck.
+
+    Values are decoded one at a time and thrown away, so only the offsets are kept.
+    Returned offsets are character positions as [start0, end0, start1, end1, ...].
+    progress, if given, is called with (characters scanned, total characters).
+    """
+    decoder = json.JSONDecoder()
+    keys: List[str] = []
+    offsets = array("Q")
+
+    def skip(pos):
+        while pos < len(text) and text[pos] in _WHITESPACE:
+            pos += 1
+        return pos
+
+    pos = skip(0)
+    if text[pos:pos + 1] != "{":
+        raise ValueError("Deck is not a JSON object")
+    pos = skip(pos + 1)
+    if text[pos:pos + 1] == "}":
+        return keys, offsets
+    while True:
+        if text[pos:pos + 1] != '"':
+            raise ValueError(f"Expected a key at position {pos}")
+        key, pos = scanstring(text, pos + 1)
+        pos = skip(pos)
+        if text[pos:pos + 1] != ":":
+            raise ValueError(f"Expected ':' at position {pos}")
+        start = skip(pos + 1)
+        _, end = decoder.raw_decode(text, start)
+        keys.append(key)
+        offsets.extend((start, end))
+        if progress is not None and len(keys) % PROGRESS_EVERY == 0:
+            progress(end, len(text))
+        pos = skip(end)
+        if text[pos:pos + 1] == "}":
+            return keys, offsets
+        if text[pos:pos + 1] != ",":
+            raise ValueError(f"Expected ',' at position {pos}")
+        pos = skip(pos + 1)
+
+
+def _to_byte_offsets(text: str, offsets: array) -> array:
+    """Converts character offsets to byte offsets in the UTF-8 encoding of text."""
+    byte_offsets = array("Q")
+    last_char = last_byte = 0
+    for offset in offsets:
+        last_byte += len(text[last_char:offset].encode("utf-8"))
+        last_char = offset
+        byte_offsets.append(last_byte)
+    return byte_offsets
+
+
+class LazyDeck(MutableMapping):
+    """A JSON word deck that is read entry by entry on first access.
+
+    A sidecar index (<deck>.idx) holds the key list and the byte span of every
+    entry, so opening a deck only reads the keys. Entries are decoded from a
+    memory map when first looked up; untouched entries are copied byte for byte
+    when the deck is written back.
+
+    dump() may run on a background thread while the deck is edited: it writes
+    a snapshot, and entries changed meanwhile stay pending for the next dump.
+    """
+
+    def __init__(self, path, progress: Optional[Callable[[int, int], None]] = None):
+        self.path = Path(path)
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        # key -> position in _offsets, or -1 for entries that only live in _loaded
+        self._slots: Dict[str, int] = {}
+        self._offsets = array("Q")
+        self._loaded: Dict[str, Any] = {}
+        # Keys changed since the snapshot of a dump in progress
+        self._touched: Set[str] = set()
+        # Guards the maps above against a concurrent dump; _dump_lock serializes dumps
+        self._lock = threading.Lock()
+        self._dump_lock = threading.Lock()
+        self._open(progress)
+
+    def _open(self, progress=None) -> None:
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        index = self._read_index()
+        if index is None:
+            try:
+                index = self._build_index(progress)
+            except ValueError:
+                # Not a JSON deck (e.g. a plain word list); treat it as empty like before
+                self._close_map()
+                return
+        keys, self._offsets = index
+        self._slots = {key: i for i, key in enumerate(keys)}
+
+    def _close_map(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._map = self._file = None
+
+    def _stamp(self) -> Dict[str, int]:
+        stat = self.path.stat()
+        return {"version": INDEX_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _read_index(self) -> Optional[Tuple[List[str], array]]:
+        try:
+            with open(index_path(self.path), "rb") as f:
+                header = json.loads(f.readline())
+                if header != self._stamp():
+                    return None
+                keys = json.loads(f.readline())
+                offsets = array("Q")
+                offsets.frombytes(f.read())
+        except (OSError, ValueError):
+            return None
+        if len(offsets) != 2 * len(keys):
+            return None
+        return keys, offsets
+
+    def _build_index(self, progress=None) -> Tuple[List[str], array]:
+        text = self._map[:].decode("utf-8")
+        keys, offsets = scan_deck(text, progress)
+        if len(text) != len(self._map):
+            offsets = _to_byte_offsets(text, offsets)
+        self._write_index(keys, offsets)
+        return keys, offsets
+
+    def _write_index(self, keys: List[str], offsets: array) -> None:
+        try:
+            with open(index_path(self.path), "wb") as f:
+                f.write(json.dumps(self._stamp()).encode() + b"\n")
+                f.write(json.dumps(keys).encode() + b"\n")
+                offsets.tofile(f)
+        except OSError:
+            pass
+
+    def _raw(self, slot: int) -> bytes:
+        return self._map[self._offsets[2 * slot]:self._offsets[2 * slot + 1]]
+
+    def __getitem__(self, word: str) -> Any:
+        value = self._loaded.get(word, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            value = self._loaded.get(word, _MISSING)
+            if value is _MISSING:
+                value = self._loaded[word] = json.loads(self._raw(self._slots[word]))
+        return value
+
+    def peek(self, word: str, default: Any = None) -> Any:
+        """Like get(), but an entry not loaded yet is decoded without being kept."""
+        with self._lock:
+            value = self._loaded.get(word, _MISSING)
+            if value is not _MISSING:
+                return value
+            slot = self._slots.get(word)
+            if slot is None:
+                return default
+            raw = self._raw(slot)
+        return json.loads(raw)
+
+    def __setitem__(self, word: str, info: Any) -> None:
+        with self._lock:
+            self._loaded[word] = info
+            if word not in self._slots:
+                self._slots[word] = -1
+            self._touched.add(word)
+
+    def __delitem__(self, word: str) -> None:
+        with self._lock:
+            del self._slots[word]
+            self._loaded.pop(word, None)
+            self._touched.add(word)
+
+    def __contains__(self, word) -> bool:
+        return word in self._slots
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._slots)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._touched.update(self._slots)
+            self._slots.clear()
+            self._loaded.clear()
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def loaded_count(self) -> int:
+        """Number of entries decoded so far."""
+        return len(self._loaded)
+
+    def dump(self, path=None) -> None:
+        """Writes the deck as JSON, copying untouched entries straight from the old file.
+
+        The file is written to a temporary name, synced and renamed over the
+        old one, so a crash leaves either the old or the new deck on disk.
+        """
+        path = Path(path) if path is not None else self.path
+        with self._dump_lock:
+            self._dump(path)
+
+    def _dump(self, path: Path) -> None:
+        with self._lock:
+            items = list(self._slots.items())
+            loaded = dict(self._loaded)
+            self._touched = set()
+        tmp = path.with_name(path.name + ".tmp")
+        keys: List[str] = []
+        offsets = array("Q")
+        # The map is only swapped by a dump, so it can be read here without _lock
+        with open(tmp, "wb") as f:
+            f.write(b"{")
+            pos = 1
+            for i, (word, slot) in enumerate(items):
+                if word in loaded or slot < 0:
+                    raw = json.dumps(loaded[word]).encode()
+                else:
+                    raw = self._raw(slot)
+                head = (b", " if i else b"") + json.dumps(word).encode() + b": "
+                f.write(head)
+                f.write(raw)
+                pos += len(head)
+                keys.append(word)
+                offsets.extend((pos, pos + len(raw)))
+                pos += len(raw)
+            f.write(b"}")
+            f.flush()
+            os.fsync(f.fileno())
+        if path != self.path:
+            os.replace(tmp, path)
+            return
+        written = {key: i for i, key in enumerate(keys)}
+        with self._lock:
+            # The old file must be unmapped before it can be replaced (required on Windows)
+            self._close_map()
+            os.replace(tmp, path)
+            self._file = open(self.path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._offsets = offsets
+            # Entries changed while writing keep their decoded value for the next dump
+            touched = self._touched
+            self._slots = {key: -1 if key in touched else written.get(key, -1) for key in self._slots}
+            self._loaded = {key: self._loaded[key] for key in touched if key in self._loaded}
+            self._touched = set()
+        self._write_index(keys, offsets)
+
+    def close(self) -> None:
+        self._close_map()
@@ -0,0 +1,290 @@
+import bisect
+import json
+import os
+import random
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MAGIC = b"LXB2"
+DEFAULT_PATH = "lexicon.bin"
+# Word lists the default lexicon is built from when lexicon.bin does not exist yet
+DEFAULT_SOURCES = ("SAT.json", "words.txt", "offline_dictionary.sqlite")
+# Below this many words most ordinary words are missing, so lookups are not spell-checked
+SPELLING_MIN_WORDS = 20000
+# Shorter words are only corrected by one edit; two edits turn "run" into "raw"
+SHORT_WORD_LENGTH = 6
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, returning limit + 1 as soon as it must exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        best = i
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            current.append(cost)
+            if cost < best:
+                best = cost
+        if best > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def pattern_bits(pattern: str) -> Dict[str, int]:
+    """Precomputes the per-character bit masks used by bit_distance."""
+    bits: Dict[str, int] = {}
+    for i, char in enumerate(pattern):
+        bits[char] = bits.get(char, 0) | (1 << i)
+    return bits
+
+
+def bit_distance(bits: Dict[str, int], length: int, text: str) -> int:
+    """Exact Levenshtein distance between a pattern and text (Myers' bit-vector algorithm).
+
+    Runs in one pass over text with a handful of integer operations per
+    character, which is much faster than the dynamic programming table in Python.
+    """
+    if length == 0:
+        return len(text)
+    mask = (1 << length) - 1
+    high = 1 << (length - 1)
+    pv, mv, score = mask, 0, length
+    for char in text:
+        eq = bits.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mask
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+    return score
+
+
+def read_words(path) -> Iterable[str]:
+    """Yields the words of a JSON deck (its keys), an offline dictionary pack or a plain text list."""
+    path = Path(path)
+    if path.suffix.lower() == ".json":
+        yield from json.loads(path.read_text(encoding="utf-8"))
+        return
+    if path.suffix.lower() == ".sqlite":
+        from OfflineDictionary import OfflineDictionary
+        pack = OfflineDictionary(path)
+        yield from pack.words()
+        pack.close()
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            word = line.strip()
+            if word and not word.startswith("#"):
+                yield word
+
+
+class Lexicon:
+    """Local word list for completions and spelling suggestions.
+
+    Completions come from a sorted word array, which answers prefix queries by
+    binary search like a flattened trie. Suggestions come from a BK-tree kept
+    in flat integer arrays (first child, next sibling and edge distance per
+    node). Both are saved to one binary file that loads without rebuilding,
+    together with the size and modification time of the word lists it was
+    built from, so load_default() notices when they change.
+    """
+
+    def __init__(self, words: Optional[Iterable[str]] = None):
+        self.words: List[str] = []
+        self.sorted_words: List[str] = []
+        self.first_child = array("i")
+        self.next_sibling = array("i")
+        self.edge = array("B")
+        self.stamp: List[list] = []
+        if words:
+            # Bulk load: sort once instead of inserting into the sorted list word by word
+            unique = dict.fromkeys(word.strip().lower() for word in words)
+            unique.pop("", None)
+            self.sorted_words = sorted(unique)
+            for word in unique:
+                self._insert(word)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        i = bisect.bisect_left(self.sorted_words, word)
+        return i < len(self.sorted_words) and self.sorted_words[i] == word
+
+    def add(self, word: str) -> None:
+        word = word.strip().lower()
+        if not word or word in self:
+            return
+        bisect.insort(self.sorted_words, word)
+        self._insert(word)
+
+    def _insert(self, word: str) -> None:
+        """Adds a word to the BK-tree (but not to sorted_words)."""
+        node = len(self.words)
+        self.words.append(word)
+        self.first_child.append(-1)
+        self.next_sibling.append(-1)
+        self.edge.append(0)
+        if node == 0:
+            return
+        # Walk down from the root to the child slot at this word's distance
+        bits = pattern_bits(word)
+        current = 0
+        while True:
+            distance = min(bit_distance(bits, len(word), self.words[current]), 255)
+            child = self.first_child[current]
+            while child != -1 and self.edge[child] != distance:
+                child = self.next_sibling[child]
+            if child == -1:
+                self.edge[node] = distance
+                self.next_sibling[node] = self.first_child[current]
+                self.first_child[current] = node
+                return
+            current = child
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        start = bisect.bisect_left(self.sorted_words, prefix)
+        results = []
+        for word in self.sorted_words[start:start + limit]:
+            if not word.startswith(prefix):
+                break
+            results.append(word)
+        return results
+
+    def suggest(self, word: str, max_distance: int = 2, limit: int = 5) -> List[str]:
+        """Returns known words within max_distance edits, closest first."""
+        word = word.strip().lower()
+        if not self.words:
+            return []
+        # Small radii prune far more of the tree, so widen the search only when needed
+        for distance in range(1, max_distance + 1):
+            found = self._search(word, distance)
+            if found:
+                return found[:limit]
+        return []
+
+    def _search(self, word: str, max_distance: int) -> List[str]:
+        found: List[Tuple[int, str]] = []
+        bits = pattern_bits(word)
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            # The exact distance is needed to prune children correctly
+            distance = bit_distance(bits, len(word), self.words[node])
+            if distance <= max_distance:
+                found.append((distance, self.words[node]))
+            # A child can only match if its edge is within max_distance of our distance
+            low = distance - max_distance
+            high = distance + max_distance
+            child = self.first_child[node]
+            while child != -1:
+                if low <= self.edge[child] <= high:
+                    stack.append(child)
+                child = self.next_sibling[child]
+        found.sort()
+        return [candidate for _, candidate in found]
+
+    def save(self, path=DEFAULT_PATH) -> None:
+        """Writes the lexicon (temporary file, then rename)."""
+        blob = "\n".join(self.words).encode("utf-8")
+        stamp = json.dumps(self.stamp).encode("utf-8")
+        tmp = Path(str(path) + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<III", len(self.words), len(blob), len(stamp)))
+            f.write(blob)
+            f.write(stamp)
+            self.first_child.tofile(f)
+            self.next_sibling.tofile(f)
+            self.edge.tofile(f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH) -> "Lexicon":
+        with open(path, "rb") as f:
+            if f.read(4) != MAGIC:
+                raise ValueError(f"{path} is not a lexicon file")
+            count, blob_size, stamp_size = struct.unpack("<III", f.read(12))
+            lexicon = cls()
+            lexicon.words = f.read(blob_size).decode("utf-8").split("\n") if count else []
+            lexicon.stamp = json.loads(f.read(stamp_size).decode("utf-8"))
+            lexicon.first_child.fromfile(f, count)
+            lexicon.next_sibling.fromfile(f, count)
+            lexicon.edge.fromfile(f, count)
+        lexicon.sorted_words = sorted(lexicon.words)
+        return lexicon
+
+    @classmethod
+    def build(cls, sources: Iterable) -> "Lexicon":
+        """Builds a lexicon from JSON decks and text word lists."""
+        sources = list(sources)
+        words = set()
+        for source in sources:
+            if Path(source).exists():
+                words.update(word.strip().lower() for word in read_words(source))
+        words.discard("")
+        # Inserting in random order keeps the BK-tree shallow
+        ordered = sorted(words)
+        random.Random(0).shuffle(ordered)
+        lexicon = cls(ordered)
+        lexicon.stamp = sources_stamp(sources)
+        return lexicon
+
+
+def sources_stamp(sources: Iterable) -> List[list]:
+    """[name, size, mtime_ns] of each source that exists."""
+    stamp = []
+    for source in sources:
+        try:
+            stat = Path(source).stat()
+        except OSError:
+            continue
+        stamp.append([str(source), stat.st_size, stat.st_mtime_ns])
+    return stamp
+
+
+def load_default(path=DEFAULT_PATH, sources=DEFAULT_SOURCES) -> Lexicon:
+    """Loads the prebuilt lexicon, (re)building and saving it from sources if missing or out of date.
+
+    A lexicon built from other lists (see the command line below) is kept
+    as long as none of the default sources appeared or changed since.
+    """
+    try:
+        lexicon = Lexicon.load(path)
+    except (OSError, ValueError, struct.error):
+        lexicon = None
+    if lexicon is not None and all(entry in lexicon.stamp for entry in sources_stamp(sources)):
+        return lexicon
+    lexicon = Lexicon.build(sources)
+    try:
+        lexicon.save(path)
+    except OSError:
+        pass
+    return lexicon
+
+
+if __name__ == "__main__":
+    # python Lexicon.py lexicon.bin SAT.json words.txt ...
+    if len(sys.argv) < 3:
+        print("usage: python Lexicon.py OUTPUT SOURCE [SOURCE ...]")
+        sys.exit(1)
+    built = Lexicon.build(sys.argv[2:])
+    built.save(sys.argv[1])
+    print(f"Wrote {len(built)} words to {sys.argv[1]}")
@@ -0,0 +1,193 @@
+import threading
+from typing import Dict, Set
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+
+class LookupSignals(QObject):
+    finished = Signal(str, object)  # word, Word
+    failed = Signal(str, object)  # word, exception
+
+
+class LookupTask(QRunnable):
+    """Runs a single Word lookup on a QThreadPool worker thread."""
+
+    def __init__(self, word: str):
+        super().__init__()
+        self.word = word
+        self.signals = LookupSignals()
+
+    def run(self):
+        # Imported here so requests is not loaded before the window is shown
+        from WordRepository import default_repository
+        try:
+            result = default_repository().get(self.word)
+        except Exception as e:
+            self.signals.failed.emit(self.word, e)
+        else:
+            self.signals.finished.emit(self.word, result)
+
+
+class LookupService(QObject):
+    """Schedules dictionary lookups off the GUI thread and reports results through signals.
+
+    Requests for a word that is already being looked up are merged into the
+    running task. Each request belongs to a channel (e.g. the main input box or
+    the PDF reader); a new request on a channel cancels the older ones on it.
+    """
+    wordReady = Signal(str, object)
+    wordFailed = Signal(str, object)
+    busyChanged = Signal(int)
+
+    def __init__(self, parent=None, max_threads: int = 4):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._tasks: Dict[str, LookupTask] = {}
+        # word -> channels still interested in the result
+        self._wanted: Dict[str, Set[str]] = {}
+
+    def lookup(self, word: str, channel: str = "main") -> None:
+        self.cancel_channel(channel)
+        self._wanted.setdefault(word, set()).add(channel)
+        if word in self._tasks:
+            return
+        task = LookupTask(word)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        self._tasks[word] = task
+        self.pool.start(task)
+        self.busyChanged.emit(len(self._tasks))
+
+    def cancel_channel(self, channel: str) -> None:
+        """Drops a channel's pending requests; queued tasks nobody wants are not run."""
+        for word in list(self._wanted):
+            channels = self._wanted[word]
+            channels.discard(channel)
+            if not channels:
+                del self._wanted[word]
+                task = self._tasks.get(word)
+                if task is not None and self.pool.tryTake(task):
+                    del self._tasks[word]
+        self.busyChanged.emit(len(self._tasks))
+
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    def _finish(self, word: str) -> bool:
+        """Forgets the task for a word and says whether anyone still wants the result."""
+        self._tasks.pop(word, None)
+        wanted = self._wanted.pop(word, None)
+        self.busyChanged.emit(len(self._tasks))
+        return bool(wanted)
+
+    def _on_finished(self, word: str, result):
+        if self._finish(word):
+            self.wordReady.emit(word, result)
+
+    def _on_failed(self, word: str, error: Exception):
+        if self._finish(word):
+            self.wordFailed.emit(word, error)
+
+
+class ImportSignals(QObject):
+    batchReady = Signal(object, object, int)  # {word: record}, words not found, offset (-1 on errors)
+    finished = Signal(object)  # None when done, "cancelled", or the exception that stopped it
+
+
+class ImportTask(QRunnable):
+    """Resolves a WordImporter's batches on a worker thread; the GUI thread stores them.
+
+    Once the GUI thread has stored a batch (and set stored), the worker
+    flushes the deck's store and checkpoints the import, so the deck is not
+    rewritten on the GUI thread.
+    """
+
+    def __init__(self, importer, known, store):
+        super().__init__()
+        self.importer = importer
+        self.known = known
+        self.store = store
+        self.cancelled = False
+        self.stored = threading.Event()
+        self.signals = ImportSignals()
+
+    def run(self):
+        from WordRepository import default_repository
+        try:
+            repository = default_repository()
+            for words, offset in self.importer.batches(self.known):
+                if self.cancelled:
+                    self.signals.finished.emit("cancelled")
+                    return
+                records, not_found, errors = self.importer.resolve(words, repository)
+                # Words resolved before an error are kept; the checkpoint stays before the batch
+                self.stored.clear()
+                self.signals.batchReady.emit(records, not_found, -1 if errors else offset)
+                if errors:
+                    raise errors[0]
+                self.stored.wait()
+                if self.cancelled:
+                    self.signals.finished.emit("cancelled")
+                    return
+                # The checkpoint must not get ahead of what is on disk
+                self.store.flush()
+                self.importer.commit(offset, len(records), not_found)
+        except Exception as e:
+            self.signals.finished.emit(e)
+        else:
+            self.signals.finished.emit(None)
+
+    def cancel(self):
+        self.cancelled = True
+        self.stored.set()
+
+
+class BankSignals(QObject):
+    finished = Signal(object, object)  # QuestionBank, None or the exception that stopped it
+
+
+class QuestionBankTask(QRunnable):
+    """Compiles a deck's missing quiz questions (on a process pool for big decks) and saves the bank.
+
+    The bank's distractor index, if any, is built and saved along with it.
+    """
+
+    def __init__(self, bank):
+        super().__init__()
+        self.bank = bank
+        self.cancelled = False
+        self.signals = BankSignals()
+
+    def run(self):
+        try:
+            self.bank.build(cancelled=lambda: self.cancelled)
+            if not self.cancelled:
+                self.bank.save()
+        except Exception as e:
+            self.signals.finished.emit(self.bank, e)
+        else:
+            self.signals.finished.emit(self.bank, None)
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class LexiconSignals(QObject):
+    finished = Signal(object, object)  # Lexicon or None, None or the exception that stopped it
+
+
+class LexiconTask(QRunnable):
+    """Loads lexicon.bin on a worker thread, rebuilding it first if its word lists changed."""
+
+    def __init__(self):
+        super().__init__()
+        self.signals = LexiconSignals()
+
+    def run(self):
+        import Lexicon
+        try:
+            lexicon = Lexicon.load_default()
+        except Exception as e:
+            self.signals.finished.emit(None, e)
+        else:
+            self.signals.finished.emit(lexicon, None)
@@ -1,33 +1,77 @@
+import importlib
 import sys
-import json
 import random
+import threading
 from pathlib import Path
-from typing import List, Dict
+from typing import TYPE_CHECKING, List, Dict
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, 
                               QHBoxLayout, QLineEdit, QPushButton, QTextEdit, 
-                              QLabel, QMessageBox)
-from PySide6.QtCore import Qt
-import pyttsx3 
-from Word import Word
+                              QLabel, QMessageBox, QProgressBar, QListWidget, QListWidgetItem, QListView,
+                              QCompleter, QComboBox, QFileDialog)
+from PySide6.QtCore import Qt, Signal, QStringListModel, QThreadPool
+from PySide6.QtGui import QKeySequence, QShortcut
+from LookupWorker import LookupService, ImportTask, LexiconTask
+from DeckManager import Deck, DeckManager
+from WordImporter import WordImporter
+from Scheduler import ReviewScheduler
+import Lexicon
 from QuizWindow import QuizWindow
 from InspectWords import InspectWordsWindow
-from PDFReadWindow import PDFReadWindow
 from settingsWindow import SettingsWindow
+from StartupProfile import profile
+from Metrics import metrics, StallDetector
+# Word (requests), Speech (pyttsx3) and PDFReadWindow (QtWebEngine) are imported on first use
+if TYPE_CHECKING:
+    from Word import Word
 class MainWind(QMainWindow):
+    # Emitted once a requested word is available in learned_words
+    wordReady = Signal(str)
+    # Emitted when a new word is stored in learned_words
+    wordAdded = Signal(str)
+    # Emitted when a word is deleted from learned_words
+    wordRemoved = Signal(str)
+    # Emitted after another deck became current; open windows switch to it
+    deckChanged = Signal(object)
+    # Emitted once the current deck's search index and word graph have been built in the background
+    indexReady = Signal()
+
     def __init__(self,app,wordsFile):
         super().__init__()
         self.setWindowTitle("Learn Words")
         self.setMinimumSize(800, 600)
-        self.speechEngine = pyttsx3.init()
-        self.speechEngine.setProperty('rate', 130)
+        self.speech = None
         self.app = app
-        # Initialize words storage
-        self.words_file = Path(wordsFile)
-        self.learned_words: Dict = self.load_words()
+        # Initialize words storage; other decks are loaded in the background when chosen
+        self.decks = DeckManager(self)
+        with metrics.time("deck_load_seconds"):
+            self.deck: Deck = self.decks.open_now(wordsFile)
+        self.decks.deckChanged.connect(self.on_deck_changed)
+        self.decks.loadStarted.connect(self.on_deck_load_started)
+        self.decks.loadProgress.connect(self.on_deck_load_progress)
+        self.decks.loadFailed.connect(self.on_deck_load_failed)
+        self.decks.indexReady.connect(self.on_deck_indexed)
+        self.decks.indexFailed.connect(self.on_deck_index_failed)
         self.currentWord = ""
-        self.destroyed.connect(self.save_words)
+        self.lexicon = None
+        self.lexicon_task = None
+        # Edits are written behind in the background; write out the rest on exit
+        self.app.aboutToQuit.connect(self.decks.close_all)
+        # Dictionary lookups run in the background
+        self.lookups = LookupService(self)
+        self.lookups.wordReady.connect(self.on_lookup_ready)
+        self.lookups.wordFailed.connect(self.on_lookup_failed)
+        self.lookups.busyChanged.connect(self.on_lookups_busy)
+        # Word list imports run one at a time and stop when the deck changes
+        self.import_pool = QThreadPool(self)
+        self.import_pool.setMaxThreadCount(1)
+        self.import_task = None
+        self.importer = None
+        self.pending_import = None
         # Set up the UI
         self.setup_ui()
+        # Record event-loop stalls; the diagnostics window is opened with Ctrl+Shift+D
+        self.stall_detector = StallDetector(self)
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, self.open_diagnostics)
     def setup_ui(self):
         # Create central widget and layout
         central_widget = QWidget()
@@ -39,6 +83,9 @@ class MainWind(QMainWindow):
         self.word_input = QLineEdit()
         self.word_input.setPlaceholderText("Enter a word...")
         self.word_input.returnPressed.connect(self.add_word)
+        # Typing a new word makes any lookup still running for the old one stale
+        self.word_input.textEdited.connect(lambda: self.lookups.cancel_channel("main"))
+        self.attach_completer(self.word_input)
         add_button = QPushButton("Add Word")
         add_button.clicked.connect(self.add_word)
         input_layout.addWidget(self.word_input)
@@ -59,6 +106,10 @@ class MainWind(QMainWindow):
         inspect_button.clicked.connect(self.inspectWords)
         input_layout2.addWidget(inspect_button)
 
+        stats_button = QPushButton("Statistics")
+        stats_button.clicked.connect(self.open_stats)
+        input_layout2.addWidget(stats_button)
+
         pdf_button = QPushButton("Open PDF")
         pdf_button.clicked.connect(self.PDFreader)
         input_layout2.addWidget(pdf_button)
@@ -66,6 +117,14 @@ class MainWind(QMainWindow):
         settings_button = QPushButton("Settings")
         settings_button.clicked.connect(self.openSettings)
         input_layout2.addWidget(settings_button)
+
+        # Recently used decks; resident ones switch instantly
+        input_layout2.addWidget(QLabel("Deck:"))
+        self.deck_combo = QComboBox()
+        self.deck_combo.setMinimumWidth(140)
+        self.deck_combo.activated.connect(self.choose_deck)
+        input_layout2.addWidget(self.deck_combo)
+        self.update_deck_combo()
         
         # Create display area
         self.display_area = QTextEdit()
@@ -73,133 +132,385 @@ class MainWind(QMainWindow):
         
         # Create word count label
         self.word_count_label = QLabel("Words learned: 0")
+
+        # Create search area; results are filtered as you type
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search learned words (use quotes for phrases)...")
+        self.search_input.textChanged.connect(self.search_words)
+        self.search_results = QListWidget()
+        self.search_results.setMaximumHeight(120)
+        self.search_results.itemClicked.connect(self.show_search_result)
+        self.search_results.hide()
+
+        # Synonyms and antonyms of the shown word that are not learned yet; click to look one up
+        self.related_label = QLabel("Related words you haven't learned yet:")
+        self.related_list = QListWidget()
+        self.related_list.setFlow(QListView.Flow.LeftToRight)
+        self.related_list.setWrapping(True)
+        self.related_list.setMaximumHeight(60)
+        self.related_list.itemClicked.connect(
+            lambda item: self.request_word(item.data(Qt.UserRole), "main"))
         
         # Add everything to main layout
         layout.addLayout(input_layout)
         layout.addLayout(input_layout2)
+        layout.addWidget(self.search_input)
+        layout.addWidget(self.search_results)
         layout.addWidget(QLabel("Word Information:"))
         layout.addWidget(self.display_area)
+        layout.addWidget(self.related_label)
+        layout.addWidget(self.related_list)
         layout.addWidget(self.word_count_label)
         
+        # Show a busy indicator while lookups are running
+        self.lookup_progress = QProgressBar()
+        self.lookup_progress.setRange(0, 0)
+        self.lookup_progress.setMaximumWidth(150)
+        self.lookup_progress.hide()
+        self.statusBar().addPermanentWidget(self.lookup_progress)
+        self.deck_progress = QProgressBar()
+        self.deck_progress.setRange(0, 100)
+        self.deck_progress.setMaximumWidth(150)
+        self.deck_progress.hide()
+        self.statusBar().addPermanentWidget(self.deck_progress)
+        self.import_progress = QProgressBar()
+        self.import_progress.setRange(0, 100)
+        self.import_progress.setMaximumWidth(150)
+        self.import_progress.setFormat("Import %p%")
+        self.import_progress.hide()
+        self.statusBar().addPermanentWidget(self.import_progress)
+        
         # Update word count
         self.update_word_count()
+    # The current deck's words, storage and indexes
+    learned_words = property(lambda self: self.deck.words)
+    words_file = property(lambda self: self.deck.path)
+    store = property(lambda self: self.deck.store)
+    scheduler = property(lambda self: self.deck.scheduler)
+    search_index = property(lambda self: self.deck.search_index)
+    word_graph = property(lambda self: self.deck.word_graph)
+    question_bank = property(lambda self: self.deck.question_bank)
+
     def load_words(self) -> Dict:
-        """Load previously learned words from JSON file."""
-        if self.words_file.exists():
-            try:
-                return json.loads(self.words_file.read_text())
-            except json.JSONDecodeError:
-                return {}
-        return {}
+        """Reload the current deck from its words file."""
+        with metrics.time("deck_load_seconds"):
+            return self.decks.reload().words
+
+    def switch_deck(self, path):
+        """Make another words file the current deck, loading it in the background if needed."""
+        self.decks.switch_to(path)
+
+    def choose_deck(self, index: int):
+        path = self.deck_combo.itemData(index)
+        if path is None:
+            path, _ = QFileDialog.getOpenFileName(self, "Open Deck", "", "Word Files (*.json *.db *.txt)")
+            self.update_deck_combo()
+            if not path:
+                return
+        self.switch_deck(path)
+
+    def update_deck_combo(self):
+        self.deck_combo.blockSignals(True)
+        self.deck_combo.clear()
+        for path in self.decks.recent:
+            self.deck_combo.addItem(path.stem, str(path))
+            self.deck_combo.setItemData(self.deck_combo.count() - 1, str(path), Qt.ToolTipRole)
+        self.deck_combo.addItem("Open deck...", None)
+        self.deck_combo.setCurrentIndex(0)
+        self.deck_combo.blockSignals(False)
+
+    def on_deck_changed(self, deck: Deck):
+        # An import belongs to the deck it started in; it resumes from its checkpoint later
+        self.cancel_import()
+        self.deck = deck
+        self.currentWord = ""
+        self.display_area.clear()
+        self.related_list.clear()
+        self.search_input.clear()
+        self.update_word_count()
+        self.update_deck_combo()
+        self.deck_progress.hide()
+        self.statusBar().showMessage(f"Switched to deck '{deck.name}'", 3000)
+        self.deckChanged.emit(deck)
+        if self.pending_import is not None and self.pending_import[0] == deck.path:
+            source = self.pending_import[1]
+            self.pending_import = None
+            self.import_words(source)
+
+    def on_deck_load_started(self, path: str):
+        self.deck_progress.setValue(0)
+        self.deck_progress.show()
+        self.statusBar().showMessage(f"Loading deck '{Path(path).stem}'...")
+
+    def on_deck_load_progress(self, path: str, percent: int):
+        self.deck_progress.setValue(percent)
+
+    def on_deck_indexed(self, deck: Deck):
+        if deck is not self.deck:
+            return
+        if self.statusBar().currentMessage() == "Indexing learned words...":
+            self.statusBar().clearMessage()
+        self.search_words(self.search_input.text())
+        if self.currentWord in self.learned_words:
+            self.show_related_words(self.currentWord)
+        self.indexReady.emit()
+
+    def on_deck_index_failed(self, deck: Deck, error: Exception):
+        if deck is self.deck:
+            self.statusBar().showMessage(f"Could not index deck '{deck.name}': {error}", 5000)
+
+    def on_deck_load_failed(self, path: str, error: Exception):
+        self.deck_progress.hide()
+        self.statusBar().clearMessage()
+        self.update_deck_combo()
+        QMessageBox.warning(self, "Error", f"Could not open deck '{path}': {error}")
     
     def save_words(self):
-        """Save learned words to JSON file."""
-        self.words_file.write_text(json.dumps(self.learned_words))
+        """Save all learned words to the words file."""
+        with metrics.time("deck_save_seconds"):
+            self.store.save_all(self.learned_words)
+            self.store.flush()
+    @staticmethod
+    def warm_up():
+        """Import the dictionary client in the background after the window is shown."""
+        def load():
+            with profile.measure("warm up Word (background)"):
+                importlib.import_module("Word")
+        threading.Thread(target=load, name="warm-up", daemon=True).start()
+
     def read_word(self):
         word = self.currentWord
-        self.speechEngine.say(word)
-        self.speechEngine.runAndWait()
+        if not word:
+            return
+        if self.speech is None:
+            with profile.measure("speech init (first use)"):
+                from Speech import PronunciationPlayer
+                self.speech = PronunciationPlayer(self)
+        info = self.learned_words.get(word, {})
+        self.speech.speak(word, info.get("audio"))
 
     def add_word(self):
-        """Add a new word and display its information."""
+        """Add a new word from the input box and display its information."""
         word_text = self.word_input.text().strip().lower()
+        self.request_word(word_text, "main")
+
+    def add_word_out(self,word):
+        """Add a new word requested by another window and display its information.
 
+        Returns the word shown or looked up (a spelling suggestion may replace it), or None.
+        """
+        return self.request_word(word, "pdf")
+
+    def request_word(self, word_text: str, channel: str):
+        """Show a learned word right away, or look it up in the background.
+
+        Returns the word shown or being looked up, or None if nothing was requested.
+        """
         if not word_text:
-            return
-        
-        try:
+            return None
+
+        # Check if word is already learned
+        if word_text in self.learned_words:
             self.currentWord = word_text
-            # Check if word is already learned
-            if word_text in self.learned_words:
-                self.display_word_info(word_text)
-                print("Word Exists already")
-                return
-            
-            # Fetch word information
-            word = Word(word_text)
-            definitionslist = []
-            examplesList = []
-            for meaning in word.meanings:
-                for definition in meaning.definitions:
-                    definitionslist.append(definition.definition)
-                    if definition.example != None:
-                        examplesList.append(definition.example)
-            print(definitionslist)
-            # Store word information
-            self.learned_words[word_text] = {
-                "definition": definitionslist,
-                "synonyms": word.all_synonyms,
-                "antonyms": word.all_antonyms,
-                "phonetic": word.phonetic,
-                "examples": examplesList
-            }
-            
-            # Save to file
-            self.save_words()
-            
-            # Display word information
             self.display_word_info(word_text)
-            
-            # Clear input
+            self.statusBar().showMessage(f"'{word_text}' is already learned", 3000)
+            self.wordReady.emit(word_text)
+            return word_text
+
+        # Offer spelling suggestions before spending a network round trip
+        word_text = self.check_spelling(word_text)
+        if word_text is None:
+            return None
+        if word_text in self.learned_words:
+            return self.request_word(word_text, channel)
+
+        self.currentWord = word_text
+        self.statusBar().showMessage(f"Looking up '{word_text}'...")
+        self.lookups.lookup(word_text, channel)
+        return word_text
+
+    def get_lexicon(self):
+        """The local word list, or None until it has loaded.
+
+        The first call loads lexicon.bin in the background (rebuilding it
+        if its word lists changed); until then there are no completions or
+        spelling suggestions.
+        """
+        if self.lexicon is None and self.lexicon_task is None:
+            self.lexicon_task = LexiconTask()
+            self.lexicon_task.signals.finished.connect(self.on_lexicon_loaded)
+            QThreadPool.globalInstance().start(self.lexicon_task)
+        return self.lexicon
+
+    def on_lexicon_loaded(self, lexicon, error):
+        self.lexicon_task = None
+        if error is not None:
+            print(f"Could not load the word list: {error}")
+            # An empty list is not retried at every keystroke
+            lexicon = Lexicon.Lexicon()
+        self.lexicon = lexicon
+
+    def attach_completer(self, line_edit: QLineEdit):
+        """Complete words from the local lexicon while typing."""
+        model = QStringListModel(line_edit)
+        completer = QCompleter(model, line_edit)
+        completer.setCaseSensitivity(Qt.CaseInsensitive)
+        line_edit.setCompleter(completer)
+
+        def complete(text: str):
+            lexicon = self.get_lexicon()
+            model.setStringList(lexicon.complete(text) if lexicon is not None else [])
+        line_edit.textEdited.connect(complete)
+
+    def check_spelling(self, word_text: str):
+        """Return the word to look up, a chosen suggestion, or None if cancelled."""
+        lexicon = self.get_lexicon()
+        # A small word list (e.g. only SAT.json) would question almost every ordinary word
+        if lexicon is None or len(lexicon) < Lexicon.SPELLING_MIN_WORDS or word_text in lexicon:
+            return word_text
+        max_distance = 1 if len(word_text) < Lexicon.SHORT_WORD_LENGTH else 2
+        suggestions = lexicon.suggest(word_text, max_distance, limit=3)
+        if not suggestions:
+            return word_text
+        box = QMessageBox(self)
+        box.setWindowTitle("Did you mean?")
+        box.setText(f"'{word_text}' is not in the local word list. Did you mean:")
+        buttons = {box.addButton(suggestion, QMessageBox.AcceptRole): suggestion
+                   for suggestion in suggestions}
+        anyway = box.addButton("Look up anyway", QMessageBox.AcceptRole)
+        box.addButton(QMessageBox.Cancel)
+        box.exec()
+        clicked = box.clickedButton()
+        if clicked is anyway:
+            return word_text
+        return buttons.get(clicked)
+
+    def on_lookup_ready(self, word_text: str, word: "Word"):
+        """Store a word fetched by the lookup service."""
+        self.learned_words[word_text] = word.to_record()
+        
+        # Save to file
+        with metrics.time("word_store_put_seconds"):
+            self.store.put(word_text, self.learned_words[word_text])
+        self.deck.word_stored(word_text, self.learned_words[word_text])
+        if self.question_bank is not None:
+            self.question_bank.add(word_text, self.learned_words[word_text])
+        if self.lexicon is not None:
+            self.lexicon.add(word_text)
+        
+        # Display word information
+        self.currentWord = word_text
+        self.display_word_info(word_text)
+        self.statusBar().showMessage(f"Added '{word_text}'", 3000)
+        
+        # Clear input
+        if self.word_input.text().strip().lower() == word_text:
             self.word_input.clear()
-            
-            # Update word count
-            self.update_word_count()
-            
-        except ValueError as e:
-            QMessageBox.warning(self, "Error", f"Could not find word '{word_text}'")
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"An error occurred: {str(e)}")
-    def add_word_out(self,word):
-        """Add a new word and display its information."""
-        word_text = word
+        
+        # Update word count
+        self.update_word_count()
+        self.wordAdded.emit(word_text)
+        self.wordReady.emit(word_text)
 
-        if not word_text:
+    def import_words(self, source):
+        """Import a .txt/.csv/Anki word list into the current deck in the background."""
+        if self.import_task is not None:
+            QMessageBox.warning(self, "Import", "An import is already running.")
             return
-        
         try:
-            self.currentWord = word_text
-            # Check if word is already learned
-            if word_text in self.learned_words:
-                self.display_word_info(word_text)
-                print("word already exist")
-                return
-            
-            # Fetch word information
-            word = Word(word_text)
-            definitionslist = []
-            examplesList = []
-            for meaning in word.meanings:
-                for definition in meaning.definitions:
-                    definitionslist.append(definition.definition)
-                    if definition.example != None:
-                        examplesList.append(definition.example)
-            print(definitionslist)
-            # Store word information
-            self.learned_words[word_text] = {
-                "definition": definitionslist,
-                "synonyms": word.all_synonyms,
-                "antonyms": word.all_antonyms,
-                "phonetic": word.phonetic,
-                "examples": examplesList
-            }
-            
-            # Save to file
-            self.save_words()
-            
-            # Display word information
-            self.display_word_info(word_text)
-            
-            # Clear input
-            self.word_input.clear()
-            
-            # Update word count
-            self.update_word_count()
-            
-        except ValueError as e:
+            self.importer = WordImporter(source, self.deck.path)
+        except OSError as e:
+            QMessageBox.warning(self, "Error", f"Could not open '{source}': {e}")
+            return
+        task = self.import_task = ImportTask(self.importer, self.learned_words, self.store)
+        # The connections also keep a cancelled task alive until its worker returns
+        task.signals.batchReady.connect(
+            lambda records, not_found, offset: self.on_import_batch(task, records, not_found, offset))
+        task.signals.finished.connect(lambda error: self.on_import_finished(task, error))
+        self.import_progress.setValue(self.importer.percent)
+        self.import_progress.show()
+        resumed = f" (resuming at {self.importer.percent}%)" if self.importer.resumed else ""
+        self.statusBar().showMessage(f"Importing '{Path(source).name}'{resumed}...")
+        self.import_pool.start(self.import_task)
+
+    def import_as_deck(self, source):
+        """Turn a word list into a new deck next to it (e.g. words.txt -> words.json) and import it."""
+        deck_path = Path(source).with_suffix(".json").resolve()
+        self.pending_import = (deck_path, source)
+        if deck_path == self.deck.path:
+            self.on_deck_changed(self.deck)
+        else:
+            self.switch_deck(deck_path)
+        return deck_path
+
+    def cancel_import(self):
+        if self.import_task is not None:
+            self.import_task.cancel()
+            self.import_task = None
+            self.import_progress.hide()
+            self.statusBar().showMessage("Import paused; import the same file again to resume", 5000)
+
+    def on_import_batch(self, task: ImportTask, records: Dict, not_found: List[str], offset: int):
+        """Store a batch of imported words; the import task then writes them out and checkpoints."""
+        if task is not self.import_task:
+            task.stored.set()
+            return
+        for word, info in records.items():
+            self.learned_words[word] = info
+        try:
+            with metrics.time("word_store_put_seconds"):
+                self.store.put_many(records)
+        except (OSError, ValueError) as e:
+            self.cancel_import()
+            QMessageBox.warning(self, "Import", f"Could not store the imported words: {e}")
+            return
+        finally:
+            task.stored.set()
+        if self.question_bank is not None:
+            self.question_bank.add_many(records)
+        for word, info in records.items():
+            self.deck.word_stored(word, info)
+            if self.lexicon is not None:
+                self.lexicon.add(word)
+            self.wordAdded.emit(word)
+        self.update_word_count()
+        self.import_progress.setValue(self.importer.percent)
+        self.statusBar().showMessage(f"Imported {self.importer.imported} words...")
+
+    def on_import_finished(self, task: ImportTask, error):
+        if task is not self.import_task:
+            return
+        importer = self.importer
+        self.import_task = None
+        self.import_progress.hide()
+        if error is None:
+            importer.finish()
+            message = f"Imported {importer.imported} words into '{self.deck.name}'."
+            if importer.not_found:
+                message += f" {importer.not_found} were not found (listed in {importer.failed_path.name})."
+            self.statusBar().clearMessage()
+            QMessageBox.information(self, "Import", message)
+        else:
+            self.statusBar().clearMessage()
+            QMessageBox.warning(self, "Import", f"The import stopped at {importer.percent}%: {error}\n"
+                                "Import the same file again to resume.")
+
+    def closeEvent(self, event):
+        self.cancel_import()
+        super().closeEvent(event)
+
+    def on_lookup_failed(self, word_text: str, error: Exception):
+        self.statusBar().clearMessage()
+        if isinstance(error, ValueError):
             QMessageBox.warning(self, "Error", f"Could not find word '{word_text}'")
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"An error occurred: {str(e)}")
+        else:
+            QMessageBox.warning(self, "Error", f"An error occurred: {str(error)}")
+
+    def on_lookups_busy(self, count: int):
+        self.lookup_progress.setVisible(count > 0)
+        if count == 0 and self.statusBar().currentMessage().startswith("Looking up"):
+            self.statusBar().clearMessage()
+
     def display_word_info(self, word: str):
         """Display word information in the text area."""
         word_info = self.learned_words[word]
@@ -221,7 +532,58 @@ class MainWind(QMainWindow):
             display_text += f"Antonyms: {', '.join(word_info['antonyms'])}\n"
         
         self.display_area.setText(display_text)
+        self.show_related_words(word)
+
+    def show_related_words(self, word: str):
+        self.related_list.clear()
+        if self.word_graph is None:
+            # Filled in by on_deck_indexed once the graph is built
+            return
+        for related, hops in self.word_graph.related(word, hops=2, exclude=self.learned_words):
+            item = QListWidgetItem(related if hops == 1 else f"{related} ({hops} steps)")
+            item.setData(Qt.UserRole, related)
+            self.related_list.addItem(item)
     
+    def delete_word(self, word: str):
+        """Remove a learned word everywhere it is stored or indexed."""
+        del self.learned_words[word]
+        self.store.delete(word)
+        self.deck.word_deleted(word)
+        if self.question_bank is not None:
+            self.question_bank.remove(word)
+        self.update_word_count()
+        self.wordRemoved.emit(word)
+
+    def clear_words(self):
+        """Remove all learned words."""
+        self.learned_words.clear()
+        self.store.clear()
+        self.deck.words_cleared()
+        if self.question_bank is not None:
+            self.question_bank.clear()
+        self.related_list.clear()
+        self.update_word_count()
+
+    def search_words(self, query: str):
+        self.search_results.clear()
+        if not query.strip():
+            self.search_results.hide()
+            return
+        if self.search_index is None:
+            # Searched again by on_deck_indexed once the index is built
+            self.search_results.hide()
+            self.statusBar().showMessage("Indexing learned words...")
+            return
+        for word, _ in self.search_index.search(query):
+            item = QListWidgetItem(word)
+            item.setData(Qt.UserRole, word)
+            self.search_results.addItem(item)
+        self.search_results.show()
+
+    def show_search_result(self, item: QListWidgetItem):
+        self.currentWord = item.data(Qt.UserRole)
+        self.display_word_info(self.currentWord)
+
     def update_word_count(self):
         """Update the word count label."""
         count = len(self.learned_words)
@@ -234,18 +596,38 @@ class MainWind(QMainWindow):
                               "Please learn at least 4 words before taking the quiz!")
             return
             
-        self.quiz_window = QuizWindow(self.learned_words)
+        self.quiz_window = QuizWindow(self.learned_words, self.get_scheduler(), self.deck.get_question_bank(),
+                                      self.deck.get_answer_log())
+        self.deckChanged.connect(self.quiz_window.on_deck_changed)
+        self.wordRemoved.connect(self.quiz_window.on_word_removed)
         self.quiz_window.show()
 
+    def get_scheduler(self) -> ReviewScheduler:
+        """Review progress is kept next to the words file, e.g. learned_words.review.sqlite."""
+        return self.deck.get_scheduler()
+
     def inspectWords(self):
     
     # ... (rest of the VocabularyApp class remains the same)
-        self.inspectWordsWindow = InspectWordsWindow(self.learned_words, self)
-        self.inspectWordsWindow.show()
+        with metrics.time("inspect_window_open_seconds"):
+            self.inspectWordsWindow = InspectWordsWindow(self.learned_words, self)
+            self.inspectWordsWindow.show()
 
     def PDFreader(self):
+        with profile.measure("import PDFReadWindow (first use)"):
+            from PDFReadWindow import PDFReadWindow
         self.PDFreaderWindow = PDFReadWindow(self.learned_words, self)
         self.PDFreaderWindow.show()
+    def open_stats(self):
+        from StatsWindow import StatsWindow
+        self.statsWindow = StatsWindow(self.deck.get_answer_log(), self)
+        self.statsWindow.show()
+
+    def open_diagnostics(self):
+        from DiagnosticsWindow import DiagnosticsWindow
+        self.diagnosticsWindow = DiagnosticsWindow()
+        self.diagnosticsWindow.show()
+
     def openSettings(self):
         self.settingsWindow = SettingsWindow(app=self.app, mainwind=self)
         self.settingsWindow.show()
\ No newline at end of file
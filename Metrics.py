@@ -0,0 +1,219 @@
+import bisect
+import json
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+# Histogram bucket upper bounds in seconds, as in Prometheus client libraries
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# The GUI thread counts as stalled when it has not run the event loop for this long
+STALL_THRESHOLD = 0.05
+# How many stall stack samples are kept
+MAX_STALLS = 50
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound containing the q-th observation (the largest value for the last bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+    """Process-wide counters, latency histograms and UI stall samples.
+
+    Recording is a dict lookup and a few additions under a lock, so hooks can
+    stay on in normal use. Gauges are callables read when a snapshot is taken,
+    e.g. the response cache's hit count.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.gauges: Dict[str, Callable[[], float]] = {}
+        self.stalls = deque(maxlen=MAX_STALLS)
+        self.started = time.time()
+
+    def count(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def gauge(self, name: str, read: Callable[[], float]) -> None:
+        self.gauges[name] = read
+
+    @contextmanager
+    def time(self, name: str):
+        """Records how long a block takes in the histogram called name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def timed(self, name: str):
+        """Decorator form of time()."""
+        def decorate(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def record_stall(self, seconds: float, stack: str) -> None:
+        self.observe("ui_stall_seconds", seconds)
+        self.stalls.append({"time": time.time(), "seconds": seconds, "stack": stack})
+
+    def snapshot(self) -> Dict[str, Any]:
+        gauges = {}
+        for name, read in list(self.gauges.items()):
+            try:
+                gauges[name] = read()
+            except Exception:
+                continue
+        with self._lock:
+            histograms = {
+                name: {
+                    "count": h.count,
+                    "sum": h.total,
+                    "max": h.max,
+                    "p50": h.quantile(0.5),
+                    "p95": h.quantile(0.95),
+                    "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], h.counts)),
+                }
+                for name, h in self.histograms.items()
+            }
+            return {
+                "uptime_seconds": time.time() - self.started,
+                "counters": dict(self.counters),
+                "gauges": gauges,
+                "histograms": histograms,
+                "stalls": list(self.stalls),
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=1)
+
+    def to_prometheus(self) -> str:
+        """The snapshot in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in sorted(snapshot["counters"].items()):
+            lines += [f"# TYPE learnwords_{name} counter", f"learnwords_{name} {value}"]
+        for name, value in sorted(snapshot["gauges"].items()):
+            lines += [f"# TYPE learnwords_{name} gauge", f"learnwords_{name} {value}"]
+        for name, h in sorted(snapshot["histograms"].items()):
+            lines.append(f"# TYPE learnwords_{name} histogram")
+            cumulative = 0
+            for bound, count in h["buckets"].items():
+                cumulative += count
+                lines.append(f'learnwords_{name}_bucket{{le="{bound}"}} {cumulative}')
+            lines += [f"learnwords_{name}_sum {h['sum']}", f"learnwords_{name}_count {h['count']}"]
+        return "\n".join(lines) + "\n"
+
+    def export(self, path) -> None:
+        """Writes Prometheus text for .prom/.txt files and JSON otherwise."""
+        path = Path(path)
+        text = self.to_prometheus() if path.suffix.lower() in (".prom", ".txt") else self.to_json()
+        path.write_text(text, encoding="utf-8")
+
+    def report(self) -> str:
+        """A short human-readable summary for the diagnostics window."""
+        snapshot = self.snapshot()
+        lines = [f"Uptime: {snapshot['uptime_seconds']:.0f} s", "", "Latency:"]
+        for name, h in sorted(snapshot["histograms"].items()):
+            mean = h["sum"] / h["count"] * 1000 if h["count"] else 0.0
+            lines.append(f"  {name:<32}{h['count']:>7}x  mean {mean:>8.1f} ms  "
+                         f"p95 <= {h['p95'] * 1000:>7.1f} ms  max {h['max'] * 1000:>8.1f} ms")
+        lines += ["", "Counters:"]
+        lines += [f"  {name:<32}{value:>10g}" for name, value in sorted(snapshot["counters"].items())]
+        lines += [f"  {name:<32}{value:>10g}" for name, value in sorted(snapshot["gauges"].items())]
+        lines += ["", f"UI stalls over {STALL_THRESHOLD * 1000:.0f} ms (latest first):"]
+        for stall in reversed(snapshot["stalls"]):
+            when = time.strftime("%H:%M:%S", time.localtime(stall["time"]))
+            lines.append(f"--- {when}  {stall['seconds'] * 1000:.0f} ms")
+            lines.append(stall["stack"])
+        return "\n".join(lines)
+
+
+metrics = Metrics()
+
+
+class StallDetector:
+    """Detects event-loop stalls on the GUI thread and samples what it was doing.
+
+    A QTimer on the GUI thread records a heartbeat; a watchdog thread notices
+    when the heartbeat is late by more than threshold, takes one stack sample
+    of the GUI thread, and records the stall's length once the loop runs again.
+    """
+
+    def __init__(self, parent=None, threshold: float = STALL_THRESHOLD, interval: float = 0.02):
+        from PySide6.QtCore import QTimer
+        self.threshold = threshold
+        self.interval = interval
+        self.gui_thread = threading.get_ident()
+        self.last_beat = time.perf_counter()
+        self._stack: Optional[str] = None
+        self._stopped = threading.Event()
+        self._timer = QTimer(parent)
+        self._timer.timeout.connect(self._beat)
+        self._timer.start(int(interval * 1000))
+        self._thread = threading.Thread(target=self._watch, name="stall-detector", daemon=True)
+        self._thread.start()
+
+    def _beat(self) -> None:
+        now = time.perf_counter()
+        late = now - self.last_beat - self.interval
+        self.last_beat = now
+        stack, self._stack = self._stack, None
+        if late > self.threshold:
+            metrics.record_stall(late, stack or "(no sample taken)")
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval):
+            if self._stack is not None:
+                continue
+            if time.perf_counter() - self.last_beat - self.interval > self.threshold:
+                frame = sys._current_frames().get(self.gui_thread)
+                if frame is not None:
+                    self._stack = "".join(traceback.format_stack(frame))
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._timer.stop()
@@ -0,0 +1,143 @@
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+DEFAULT_PATH = "offline_dictionary.sqlite"
+
+
+def convert_wiktextract(entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Converts one wiktextract (kaikki.org) JSON line into a dictionary API entry.
+
+    Returns None for lines that are not English or have no definitions.
+    """
+    if entry.get("lang_code", "en") != "en" or not entry.get("word"):
+        return None
+    definitions = []
+    for sense in entry.get("senses", []):
+        glosses = sense.get("glosses") or sense.get("raw_glosses")
+        if not glosses:
+            continue
+        examples = [example.get("text") for example in sense.get("examples", []) if example.get("text")]
+        definitions.append({
+            "definition": glosses[-1],
+            "example": examples[0] if examples else None,
+            "synonyms": [item["word"] for item in sense.get("synonyms", []) if item.get("word")],
+            "antonyms": [item["word"] for item in sense.get("antonyms", []) if item.get("word")],
+        })
+    if not definitions:
+        return None
+    phonetics = []
+    for sound in entry.get("sounds", []):
+        if sound.get("ipa") or sound.get("mp3_url"):
+            phonetics.append({"text": sound.get("ipa", ""), "audio": sound.get("mp3_url")})
+    return {
+        "word": entry["word"],
+        "phonetic": next((p["text"] for p in phonetics if p["text"]), ""),
+        "phonetics": phonetics,
+        "meanings": [{
+            "partOfSpeech": entry.get("pos", ""),
+            "definitions": definitions,
+            "synonyms": [item["word"] for item in entry.get("synonyms", []) if item.get("word")],
+            "antonyms": [item["word"] for item in entry.get("antonyms", []) if item.get("word")],
+        }],
+        "origin": entry.get("etymology_text"),
+        "sourceUrls": [],
+    }
+
+
+def merge_entries(first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+    """Combines two entries for the same word (e.g. its noun and verb lines)."""
+    merged = dict(first)
+    merged["meanings"] = first["meanings"] + second["meanings"]
+    merged["phonetics"] = first["phonetics"] + [p for p in second["phonetics"] if p not in first["phonetics"]]
+    merged["phonetic"] = first["phonetic"] or second["phonetic"]
+    merged["origin"] = first.get("origin") or second.get("origin")
+    return merged
+
+
+class OfflineDictionary:
+    """Indexed on-disk dictionary pack holding API-shaped entries keyed by word.
+
+    Entries have the same shape as dictionaryapi.dev responses, so they parse
+    with Word.from_response and produce the same learned_words records.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (word TEXT PRIMARY KEY, entry TEXT NOT NULL)")
+
+    def get(self, word: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("SELECT entry FROM entries WHERE word = ?", (word.lower(),)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def __contains__(self, word: str) -> bool:
+        return self._conn.execute(
+            "SELECT 1 FROM entries WHERE word = ?", (word.lower(),)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def import_wiktextract(self, dump_path, batch_size: int = 5000, replace: bool = True) -> int:
+        """Streams a wiktextract JSON-lines dump into the pack and returns the entries written.
+
+        Lines for the same word are usually adjacent, so they are merged in
+        memory; a word seen again later is merged with what is already stored.
+        With replace, the previous contents of the pack are dropped first.
+        """
+        if replace:
+            with self._conn:
+                self._conn.execute("DELETE FROM entries")
+        written = 0
+        batch: Dict[str, Dict[str, Any]] = {}
+        with open(dump_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = convert_wiktextract(json.loads(line))
+                except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+                    continue
+                if entry is None:
+                    continue
+                word = entry["word"].lower()
+                batch[word] = merge_entries(batch[word], entry) if word in batch else entry
+                if len(batch) >= batch_size:
+                    written += self._write(batch)
+                    batch = {}
+        written += self._write(batch)
+        return written
+
+    def _write(self, batch: Dict[str, Dict[str, Any]]) -> int:
+        with self._conn:
+            for word, entry in batch.items():
+                existing = self.get(word)
+                if existing is not None:
+                    entry = merge_entries(existing, entry)
+                self._conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?)",
+                                   (word, json.dumps(entry)))
+        return len(batch)
+
+    def words(self) -> Iterator[str]:
+        for (word,) in self._conn.execute("SELECT word FROM entries ORDER BY word"):
+            yield word
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def open_default(path=DEFAULT_PATH) -> Optional[OfflineDictionary]:
+    """Opens the offline pack if one has been imported."""
+    return OfflineDictionary(path) if Path(path).exists() else None
+
+
+if __name__ == "__main__":
+    # python OfflineDictionary.py kaikki.org-dictionary-English.jsonl [offline_dictionary.sqlite]
+    if len(sys.argv) < 2:
+        print("usage: python OfflineDictionary.py DUMP.jsonl [PACK]")
+        sys.exit(1)
+    pack = OfflineDictionary(sys.argv[2] if len(sys.argv) > 2 else DEFAULT_PATH)
+    count = pack.import_wiktextract(sys.argv[1])
+    print(f"Imported {count} entries into {pack.path} ({len(pack)} words)")
@@ -1,12 +1,49 @@
 import random
+from collections import Counter
 from typing import List, Dict
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, 
                               QHBoxLayout, QPushButton, 
-                              QLabel, QLineEdit, QTextEdit, QListWidgetItem, QFileDialog, QToolBar, QSplitter)
-from PySide6.QtCore import Qt, QUrl
+                              QLabel, QLineEdit, QTextEdit, QListWidget, QListWidgetItem, QFileDialog, QToolBar, QSplitter, QSpinBox)
+from PySide6.QtCore import Qt, QUrl, QObject, QRunnable, QThreadPool, QTimer, Signal
 from PySide6.QtWebEngineWidgets import QWebEngineView
 from PySide6.QtWebEngineCore import QWebEngineSettings
 from Word import Word
+from VocabExtractor import VocabExtractor, rank_candidates
+from Prefetcher import Prefetcher
+
+
+class ExtractionSignals(QObject):
+    pageDone = Signal(int, object)  # page number, {word: count}
+    failed = Signal(str)
+    finished = Signal()
+
+
+class ExtractionTask(QRunnable):
+    """Streams a PDF's pages through VocabExtractor without blocking the viewer."""
+
+    def __init__(self, pdf_path: str):
+        super().__init__()
+        self.extractor = VocabExtractor(pdf_path)
+        self.signals = ExtractionSignals()
+        self.cancelled = False
+
+    def run(self):
+        try:
+            for number, counts in self.extractor.iter_pages():
+                if self.cancelled:
+                    break
+                self.signals.pageDone.emit(number, counts)
+        except ImportError:
+            self.signals.failed.emit("Install pypdf to extract vocabulary from PDFs")
+        except Exception as e:
+            # Cancelling may interrupt the extractor mid-page; that is not a failure
+            if not self.cancelled:
+                self.signals.failed.emit(f"Could not read PDF: {e}")
+        self.signals.finished.emit()
+
+    def cancel(self):
+        self.cancelled = True
+        self.extractor.cancel()
 
 class PDFReadWindow(QMainWindow):
     def __init__(self, learned_words: Dict, mainWind):
@@ -15,6 +52,9 @@ class PDFReadWindow(QMainWindow):
         self.setMinimumSize(1200, 800)
         self.learned_words = learned_words
         self.mainWind = mainWind
+        self.requested_word = None
+        self.mainWind.wordReady.connect(self.on_word_ready)
+        self.mainWind.deckChanged.connect(self.on_deck_changed)
 
         # Create the main layout
         main_layout = QVBoxLayout()
@@ -30,6 +70,13 @@ class PDFReadWindow(QMainWindow):
         left_layout = QVBoxLayout()
         self.toolbar = QToolBar()
         self.toolbar.addAction("Open PDF", self.show_file_dialog)
+        # The page being read; definitions for it and the next pages are fetched ahead of time
+        self.toolbar.addWidget(QLabel(" Reading page: "))
+        self.page_spinbox = QSpinBox()
+        self.page_spinbox.setMinimum(1)
+        self.page_spinbox.setMaximum(100000)
+        self.page_spinbox.valueChanged.connect(self.update_prefetch)
+        self.toolbar.addWidget(self.page_spinbox)
         left_layout.addWidget(self.toolbar, 0, alignment=Qt.AlignmentFlag.AlignTop)
 
         self.pdf_viewer = QWebEngineView()
@@ -52,6 +99,7 @@ class PDFReadWindow(QMainWindow):
         new_word_label = QLabel("New Word:")
         self.new_word_input = QLineEdit()
         self.new_word_input.returnPressed.connect(self.add_new_word)
+        self.mainWind.attach_completer(self.new_word_input)
         new_word_layout.addWidget(new_word_label)
         new_word_layout.addWidget(self.new_word_input)
         right_layout.addLayout(new_word_layout)
@@ -60,6 +108,23 @@ class PDFReadWindow(QMainWindow):
         self.display_area.setReadOnly(True)
         right_layout.addWidget(self.display_area)
 
+        # Unknown words found in the PDF, most frequent first; double click to look one up
+        self.vocab_label = QLabel("Unknown words in this PDF:")
+        right_layout.addWidget(self.vocab_label)
+        self.vocab_list = QListWidget()
+        self.vocab_list.itemDoubleClicked.connect(self.add_candidate_word)
+        right_layout.addWidget(self.vocab_list)
+        self.word_counts = Counter()
+        self.page_words: Dict[int, Dict[str, int]] = {}
+        self.pages_done = 0
+        self.prefetcher = Prefetcher(Word.shared_client().get)
+        self.extraction = None
+        # Re-rank at most a few times a second while pages stream in
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(300)
+        self.refresh_timer.timeout.connect(self.refresh_candidates)
+
         self.show_file_dialog()
 
     def show_file_dialog(self):
@@ -71,15 +136,99 @@ class PDFReadWindow(QMainWindow):
 
     def load_pdf(self, file_path: str):
         self.pdf_viewer.load(QUrl(file_path))
+        self.start_extraction(file_path)
+
+    def start_extraction(self, file_path: str):
+        """Analyse the PDF's vocabulary in the background."""
+        self.cancel_extraction()
+        self.word_counts.clear()
+        self.page_words.clear()
+        self.pages_done = 0
+        self.vocab_list.clear()
+        self.page_spinbox.setValue(1)
+        self.extraction = ExtractionTask(file_path)
+        self.extraction.signals.pageDone.connect(self.on_page_extracted)
+        self.extraction.signals.failed.connect(self.on_extraction_failed)
+        self.extraction.signals.finished.connect(self.on_extraction_finished)
+        QThreadPool.globalInstance().start(self.extraction)
+
+    def cancel_extraction(self):
+        if self.extraction is not None:
+            self.extraction.cancel()
+            self.extraction = None
+
+    def on_page_extracted(self, number: int, counts: Dict[str, int]):
+        # Ignore pages still arriving from a PDF that was replaced
+        if self.extraction is None or self.sender() is not self.extraction.signals:
+            return
+        self.word_counts.update(counts)
+        self.page_words[number] = counts
+        self.pages_done += 1
+        if not self.refresh_timer.isActive():
+            self.refresh_timer.start()
+
+    def on_extraction_failed(self, message: str):
+        if self.extraction is None or self.sender() is not self.extraction.signals:
+            return
+        self.vocab_label.setText(message)
+
+    def on_extraction_finished(self):
+        if self.extraction is None or self.sender() is not self.extraction.signals:
+            return
+        self.refresh_candidates()
+
+    def refresh_candidates(self):
+        self.vocab_label.setText(f"Unknown words in this PDF ({self.pages_done} pages read):")
+        self.vocab_list.clear()
+        for word, count in rank_candidates(self.word_counts, self.learned_words):
+            item = QListWidgetItem(f"{word} ({count})")
+            item.setData(Qt.UserRole, word)
+            self.vocab_list.addItem(item)
+        self.update_prefetch()
+
+    def update_prefetch(self):
+        """Warm lookups for the current page and the next few pages."""
+        page = self.page_spinbox.value() - 1
+        self.prefetcher.set_page(page, self.page_words, self.word_counts, self.learned_words)
+
+    def on_deck_changed(self, deck):
+        # Words known in the new deck drop out of the candidates and prefetching
+        self.learned_words = deck.words
+        if self.word_counts:
+            self.refresh_candidates()
+
+    def add_candidate_word(self, item: QListWidgetItem):
+        self.new_word_input.setText(item.data(Qt.UserRole))
+        self.add_new_word()
+
+    def closeEvent(self, event):
+        self.cancel_extraction()
+        self.prefetcher.stop()
+        super().closeEvent(event)
 
     def add_new_word(self):
         word = self.new_word_input.text().strip()
         if word:
-            self.mainWind.add_word_out(word)
-            self.display_word_info(word)
+            # The lookup runs in the background; the result arrives through wordReady
+            self.requested_word = None
+            requested = self.mainWind.add_word_out(word)
+            if requested in self.learned_words:
+                self.display_word_info(requested)
+            else:
+                # Possibly a spelling suggestion instead of the word typed
+                self.requested_word = requested
 
             self.new_word_input.clear()
 
+    def on_word_ready(self, word: str):
+        # Other words become ready too, e.g. prefetched ones or lookups from the main window
+        if word == self.requested_word:
+            self.requested_word = None
+            self.display_word_info(word)
+        # Learned words drop out of the unknown words list
+        if self.word_counts and not self.refresh_timer.isActive():
+            self.refresh_timer.start()
+
     def display_word_info(self, word: str):
         """Display word information in the text area."""
         word_info = self.learned_words[word]
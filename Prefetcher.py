@@ -0,0 +1,103 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Container, Dict, List, Mapping, Optional, Tuple
+
+
+class Prefetcher:
+    """Warms dictionary lookups for the pages around the one being read.
+
+    set_page() queues the unknown words of the current page and the next few
+    pages; a single background thread fetches them one at a time, nearest page
+    first, pausing between requests so foreground lookups stay responsive.
+    Queued words for pages the reader has left are dropped.
+    """
+
+    def __init__(self, fetch: Callable[[str], Any], lookahead: int = 3,
+                 words_per_page: int = 25, max_queue: int = 200,
+                 max_warmed: int = 5000, pause: float = 0.1):
+        self.fetch = fetch
+        self.lookahead = lookahead
+        self.words_per_page = words_per_page
+        self.max_queue = max_queue
+        self.max_warmed = max_warmed
+        self.pause = pause
+        self.page = 0
+        # (page distance, rank, page, word)
+        self._queue: List[Tuple[int, int, int, str]] = []
+        self._queued: Dict[str, int] = {}
+        self._warmed: "OrderedDict[str, None]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="prefetcher", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def pick_words(counts: Mapping[str, int], book_counts: Mapping[str, int],
+                   known: Container[str], limit: int) -> List[str]:
+        """Chooses a page's rarest unknown words: rare in the whole book, then longest."""
+        words = [word for word in counts if word not in known]
+        words.sort(key=lambda word: (book_counts.get(word, 0), -len(word), word))
+        return words[:limit]
+
+    def set_page(self, page: int, page_words: Mapping[int, Mapping[str, int]],
+                 book_counts: Mapping[str, int], known: Container[str]) -> None:
+        """Moves the reading window and requeues work for the pages inside it."""
+        with self._cond:
+            self.page = page
+            last = page + self.lookahead
+            # Drop work for pages that are no longer in the reading window
+            self._queue = [(target - page, rank, target, word)
+                           for _, rank, target, word in self._queue if page <= target <= last]
+            self._queued = {word: target for _, _, target, word in self._queue}
+            for target in range(page, last + 1):
+                counts = page_words.get(target)
+                if not counts:
+                    continue
+                picked = self.pick_words(counts, book_counts, known, self.words_per_page)
+                for rank, word in enumerate(picked):
+                    if len(self._queue) >= self.max_queue:
+                        break
+                    if word in self._warmed or word in self._queued:
+                        continue
+                    self._queue.append((target - page, rank, target, word))
+                    self._queued[word] = target
+            heapq.heapify(self._queue)
+            self._cond.notify()
+
+    def is_warm(self, word: str) -> bool:
+        return word in self._warmed
+
+    def _next(self) -> Optional[str]:
+        with self._cond:
+            while not self._queue and not self._stopped:
+                self._cond.wait()
+            if self._stopped:
+                return None
+            _, _, _, word = heapq.heappop(self._queue)
+            self._queued.pop(word, None)
+            return word
+
+    def _run(self) -> None:
+        while True:
+            word = self._next()
+            if word is None:
+                return
+            try:
+                self.fetch(word)
+            except Exception:
+                # Unknown words are remembered by the cache too; other errors are not fatal
+                pass
+            with self._cond:
+                self._warmed[word] = None
+                if len(self._warmed) > self.max_warmed:
+                    self._warmed.popitem(last=False)
+            time.sleep(self.pause)
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._queue.clear()
+            self._queued.clear()
+            self._cond.notify()
@@ -0,0 +1,428 @@
+import json
+import os
+import random
+import re
+import struct
+import threading
+import zlib
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+MAGIC = b"QBK1"
+# Question kinds, stored as one byte per question
+MEANING = 0     # word -> one of its definitions (the original quiz)
+DEFINITION = 1  # definition -> word
+SYNONYM = 2     # word -> one of its synonyms
+ANTONYM = 3     # word -> one of its antonyms
+CLOZE = 4       # example sentence with the word blanked out -> word
+KINDS = ("meaning", "definition", "synonym", "antonym", "cloze")
+BLANK = "_____"
+# Questions compiled per kind and word, e.g. the first three definitions
+MAX_PER_KIND = 3
+# Decks up to this size are compiled in-process; bigger ones on a process pool
+INLINE_LIMIT = 2000
+# Words per process pool task
+CHUNK_SIZE = 2000
+# Tries per distractor before settling for fewer options
+DISTRACTOR_TRIES = 20
+# Nearest words by definition that hard distractors are drawn from
+HARD_POOL = 8
+# Kinds whose distractors come from similar words when a DistractorIndex is attached
+HARD_KINDS = (MEANING, DEFINITION, CLOZE)
+DEAD = 0xFFFFFFFF
+TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z'-]*")
+INFLECTIONS = ("s", "es", "d", "ed", "ing", "ly")
+
+
+def fingerprint(info: Mapping[str, Any]) -> int:
+    """Checksum of a word's record; a question block is recompiled when it changes."""
+    return zlib.crc32(json.dumps(info, sort_keys=True).encode("utf-8"))
+
+
+def blank_out(text: str, word: str) -> str:
+    """Replaces word in text with BLANK, including common inflections ("abated", "abates")."""
+    if word not in text.lower():
+        return text
+    def blank(match: re.Match) -> str:
+        token = match.group().lower()
+        return BLANK if token == word or (token.startswith(word) and token[len(word):] in INFLECTIONS) else match.group()
+    return TOKEN_RE.sub(blank, text)
+
+
+def compile_word(word: str, info: Mapping[str, Any]) -> List[Tuple[int, str, str]]:
+    """Turns a word's record into (kind, prompt, answer) questions."""
+    def clean(texts) -> List[str]:
+        # "\0" separates texts in the bundle file
+        return [text.replace("\0", "").strip() for text in texts or [] if text and text.strip()]
+
+    definitions = clean(info.get("definition"))[:MAX_PER_KIND]
+    questions = [(MEANING, word, definition) for definition in definitions]
+    questions += [(DEFINITION, blank_out(definition, word), word) for definition in definitions]
+    for kind, field in ((SYNONYM, "synonyms"), (ANTONYM, "antonyms")):
+        related = [text for text in clean(info.get(field)) if text.lower() != word]
+        questions += [(kind, word, text) for text in related[:MAX_PER_KIND]]
+    examples = 0
+    for example in clean(info.get("examples")):
+        masked = blank_out(example, word)
+        if masked != example and examples < MAX_PER_KIND:
+            questions.append((CLOZE, masked, word))
+            examples += 1
+    return questions
+
+
+def compile_chunk(items: List[Tuple[str, Mapping[str, Any]]]) -> List[Tuple[str, int, List[Tuple[int, str, str]]]]:
+    """Compiles a batch of (word, record) pairs. Runs in a worker process."""
+    return [(word, fingerprint(info), compile_word(word, info)) for word, info in items]
+
+
+class Question:
+    __slots__ = ("kind", "word", "prompt", "options", "correct")
+
+    def __init__(self, kind: int, word: str, prompt: str, options: List[str], correct: int):
+        self.kind = kind
+        self.word = word
+        self.prompt = prompt
+        self.options = options
+        self.correct = correct
+
+
+class QuestionBank:
+    """Precompiled quiz questions for a deck, kept in flat arrays.
+
+    Every word's questions form one contiguous block (start and count per
+    word id); question columns hold the kind and the ids of the prompt and
+    answer in a shared text table. Questions of each kind are also listed in
+    by_kind, so distractors are drawn in O(1) by sampling that list. Editing
+    a word tombstones its old block and appends a new one; a block whose
+    record checksum no longer matches the deck is recompiled when the word is
+    asked. The bank is saved as <deck>.questions.bin and reloaded without
+    recompiling; build() compiles words that are missing from it.
+
+    With a DistractorIndex attached as index, meaning, definition and cloze
+    questions offer words with similar definitions and the same part of
+    speech as wrong answers, topped up at random; the bank keeps the index
+    in step with the deck and builds and saves it along with itself.
+    """
+
+    def __init__(self, words: Mapping[str, Mapping[str, Any]], path=None):
+        self.words = words
+        self.path = Path(path) if path is not None else None
+        self.built = False
+        self.dirty = False
+        self.random = random.Random()
+        self.index = None
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.crcs = array("I")
+        self.start = array("I")
+        self.count = array("H")
+        self.texts: List[str] = []
+        # Only texts added since loading are deduplicated; _compact() merges the rest
+        self._text_ids: Dict[str, int] = {}
+        self.q_word = array("I")
+        self.q_kind = array("B")
+        self.q_prompt = array("I")
+        self.q_answer = array("I")
+        self.by_kind = [array("I") for _ in KINDS]
+        self.dead = 0
+
+    def __len__(self) -> int:
+        return len(self.q_word) - self.dead
+
+    @classmethod
+    def open(cls, words: Mapping[str, Mapping[str, Any]], path) -> "QuestionBank":
+        """Loads the saved bank for a deck, or starts an empty one."""
+        bank = cls(words, path)
+        try:
+            bank._load()
+        except (OSError, ValueError, struct.error, EOFError):
+            bank = cls(words, path)
+        return bank
+
+    def _load(self) -> None:
+        with open(self.path, "rb") as f:
+            if f.read(4) != MAGIC:
+                raise ValueError(f"{self.path} is not a question bank")
+            n_words, n_texts, n_questions, names_size, texts_size = struct.unpack("<IIIII", f.read(20))
+            self.names = f.read(names_size).decode("utf-8").split("\n") if n_words else []
+            self.texts = f.read(texts_size).decode("utf-8").split("\0") if n_texts else []
+            if len(self.names) != n_words or len(self.texts) != n_texts:
+                raise ValueError(f"{self.path} is truncated")
+            for column, size in ((self.crcs, n_words), (self.start, n_words), (self.count, n_words),
+                                 (self.q_word, n_questions), (self.q_kind, n_questions),
+                                 (self.q_prompt, n_questions), (self.q_answer, n_questions)):
+                column.fromfile(f, size)
+            for column in self.by_kind:
+                (size,) = struct.unpack("<I", f.read(4))
+                column.fromfile(f, size)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+    def save(self) -> None:
+        """Writes the bank and its distractor index next to the deck, if changed."""
+        if self.index is not None and self.index.dirty:
+            self.index.save()
+        if self.path is None or not self.dirty:
+            return
+        with self._lock:
+            if self.dead * 2 > len(self.q_word):
+                self._compact()
+            names = "\n".join(self.names).encode("utf-8")
+            texts = "\0".join(self.texts).encode("utf-8")
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "wb") as f:
+                f.write(MAGIC)
+                f.write(struct.pack("<IIIII", len(self.names), len(self.texts), len(self.q_word),
+                                    len(names), len(texts)))
+                f.write(names)
+                f.write(texts)
+                for column in (self.crcs, self.start, self.count,
+                               self.q_word, self.q_kind, self.q_prompt, self.q_answer):
+                    column.tofile(f)
+                for column in self.by_kind:
+                    f.write(struct.pack("<I", len(column)))
+                    column.tofile(f)
+            os.replace(tmp, self.path)
+            self.dirty = False
+
+    def _compact(self) -> None:
+        """Drops tombstoned blocks and unused texts."""
+        old = (self.names, self.crcs, self.start, self.count, self.texts,
+               self.q_kind, self.q_prompt, self.q_answer)
+        names, crcs, starts, counts, texts, kinds, prompts, answers = old
+        self._reset()
+        for word_id, name in enumerate(names):
+            if not counts[word_id] or name not in self.words:
+                continue
+            start = starts[word_id]
+            self._append(name, crcs[word_id], [
+                (kinds[q], texts[prompts[q]], texts[answers[q]]) for q in range(start, start + counts[word_id])])
+
+    def _text_id(self, text: str) -> int:
+        text_id = self._text_ids.get(text)
+        if text_id is None:
+            text_id = self._text_ids[text] = len(self.texts)
+            self.texts.append(text)
+        return text_id
+
+    def _drop(self, word_id: int) -> None:
+        start = self.start[word_id]
+        for q in range(start, start + self.count[word_id]):
+            self.q_word[q] = DEAD
+        self.dead += self.count[word_id]
+        self.count[word_id] = 0
+
+    def _append(self, word: str, crc: int, questions: List[Tuple[int, str, str]]) -> int:
+        word_id = self.ids.get(word)
+        if word_id is None:
+            word_id = self.ids[word] = len(self.names)
+            self.names.append(word)
+            self.crcs.append(crc)
+            self.start.append(0)
+            self.count.append(0)
+        else:
+            self._drop(word_id)
+            self.crcs[word_id] = crc
+        self.start[word_id] = len(self.q_word)
+        self.count[word_id] = len(questions)
+        for kind, prompt, answer in questions:
+            self.by_kind[kind].append(len(self.q_word))
+            self.q_word.append(word_id)
+            self.q_kind.append(kind)
+            self.q_prompt.append(self._text_id(prompt))
+            self.q_answer.append(self._text_id(answer))
+        self.dirty = True
+        return word_id
+
+    def add(self, word: str, info: Mapping[str, Any]) -> None:
+        """Recompiles a word after it was added or changed."""
+        self.add_many({word: info})
+
+    def add_many(self, records: Mapping[str, Mapping[str, Any]]) -> None:
+        with self._lock:
+            for word, info in records.items():
+                self._append(word, fingerprint(info), compile_word(word, info))
+        if self.index is not None:
+            self.index.add_many(records)
+
+    def remove(self, word: str) -> None:
+        with self._lock:
+            word_id = self.ids.get(word)
+            if word_id is not None and self.count[word_id]:
+                self._drop(word_id)
+                self.dirty = True
+        if self.index is not None:
+            self.index.remove(word)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+            self.dirty = True
+        if self.index is not None:
+            self.index.clear()
+
+    def _current(self, word: str) -> Optional[int]:
+        """The id of a word's block, compiling it first if missing or out of date."""
+        info = self.words.get(word)
+        if info is None:
+            return None
+        crc = fingerprint(info)
+        word_id = self.ids.get(word)
+        if word_id is None or self.crcs[word_id] != crc:
+            word_id = self._append(word, crc, compile_word(word, info))
+        return word_id
+
+    def build(self, max_workers: Optional[int] = None, cancelled: Callable[[], bool] = lambda: False,
+              progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """Compiles every deck word missing from the bank; returns how many were compiled.
+
+        Big decks are compiled on a process pool with a few chunks in flight at
+        a time. Safe to run on a worker thread while the quiz uses the bank.
+        """
+        missing = [word for word in list(self.words) if word not in self.ids]
+        chunks = self._chunks(missing)
+        if len(missing) <= INLINE_LIMIT or (max_workers or os.cpu_count() or 1) < 2:
+            for chunk in chunks:
+                if cancelled():
+                    break
+                self._merge(compile_chunk(chunk))
+        else:
+            done = 0
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                window = (max_workers or os.cpu_count() or 1) * 2
+                pending = set()
+                for chunk in chunks:
+                    if cancelled():
+                        break
+                    pending.add(executor.submit(compile_chunk, chunk))
+                    if len(pending) >= window:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            done += self._merge(future.result())
+                        if progress is not None:
+                            progress(done, len(missing))
+                for future in pending:
+                    if not cancelled():
+                        self._merge(future.result())
+                    else:
+                        future.cancel()
+        if self.index is not None and not cancelled():
+            self.index.build(self.words, cancelled, progress)
+        if not cancelled():
+            self.built = True
+        return len(missing)
+
+    def _chunks(self, words: List[str]) -> Iterable[List[Tuple[str, Mapping[str, Any]]]]:
+        for i in range(0, len(words), CHUNK_SIZE):
+            items = []
+            for word in words[i:i + CHUNK_SIZE]:
+                info = self.words.get(word)
+                if info is not None:
+                    items.append((word, info))
+            yield items
+
+    def _merge(self, compiled) -> int:
+        with self._lock:
+            for word, crc, questions in compiled:
+                # Words compiled (or deleted) on the GUI thread meanwhile stay as they are
+                if word not in self.ids and word in self.words:
+                    self._append(word, crc, questions)
+        return len(compiled)
+
+    def _alive(self, q: int) -> bool:
+        word_id = self.q_word[q]
+        return word_id != DEAD and self.names[word_id] in self.words
+
+    def _distractors(self, q: int, n: int) -> List[str]:
+        kind = self.q_kind[q]
+        word_id = self.q_word[q]
+        start = self.start[word_id]
+        block = range(start, start + self.count[word_id])
+        # Other answers of the same kind for this word would be right too
+        taken = {self.texts[self.q_answer[other]] for other in block if self.q_kind[other] == kind}
+        if kind != MEANING:
+            # Any listed synonym or antonym could pass for a right answer, not only those asked about
+            info = self.words.get(self.names[word_id]) or {}
+            for field in ("synonyms", "antonyms"):
+                taken.update(text.strip().lower() for text in info.get(field) or [] if text)
+        found: List[str] = []
+        if self.index is not None and kind in HARD_KINDS:
+            found = self._similar(word_id, kind, n, taken)
+        # Words are drawn from definition questions, whose answer is their word
+        pool = self.by_kind[MEANING if kind == MEANING else DEFINITION]
+        for _ in range(n * DISTRACTOR_TRIES):
+            if len(found) == n or not pool:
+                break
+            other = pool[self.random.randrange(len(pool))]
+            answer = self.texts[self.q_answer[other]]
+            if answer in taken or self.q_word[other] == word_id or not self._alive(other):
+                continue
+            taken.add(answer)
+            found.append(answer)
+        return found
+
+    def _similar(self, word_id: int, kind: int, n: int, taken: set) -> List[str]:
+        """Up to n answers from the words closest in meaning: their definition for meaning questions, else the word."""
+        similar = self.index.neighbours(self.names[word_id], HARD_POOL)
+        self.random.shuffle(similar)
+        found: List[str] = []
+        for other in similar:
+            if len(found) == n:
+                break
+            if kind == MEANING:
+                other_id = self._current(other)
+                if other_id is None:
+                    continue
+                start = self.start[other_id]
+                answer = next((self.texts[self.q_answer[q]] for q in range(start, start + self.count[other_id])
+                               if self.q_kind[q] == MEANING), None)
+            else:
+                answer = other if other in self.words else None
+            if answer is None or answer in taken:
+                continue
+            taken.add(answer)
+            found.append(answer)
+        return found
+
+    def question(self, word: str, options: int = 4) -> Optional[Question]:
+        """A random question about word with shuffled options, or None if it has none."""
+        with self._lock:
+            word_id = self._current(word)
+            if word_id is None or not self.count[word_id]:
+                return None
+            start = self.start[word_id]
+            block = range(start, start + self.count[word_id])
+            # Pick the kind first, so a word with many synonyms is not asked only those
+            kind = self.random.choice(sorted({self.q_kind[q] for q in block}))
+            q = self.random.choice([q for q in block if self.q_kind[q] == kind])
+            answer = self.texts[self.q_answer[q]]
+            choices = [answer] + self._distractors(q, options - 1)
+            self.random.shuffle(choices)
+            return Question(kind, word, self.texts[self.q_prompt[q]], choices, choices.index(answer))
+
+    def random_words(self, n: int, exclude: str = "") -> List[str]:
+        """Up to n distinct deck words other than exclude, sampled in O(n).
+
+        With a distractor index, words close in meaning to exclude come first.
+        """
+        with self._lock:
+            pool = self.by_kind[DEFINITION]
+            found: List[str] = []
+            if self.index is not None and exclude:
+                similar = [word for word in self.index.neighbours(exclude, HARD_POOL) if word in self.words]
+                found = self.random.sample(similar, min(n, len(similar)))
+            for _ in range(n * DISTRACTOR_TRIES):
+                if len(found) == n or not pool:
+                    break
+                q = pool[self.random.randrange(len(pool))]
+                if not self._alive(q):
+                    continue
+                word = self.names[self.q_word[q]]
+                if word != exclude and word not in found:
+                    found.append(word)
+            return found
@@ -1,23 +1,52 @@
-import random
-from typing import List, Dict
+import time
+from typing import List, Dict, Optional
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, 
                               QHBoxLayout , QPushButton, 
                               QLabel, QRadioButton, QButtonGroup)
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QThreadPool
+from AnswerLog import AnswerLog
+from LookupWorker import QuestionBankTask
+from Metrics import metrics
+from QuestionBank import QuestionBank, Question, MEANING, DEFINITION, SYNONYM, ANTONYM, CLOZE
+
+# What the user is asked for each kind of question
+INSTRUCTIONS = {
+    MEANING: "What does this word mean?",
+    DEFINITION: "Which word has this meaning?",
+    SYNONYM: "Which word means the same as this word?",
+    ANTONYM: "Which word means the opposite of this word?",
+    CLOZE: "Which word fills the blank?",
+}
 
 class QuizWindow(QMainWindow):
-    def __init__(self, learned_words):
+    """Multiple-choice quiz that asks the words the review scheduler says are due.
+
+    Questions come from the deck's precompiled QuestionBank; words it does not
+    cover yet are compiled when asked while the rest is built in the background.
+    """
+    def __init__(self, learned_words, scheduler, question_bank: Optional[QuestionBank] = None,
+                 answer_log: Optional[AnswerLog] = None):
         super().__init__()
         self.setWindowTitle("Vocabulary Quiz")
         self.setMinimumSize(900, 600)  # Made taller for additional info
         self.setMaximumSize(1260,720)
         self.learned_words = learned_words
-        self.wordsToLearn = self.learned_words.copy()
+        self.scheduler = scheduler
+        self.question_bank = question_bank if question_bank is not None else QuestionBank(learned_words)
+        # Every answer is logged for the statistics window
+        self.answer_log = answer_log
+        self.asked_at = 0.0
         self.current_word = None
+        self.question: Optional[Question] = None
+        self.answered = True
         self.correct_answer = None
+        self.build_pool = QThreadPool(self)
+        self.build_pool.setMaxThreadCount(1)
+        self.build_task: Optional[QuestionBankTask] = None
         
         # Set up the UI
         self.setup_ui()
+        self.build_question_bank()
         
         # Start the first question
         self.next_question()
@@ -31,9 +60,14 @@ class QuizWindow(QMainWindow):
         self.score_label = QLabel("Score: 0/0")
         layout.addWidget(self.score_label)
         
-        # Create word display
+        # Create question display
+        self.kind_label = QLabel()
+        self.kind_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.kind_label)
+        
         self.word_label = QLabel()
         self.word_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.word_label.setWordWrap(True)
         self.word_label.setStyleSheet("font-size: 24px; font-weight: bold; margin: 20px;")
         layout.addWidget(self.word_label)
         
@@ -84,49 +118,113 @@ class QuizWindow(QMainWindow):
         self.correct_count = 0
         self.total_questions = 0
     
+    def build_question_bank(self):
+        """Compiles the words missing from the question bank on a worker thread."""
+        if self.question_bank.built:
+            return
+        task = QuestionBankTask(self.question_bank)
+        task.signals.finished.connect(lambda bank, error: self.on_bank_built(task, error))
+        self.build_task = task
+        self.build_pool.start(task)
+
+    def on_bank_built(self, task: QuestionBankTask, error):
+        if task is not self.build_task:
+            return
+        self.build_task = None
+        if error is not None:
+            self.statusBar().showMessage(f"Could not prepare all questions: {error}", 5000)
+
+    def cancel_build(self):
+        if self.build_task is not None:
+            self.build_task.cancel()
+            self.build_task = None
+
+    def put_back_unanswered(self):
+        """Returns the card on screen to the scheduler if it was not answered."""
+        if not self.answered and self.current_word:
+            self.scheduler.skip(self.current_word)
+            self.answered = True
+
+    def on_deck_changed(self, deck):
+        """Continues the quiz with another deck's words and review schedule."""
+        self.cancel_build()
+        self.put_back_unanswered()
+        self.learned_words = deck.words
+        self.scheduler = deck.get_scheduler()
+        self.question_bank = deck.get_question_bank()
+        self.answer_log = deck.get_answer_log()
+        self.build_question_bank()
+        self.answered = True
+        self.correct_count = 0
+        self.total_questions = 0
+        self.score_label.setText("Score: 0/0")
+        self.setWindowTitle(f"Vocabulary Quiz - {deck.name}")
+        self.next_question()
+
+    def on_word_removed(self, word: str):
+        """Moves on if the word being asked was deleted from the deck."""
+        if word == self.current_word and not self.answered:
+            # Nothing to put back
+            self.answered = True
+            self.next_question()
+
     def get_random_words(self, exclude_word: str) -> List[str]:
         """Get random words from learned words, excluding the current word."""
-        available_words = [word for word in self.wordsToLearn.keys() if word != exclude_word]
-        return random.sample(available_words, min(3, len(available_words)))
+        return self.question_bank.random_words(3, exclude_word)
     
+    @metrics.timed("quiz_question_seconds")
     def next_question(self):
         """Set up the next quiz question."""
         # Clear previous result and word info
         self.result_label.clear()
         self.word_info.hide()
         
-        if len(self.wordsToLearn) < 4:
+        if len(self.learned_words) < 4:
             self.result_label.setText("Please learn at least 4 words before taking the quiz!")
             self.close()
             return
         
-        # Select a random word
-        self.current_word = random.choice(list(self.wordsToLearn.keys()))
-        self.word_label.setText(self.current_word)
-        
-        # Get the correct definition
-        correct_definition = self.learned_words[self.current_word]["definition"][0]
+        # Put back a word that was skipped without answering
+        self.put_back_unanswered()
         
-        # Get wrong definitions from other random words
-        other_words = self.get_random_words(self.current_word)
-        wrong_definitions = [self.learned_words[word]["definition"][0] for word in other_words]
-        
-        # Create all options and shuffle them
-        all_options = [correct_definition] + wrong_definitions
-        random.shuffle(all_options)
+        # Select the next due word
+        self.current_word = self.scheduler.next_word()
+        if self.current_word is None:
+            self.kind_label.clear()
+            self.word_label.setText("All done!")
+            self.result_label.setText("No words are due for review right now. Come back later!")
+            self.submit_button.setEnabled(False)
+            self.answered = True
+            return
+        self.question = self.question_bank.question(self.current_word)
+        if self.question is None:
+            self.kind_label.clear()
+            self.word_label.setText(self.current_word)
+            self.result_label.setText(f"'{self.current_word}' has no definition to ask about.")
+            self.submit_button.setEnabled(False)
+            self.answered = True
+            return
+        self.answered = False
+        self.kind_label.setText(INSTRUCTIONS[self.question.kind])
+        # Definitions and example sentences are shown smaller than a single word
+        size = 24 if self.question.kind in (MEANING, SYNONYM, ANTONYM) else 18
+        self.word_label.setStyleSheet(f"font-size: {size}px; font-weight: bold; margin: 20px;")
+        self.word_label.setText(self.question.prompt)
         
         # Store the correct answer index
-        self.correct_answer = all_options.index(correct_definition)
+        self.correct_answer = self.question.correct
         
         self.options_group.setExclusive(False)
-        # Set the radio button texts
-        for i, option in enumerate(all_options):
-            self.option_buttons[i].setText(option)
-            self.options_group.buttons()[i].setChecked(False)
-            self.option_buttons[i].setChecked(False)
+        # Set the radio button texts; small decks may have fewer than 4 options
+        for i, button in enumerate(self.option_buttons):
+            button.setChecked(False)
+            button.setVisible(i < len(self.question.options))
+            if i < len(self.question.options):
+                button.setText(self.question.options[i])
         self.options_group.setExclusive(True)
         # Enable submit button
         self.submit_button.setEnabled(True)
+        self.asked_at = time.monotonic()
     
     def check_answer(self):
         """Check if the selected answer is correct."""
@@ -136,8 +234,19 @@ class QuizWindow(QMainWindow):
             self.result_label.setText("Please select an answer!")
             self.result_label.setStyleSheet("color: orange; font-size: 16px; margin: 10px;")
             return
+        if self.current_word not in self.learned_words:
+            # Deleted while on screen
+            self.answered = True
+            self.next_question()
+            return
         
         self.total_questions += 1
+        self.answered = True
+        correct = selected_answer == self.correct_answer
+        self.scheduler.review(self.current_word, correct)
+        if self.answer_log is not None:
+            self.answer_log.append(self.current_word, correct, time.monotonic() - self.asked_at,
+                                   self.question.kind)
         word_data = self.learned_words[self.current_word]
         definstr = ""
         for defin in word_data['definition']:
@@ -158,7 +267,6 @@ class QuizWindow(QMainWindow):
             self.correct_count += 1
             self.result_label.setText("✓ Correct!")
             self.result_label.setStyleSheet("color: green; font-size: 16px; margin: 10px;")
-            self.wordsToLearn.pop(self.current_word)
         else:
             self.result_label.setText("✗ Incorrect!")
             self.result_label.setStyleSheet("color: red; font-size: 16px; margin: 10px;")
@@ -167,4 +275,10 @@ class QuizWindow(QMainWindow):
         self.score_label.setText(f"Score: {self.correct_count}/{self.total_questions}")
         
         # Disable submit button until next question
-        self.submit_button.setEnabled(False)
\ No newline at end of file
+        self.submit_button.setEnabled(False)
+
+    def closeEvent(self, event):
+        # The compiled part is kept; the build resumes from there next time
+        self.cancel_build()
+        self.put_back_unanswered()
+        super().closeEvent(event)
@@ -0,0 +1,319 @@
+"""Records dictionary API responses and replays them from a local server.
+
+    # Capture real responses for a word list into a fixture archive
+    python ReplayServer.py record words.txt fixtures.json
+    # Serve the archive with 80 ms latency, 5% errors and at most 50 requests/s
+    python ReplayServer.py serve fixtures.json --latency 80 --error-rate 0.05 --rps 50
+    # Point the app at it, or drive the lookup path with a load test
+    LEARNWORDS_API_URL=http://127.0.0.1:8765 python main.py
+    python ReplayServer.py load words.txt --url http://127.0.0.1:8765 --workers 8
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote
+
+from WordClient import API_PATH
+
+DEFAULT_PORT = 8765
+# The body dictionaryapi.dev sends with a 404
+NOT_FOUND_BODY = {
+    "title": "No Definitions Found",
+    "message": "Sorry pal, we couldn't find definitions for the word you were looking for.",
+    "resolution": "You can try the search again at later time or head to the web instead.",
+}
+REASONS = {200: "OK", 404: "Not Found", 429: "Too Many Requests", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+
+class FixtureArchive:
+    """Recorded responses keyed by word, stored as one JSON file.
+
+    Each word maps to {"status": ..., "body": ...}. Files that map words
+    straight to response bodies (like benchmarks/fixtures/api_responses.json)
+    load as 200 responses.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.responses: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            for word, entry in json.loads(self.path.read_text(encoding="utf-8")).items():
+                if not (isinstance(entry, dict) and "status" in entry):
+                    entry = {"status": 200, "body": entry}
+                self.responses[word.lower()] = entry
+
+    def __len__(self) -> int:
+        return len(self.responses)
+
+    def get(self, word: str) -> Optional[Dict[str, Any]]:
+        return self.responses.get(word.lower())
+
+    def record(self, word: str, status: int, body: Any) -> None:
+        with self._lock:
+            self.responses[word.lower()] = {"status": status, "body": body}
+
+    def save(self) -> None:
+        with self._lock:
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps(self.responses, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(self.path)
+
+
+class AsyncTokenBucket:
+    """Throughput limit shared by all connections of the replay server."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            self.tokens = min(1.0, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                # Holding the lock while waiting keeps requests in arrival order
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.tokens = 1.0
+                self.updated = time.monotonic()
+            self.tokens -= 1
+
+
+class ReplayServer:
+    """Minimal asyncio HTTP/1.1 server that answers dictionary API requests from an archive.
+
+    Latency, errors and throughput are injected from a seeded random generator,
+    so a load test sees the same sequence of faults on every run.
+    """
+
+    def __init__(self, archive: FixtureArchive, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503, reset_rate: float = 0.0,
+                 rps: Optional[float] = None, seed: int = 0):
+        self.archive = archive
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.reset_rate = reset_rate
+        self.rps = rps
+        self.random = random.Random(seed)
+        self.limiter: Optional[AsyncTokenBucket] = None
+        self.stats = {"requests": 0, "ok": 0, "not_found": 0, "errors": 0, "resets": 0}
+        self.prefix = API_PATH.split("{}")[0]
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                path, keep_alive = request
+                if not await self._respond(writer, path, keep_alive) or not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, bool]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        parts = line.decode("latin-1").split()
+        keep_alive = len(parts) < 3 or parts[2] != "HTTP/1.0"
+        while True:
+            header = await reader.readline()
+            if header in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = header.decode("latin-1").partition(":")
+            if name.strip().lower() == "connection":
+                keep_alive = value.strip().lower() != "close"
+        return (parts[1] if len(parts) > 1 else "/"), keep_alive
+
+    async def _respond(self, writer: asyncio.StreamWriter, path: str, keep_alive: bool) -> bool:
+        """Writes one response; returns False when the connection was dropped on purpose."""
+        self.stats["requests"] += 1
+        if self.limiter is not None:
+            await self.limiter.acquire()
+        delay = self.latency + self.random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        roll = self.random.random()
+        if roll < self.reset_rate:
+            self.stats["resets"] += 1
+            writer.transport.abort()
+            return False
+        if roll < self.reset_rate + self.error_rate:
+            self.stats["errors"] += 1
+            status, body = self.error_status, {"title": "Injected error"}
+        else:
+            status, body = self._lookup(path)
+        payload = json.dumps(body).encode("utf-8")
+        headers = [f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}",
+                   "Content-Type: application/json",
+                   f"Content-Length: {len(payload)}",
+                   f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if status == 429:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + payload)
+        await writer.drain()
+        return True
+
+    def _lookup(self, path: str) -> Tuple[int, Any]:
+        if not path.startswith(self.prefix):
+            self.stats["not_found"] += 1
+            return 404, NOT_FOUND_BODY
+        entry = self.archive.get(unquote(path[len(self.prefix):].split("?")[0]))
+        if entry is None or entry["status"] == 404:
+            self.stats["not_found"] += 1
+            return 404, NOT_FOUND_BODY
+        self.stats["ok"] += 1
+        return entry["status"], entry["body"]
+
+    async def serve(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                    ready: Optional[threading.Event] = None) -> None:
+        if self.rps:
+            self.limiter = AsyncTokenBucket(self.rps)
+        server = await asyncio.start_server(self.handle, host, port)
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+    def start_in_thread(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> threading.Thread:
+        """Runs the server on a daemon thread, e.g. from a benchmark script.
+
+        Returns once the server listens; raises the error if it could not start
+        (e.g. the port is taken).
+        """
+        ready = threading.Event()
+        errors: List[BaseException] = []
+
+        def run():
+            try:
+                asyncio.run(self.serve(host, port, ready))
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                ready.set()
+
+        thread = threading.Thread(target=run, name="replay-server", daemon=True)
+        thread.start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+        return thread
+
+
+def read_word_list(path) -> List[str]:
+    from Lexicon import read_words
+    return list(dict.fromkeys(word.strip().lower() for word in read_words(path) if word.strip()))
+
+
+def record(words: Iterable[str], archive: FixtureArchive, base_url: Optional[str] = None) -> int:
+    """Fetches every word from the real API (no response cache) into the archive."""
+    from WordClient import WordClient
+    client = WordClient(cache=None, base_url=base_url, recorder=archive)
+    failed = 0
+    for word, result in client.get_many(words):
+        if isinstance(result, Exception) and not isinstance(result, ValueError):
+            failed += 1
+            print(f"{word}: {result}", file=sys.stderr)
+    client.close()
+    archive.save()
+    return failed
+
+
+def load_test(words: List[str], base_url: str, workers: int, rate: float, cache_path: Optional[str]) -> Dict:
+    """Resolves a word list through WordClient against base_url and reports throughput and latency."""
+    from Metrics import metrics
+    from WordCache import WordCache
+    from WordClient import WordClient
+    cache = WordCache(cache_path) if cache_path else None
+    client = WordClient(cache=cache, max_workers=workers, rate=rate, burst=workers, base_url=base_url)
+    outcomes = {"ok": 0, "not_found": 0, "failed": 0}
+    start = time.perf_counter()
+    for _, result in client.get_many(words):
+        if isinstance(result, ValueError):
+            outcomes["not_found"] += 1
+        elif isinstance(result, Exception):
+            outcomes["failed"] += 1
+        else:
+            outcomes["ok"] += 1
+    elapsed = time.perf_counter() - start
+    client.close()
+    snapshot = metrics.snapshot()
+    return {
+        "words": len(words),
+        "seconds": elapsed,
+        "words_per_second": len(words) / elapsed if elapsed else 0.0,
+        "outcomes": outcomes,
+        "counters": snapshot["counters"],
+        "api_request_seconds": snapshot["histograms"].get("api_request_seconds"),
+        "cache": cache.stats() if cache is not None else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="capture real API responses into an archive")
+    record_parser.add_argument("words", help="word list (.txt, .json deck or offline pack)")
+    record_parser.add_argument("archive")
+    record_parser.add_argument("--url", help="API base URL to record from (default: the public API)")
+
+    serve_parser = commands.add_parser("serve", help="replay an archive over HTTP")
+    serve_parser.add_argument("archive")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--latency", type=float, default=0.0, help="added latency in ms")
+    serve_parser.add_argument("--jitter", type=float, default=0.0, help="latency jitter in ms (+/-)")
+    serve_parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing")
+    serve_parser.add_argument("--error-status", type=int, default=503)
+    serve_parser.add_argument("--reset-rate", type=float, default=0.0,
+                              help="share of connections dropped without a response")
+    serve_parser.add_argument("--rps", type=float, help="maximum requests per second")
+    serve_parser.add_argument("--seed", type=int, default=0)
+
+    load_parser = commands.add_parser("load", help="resolve a word list against a server")
+    load_parser.add_argument("words")
+    load_parser.add_argument("--url", default=f"http://127.0.0.1:{DEFAULT_PORT}")
+    load_parser.add_argument("--workers", type=int, default=8)
+    load_parser.add_argument("--rate", type=float, default=1000.0, help="client-side requests per second")
+    load_parser.add_argument("--cache", help="response cache file to use (default: no cache)")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        archive = FixtureArchive(args.archive)
+        words = read_word_list(args.words)
+        failed = record(words, archive, args.url)
+        print(f"Recorded {len(words) - failed} of {len(words)} words into {archive.path} ({len(archive)} total)")
+    elif args.command == "serve":
+        archive = FixtureArchive(args.archive)
+        server = ReplayServer(archive, latency=args.latency / 1000, jitter=args.jitter / 1000,
+                              error_rate=args.error_rate, error_status=args.error_status,
+                              reset_rate=args.reset_rate, rps=args.rps, seed=args.seed)
+        print(f"Serving {len(archive)} words on http://{args.host}:{args.port}", file=sys.stderr)
+        try:
+            asyncio.run(server.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            print(json.dumps(server.stats), file=sys.stderr)
+    else:
+        print(json.dumps(load_test(read_word_list(args.words), args.url, args.workers, args.rate, args.cache),
+                         indent=1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import heapq
+import sqlite3
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+DAY = 24 * 3600
+# Failed cards come back after this many seconds
+RELEARN_DELAY = 60
+# Cards due within this window may be shown early when nothing else is due
+LEARN_AHEAD = 20 * 60
+
+
+class Card:
+    __slots__ = ("ease", "interval", "reps", "lapses", "due", "correct", "total")
+
+    def __init__(self, ease=2.5, interval=0.0, reps=0, lapses=0, due=0.0, correct=0, total=0):
+        self.ease = ease
+        self.interval = interval
+        self.reps = reps
+        self.lapses = lapses
+        self.due = due
+        self.correct = correct
+        self.total = total
+
+
+class ReviewScheduler:
+    """SM-2 spaced-repetition scheduler with a persistent per-word state.
+
+    Reviewed cards sit in a heap ordered by due time, so the next due card is
+    found in O(log N). Words that have never been reviewed are handed out in
+    deck order after the due cards, without being loaded up front; words
+    learned while the scheduler is open are passed to add() and offered after
+    them.
+    """
+
+    def __init__(self, path, words: Mapping):
+        self.path = Path(path)
+        self.words = words
+        self.cards: Dict[str, Card] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._conn = sqlite3.connect(str(self.path))
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cards ("
+                " word TEXT PRIMARY KEY, ease REAL, interval REAL, reps INTEGER,"
+                " lapses INTEGER, due REAL, correct INTEGER, total INTEGER)"
+            )
+        for row in self._conn.execute(
+                "SELECT word, ease, interval, reps, lapses, due, correct, total FROM cards"):
+            self.cards[row[0]] = Card(*row[1:])
+            self._heap.append((row[5], row[0]))
+        heapq.heapify(self._heap)
+        self._new_words = self._iter_new()
+        # Words added to the deck since it was scanned, oldest first
+        self._added: deque = deque()
+        # New words that were shown but never answered
+        self._skipped_new: List[str] = []
+
+    def _iter_new(self) -> Iterator[str]:
+        for word in list(self.words):
+            if word not in self.cards:
+                yield word
+
+    def _next_new(self) -> Optional[str]:
+        for word in self._new_words:
+            if word in self.words and word not in self.cards:
+                return word
+        while self._added:
+            word = self._added.popleft()
+            if word in self.words and word not in self.cards:
+                return word
+        return None
+
+    def add(self, word: str) -> None:
+        """Offers a word stored in the deck after it was opened, once it is due as a new word."""
+        if word not in self.cards:
+            self._added.append(word)
+
+    def _valid(self, due: float, word: str) -> bool:
+        """Heap entries go stale when a card is rescheduled or its word is deleted."""
+        card = self.cards.get(word)
+        return card is not None and card.due == due and word in self.words
+
+    def next_word(self, now: Optional[float] = None) -> Optional[str]:
+        """Returns the next word to quiz, or None if nothing is due."""
+        now = time.time() if now is None else now
+        heap = self._heap
+        while heap and not self._valid(*heap[0]):
+            heapq.heappop(heap)
+        if heap and heap[0][0] <= now:
+            return heapq.heappop(heap)[1]
+        while self._skipped_new:
+            word = self._skipped_new.pop()
+            if word in self.words and word not in self.cards:
+                return word
+        word = self._next_new()
+        if word is not None:
+            return word
+        if heap and heap[0][0] <= now + LEARN_AHEAD:
+            return heapq.heappop(heap)[1]
+        return None
+
+    def skip(self, word: str) -> None:
+        """Puts back a word returned by next_word that was not answered."""
+        card = self.cards.get(word)
+        if card is None:
+            self._skipped_new.append(word)
+        else:
+            heapq.heappush(self._heap, (card.due, word))
+
+    def review(self, word: str, correct: bool, now: Optional[float] = None) -> Card:
+        """Updates a word's card after an answer and puts it back in the queue."""
+        now = time.time() if now is None else now
+        card = self.cards.get(word) or Card()
+        quality = 4 if correct else 1
+        if correct:
+            if card.reps == 0:
+                card.interval = 1
+            elif card.reps == 1:
+                card.interval = 6
+            else:
+                card.interval = round(card.interval * card.ease)
+            card.reps += 1
+            card.due = now + card.interval * DAY
+        else:
+            card.reps = 0
+            card.interval = 0
+            card.lapses += 1
+            card.due = now + RELEARN_DELAY
+        card.ease = max(1.3, card.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        card.correct += int(correct)
+        card.total += 1
+        self.cards[word] = card
+        heapq.heappush(self._heap, (card.due, word))
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cards VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (word, card.ease, card.interval, card.reps, card.lapses,
+                 card.due, card.correct, card.total),
+            )
+        return card
+
+    def accuracy(self, word: str) -> Optional[float]:
+        card = self.cards.get(word)
+        if card is None or card.total == 0:
+            return None
+        return card.correct / card.total
+
+    def close(self) -> None:
+        self._conn.close()
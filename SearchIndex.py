@@ -0,0 +1,215 @@
+import bisect
+import heapq
+import math
+import re
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+QUERY_RE = re.compile(r'"([^"]*)"?|(\S+)')
+
+# How much a match in each record field counts towards a word's score
+FIELD_WEIGHTS = {
+    "word": 4.0,
+    "definition": 2.0,
+    "synonyms": 1.5,
+    "antonyms": 1.5,
+    "examples": 1.0,
+}
+# A lone prefix stops expanding once this many postings have been merged
+MAX_PREFIX_POSTINGS = 5000
+# Postings longer than this keep a cached list of their best-scoring words
+TOP_CACHE_SIZE = 200
+# With a prefix, terms found in more than this share of words are probed rather than walked
+COMMON_TERM_RATIO = 0.5
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def field_texts(word: str, info: Mapping[str, Any]) -> Iterable[Tuple[str, str]]:
+    yield "word", word
+    for field in ("definition", "synonyms", "antonyms", "examples"):
+        for text in info.get(field, []):
+            yield field, text
+
+
+class SearchIndex:
+    """In-memory inverted index over learned words and their records.
+
+    Each term maps to the words containing it with a field-weighted term
+    frequency. Queries match all terms (the last one as a prefix while the user
+    is still typing), quoted phrases are checked against the record text of the
+    remaining candidates, and results are ranked by weighted tf-idf. add() and
+    remove() keep the index in step with the deck; add_many() indexes a batch
+    and sorts the term list once.
+    """
+
+    def __init__(self, words: Optional[Mapping[str, Mapping[str, Any]]] = None):
+        self.words = words
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.doc_terms: Dict[str, Set[str]] = {}
+        # Sorted list of all terms, used for prefix expansion
+        self.terms: List[str] = []
+        self.top_cache: Dict[str, List[Tuple[str, float]]] = {}
+        if words is not None:
+            self.add_many(words.items())
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    def add(self, word: str, info: Mapping[str, Any]) -> None:
+        self._add(word, info, None)
+
+    def add_many(self, items: Iterable[Tuple[str, Mapping[str, Any]]]) -> None:
+        """Indexes (word, record) pairs; each word at most once per call."""
+        new_terms: List[str] = []
+        for word, info in items:
+            self._add(word, info, new_terms)
+        if new_terms:
+            self.terms += new_terms
+            self.terms.sort()
+
+    def _add(self, word: str, info: Mapping[str, Any], new_terms: Optional[List[str]]) -> None:
+        """Indexes one word; new terms go to new_terms for the caller to sort in, or are inserted."""
+        if word in self.doc_terms:
+            self.remove(word)
+        weights: Dict[str, float] = {}
+        for field, text in field_texts(word, info):
+            weight = FIELD_WEIGHTS[field]
+            for term in tokenize(text):
+                weights[term] = weights.get(term, 0.0) + weight
+        for term, weight in weights.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = {}
+                if new_terms is None:
+                    bisect.insort(self.terms, term)
+                else:
+                    new_terms.append(term)
+            posting[word] = weight
+            self.top_cache.pop(term, None)
+        self.doc_terms[word] = set(weights)
+
+    def remove(self, word: str) -> None:
+        for term in self.doc_terms.pop(word, ()):
+            posting = self.postings[term]
+            del posting[word]
+            self.top_cache.pop(term, None)
+            if not posting:
+                del self.postings[term]
+                del self.terms[bisect.bisect_left(self.terms, term)]
+
+    def clear(self) -> None:
+        self.postings.clear()
+        self.doc_terms.clear()
+        self.terms.clear()
+        self.top_cache.clear()
+
+    def _idf(self, posting: Mapping[str, float]) -> float:
+        return math.log(1 + len(self.doc_terms) / len(posting))
+
+    def _prefix_score(self, word: str, prefix: str) -> Optional[float]:
+        """Best score among a word's terms that start with prefix, or None."""
+        best = None
+        for term in self.doc_terms[word]:
+            if term.startswith(prefix):
+                posting = self.postings[term]
+                score = posting[word] * self._idf(posting)
+                if best is None or score > best:
+                    best = score
+        return best
+
+    def _top(self, term: str) -> List[Tuple[str, float]]:
+        """The highest-weighted words of a large posting, cached until the posting changes."""
+        top = self.top_cache.get(term)
+        if top is None:
+            top = heapq.nlargest(TOP_CACHE_SIZE, self.postings[term].items(), key=itemgetter(1))
+            self.top_cache[term] = top
+        return top
+
+    def _prefix_scores(self, prefix: str) -> Dict[str, float]:
+        """Scores words for a prefix, expanding it to a bounded number of postings."""
+        scores: Dict[str, float] = {}
+        budget = MAX_PREFIX_POSTINGS
+        start = bisect.bisect_left(self.terms, prefix)
+        for term in self.terms[start:]:
+            if not term.startswith(prefix) or budget <= 0:
+                break
+            posting = self.postings[term]
+            idf = self._idf(posting)
+            entries = posting.items() if len(posting) <= TOP_CACHE_SIZE else self._top(term)
+            budget -= len(entries)
+            for word, weight in entries:
+                score = weight * idf
+                if score > scores.get(word, 0.0):
+                    scores[word] = score
+        return scores
+
+    def search(self, query: str, limit: int = 50) -> List[Tuple[str, float]]:
+        """Returns (word, score) pairs for words matching every query term."""
+        terms: List[str] = []
+        phrases: List[re.Pattern] = []
+        prefix = None
+        tokens = QUERY_RE.findall(query)
+        still_typing = bool(query) and not query[-1].isspace() and not query.endswith('"')
+        for phrase, plain in tokens:
+            if phrase:
+                phrase_terms = tokenize(phrase)
+                terms.extend(phrase_terms)
+                if len(phrase_terms) > 1:
+                    phrases.append(re.compile(r"\b" + r"[^a-z0-9]+".join(phrase_terms) + r"\b"))
+            else:
+                terms.extend(tokenize(plain))
+        if still_typing and tokens and not tokens[-1][0] and terms:
+            prefix = terms.pop()
+        if not terms and prefix is None:
+            # Nothing searchable, e.g. a lone "-" or '"'
+            return []
+
+        postings = []
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                return []
+            postings.append((term, posting, self._idf(posting)))
+        if len(postings) == 1 and prefix is None and not phrases:
+            # A single term: its idf is the same for every word, so rank by weight alone
+            term, posting, idf = postings[0]
+            top = self._top(term) if limit <= TOP_CACHE_SIZE else posting.items()
+            return [(word, weight * idf) for word, weight in heapq.nlargest(limit, top, key=itemgetter(1))]
+
+        # Walk the rarest posting and probe the others, so large postings are never copied
+        probes = sorted(((posting, idf) for _, posting, idf in postings), key=lambda item: len(item[0]))
+        if probes and (prefix is None or len(probes[0][0]) <= len(self.doc_terms) * COMMON_TERM_RATIO):
+            base_posting, base_idf = probes.pop(0)
+            base = ((word, weight * base_idf) for word, weight in base_posting.items())
+        else:
+            # Only near-universal terms besides the prefix: start from the prefix's candidates instead
+            base = self._prefix_scores(prefix).items()
+            prefix = None
+
+        scores: Dict[str, float] = {}
+        for word, score in base:
+            for posting, idf in probes:
+                other = posting.get(word)
+                if other is None:
+                    break
+                score += other * idf
+            else:
+                if prefix is not None:
+                    prefix_score = self._prefix_score(word, prefix)
+                    if prefix_score is None:
+                        continue
+                    score += prefix_score
+                if phrases and not self._has_phrases(word, phrases):
+                    continue
+                scores[word] = score
+        return heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+
+    def _has_phrases(self, word: str, phrases: List[re.Pattern]) -> bool:
+        """Checks that the word's record contains every quoted phrase."""
+        info = self.words[word] if self.words is not None else {}
+        texts = [text.lower() for _, text in field_texts(word, info)]
+        return all(any(pattern.search(text) for text in texts) for pattern in phrases)
@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PySide6.QtCore import QObject, QUrl, Signal
+
+from Metrics import metrics
+
+
+class AudioStore:
+    """Content-addressed on-disk store for downloaded pronunciation audio.
+
+    Files are named by the SHA-256 of their bytes, so two URLs with the same
+    recording share a file. An index maps URLs to hashes; when the store grows
+    past max_bytes the least recently played files are removed, never the one
+    just stored.
+    """
+
+    def __init__(self, root="audio_cache", max_bytes: int = 50 * 1024 * 1024):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.index_file = self.root / "index.json"
+        self.index: Dict[str, str] = {}
+        if self.index_file.exists():
+            try:
+                self.index = json.loads(self.index_file.read_text())
+            except json.JSONDecodeError:
+                pass
+
+    def _blob(self, digest: str, url: str) -> Path:
+        suffix = Path(url.split("?")[0]).suffix or ".mp3"
+        return self.root / f"{digest}{suffix}"
+
+    def get(self, url: str) -> Optional[Path]:
+        """Returns the cached file for a URL and marks it as recently used."""
+        digest = self.index.get(url)
+        if digest is None:
+            return None
+        path = self._blob(digest, url)
+        if not path.exists():
+            return None
+        os.utime(path)
+        return path
+
+    def put(self, url: str, data: bytes) -> Path:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob(digest, url)
+        if not path.exists():
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        else:
+            # Already stored for another URL; now it is the most recently used
+            os.utime(path)
+        self.index[url] = digest
+        self._evict(keep=path)
+        self.index_file.write_text(json.dumps(self.index))
+        return path
+
+    def _evict(self, keep: Path) -> None:
+        """Removes the least recently used files, except keep, until the store fits in max_bytes."""
+        files = [p for p in self.root.iterdir() if p != self.index_file and not p.name.endswith(".tmp")]
+        total = sum(p.stat().st_size for p in files)
+        if total <= self.max_bytes:
+            return
+        for path in sorted(files, key=lambda p: p.stat().st_mtime):
+            if path == keep:
+                continue
+            total -= path.stat().st_size
+            path.unlink()
+            if total <= self.max_bytes:
+                break
+        digests = {p.stem for p in self.root.iterdir()}
+        self.index = {url: digest for url, digest in self.index.items() if digest in digests}
+
+
+class PronunciationPlayer(QObject):
+    """Speaks words without blocking the GUI thread.
+
+    Requests go to a single worker thread. Only the latest request is kept, and
+    a new request interrupts whatever is playing. Recorded pronunciations (the
+    Phonetic.audio URLs) are downloaded once into an AudioStore and played with
+    QtMultimedia; text to speech is used when no recording is available.
+    """
+    playFile = Signal(str)
+    stopPlayback = Signal()
+
+    def __init__(self, parent=None, audio_store: Optional[AudioStore] = None, rate: int = 130):
+        super().__init__(parent)
+        self.store = audio_store or AudioStore()
+        self.rate = rate
+        self._pending: Optional[Tuple[str, List[str]]] = None
+        self._cond = threading.Condition()
+        self._interrupt = threading.Event()
+        self._stopped = False
+        self._player = None
+        self.playFile.connect(self._play_file)
+        self.stopPlayback.connect(self._stop_file)
+        self._thread = threading.Thread(target=self._run, name="speech", daemon=True)
+        self._thread.start()
+
+    def speak(self, word: str, audio_urls: Optional[List[str]] = None) -> None:
+        """Queues a word, replacing any request that has not started yet."""
+        with self._cond:
+            self._pending = (word, list(audio_urls or []))
+            self._interrupt.set()
+            self._cond.notify()
+        self.stopPlayback.emit()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._pending = None
+            self._interrupt.set()
+            self._cond.notify()
+        self.stopPlayback.emit()
+
+    def _run(self) -> None:
+        engine = None
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                word, urls = self._pending
+                self._pending = None
+                self._interrupt.clear()
+            with metrics.time("speech_prepare_seconds"):
+                path = self._recorded_audio(word, urls)
+            if path is not None:
+                metrics.count("speech_recorded")
+                self.playFile.emit(str(path))
+                continue
+            metrics.count("speech_tts")
+            # The TTS engine is created and used only on this thread
+            if engine is None:
+                with metrics.time("speech_tts_init_seconds"):
+                    import pyttsx3
+                    engine = pyttsx3.init()
+                    engine.setProperty("rate", self.rate)
+            with metrics.time("speech_tts_seconds"):
+                self._say(engine, word)
+
+    def _recorded_audio(self, word: str, urls: List[str]) -> Optional[Path]:
+        """Finds a cached recording, downloading it on first use."""
+        if not urls:
+            try:
+                from Word import Word
+                entry = Word.shared_client().get(word)
+            except Exception:
+                return None
+            urls = [p["audio"] for p in entry.get("phonetics", []) if p.get("audio")]
+        for url in urls:
+            path = self.store.get(url)
+            if path is not None:
+                return path
+        for url in urls:
+            try:
+                from Word import Word
+                with metrics.time("audio_download_seconds"):
+                    response = Word.shared_client().session.get(url, timeout=10)
+            except Exception:
+                continue
+            if response.status_code == 200 and response.content:
+                return self.store.put(url, response.content)
+        return None
+
+    def _say(self, engine, word: str) -> None:
+        engine.say(word)
+        engine.startLoop(False)
+        try:
+            while engine.isBusy() and not self._interrupt.is_set():
+                engine.iterate()
+                time.sleep(0.01)
+            if self._interrupt.is_set():
+                engine.stop()
+        finally:
+            engine.endLoop()
+
+    def _play_file(self, path: str) -> None:
+        # Runs on the GUI thread; QMediaPlayer plays asynchronously
+        if self._player is None:
+            from PySide6.QtMultimedia import QAudioOutput, QMediaPlayer
+            self._player = QMediaPlayer(self)
+            self._audio_output = QAudioOutput(self)
+            self._player.setAudioOutput(self._audio_output)
+        self._player.stop()
+        self._player.setSource(QUrl.fromLocalFile(path))
+        self._player.play()
+
+    def _stop_file(self) -> None:
+        if self._player is not None:
+            self._player.stop()
@@ -0,0 +1,49 @@
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+# Time from process start to the first painted window we aim to stay under
+STARTUP_BUDGET = 1.0
+
+
+class StartupProfile:
+    """Collects named timings during startup and reports them with --startup-profile."""
+
+    def __init__(self):
+        self.enabled = False
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.steps: List[Tuple[str, float]] = []
+
+    def mark(self, label: str) -> None:
+        """Records the time spent since the previous mark."""
+        now = time.perf_counter()
+        self.steps.append((label, now - self.last))
+        self.last = now
+
+    @contextmanager
+    def measure(self, label: str):
+        """Times a block, e.g. the first lazy import of a subsystem."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((label, time.perf_counter() - start))
+            if self.enabled:
+                print(f"[startup-profile] {label}: {(time.perf_counter() - start) * 1000:.1f} ms",
+                      file=sys.stderr)
+
+    def total(self) -> float:
+        return self.last - self.start
+
+    def report(self) -> str:
+        lines = [f"{label:<32}{seconds * 1000:>9.1f} ms" for label, seconds in self.steps]
+        total = self.total()
+        verdict = "OK" if total <= STARTUP_BUDGET else "OVER BUDGET"
+        lines.append(f"{'total':<32}{total * 1000:>9.1f} ms  "
+                     f"(budget {STARTUP_BUDGET * 1000:.0f} ms, {verdict})")
+        return "\n".join(lines)
+
+
+profile = StartupProfile()
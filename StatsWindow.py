@@ -0,0 +1,102 @@
+import time
+from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
+                               QLabel, QTableWidget, QTableWidgetItem, QHeaderView)
+from AnswerLog import AnswerLog, DAY, format_duration
+from Metrics import metrics
+from QuestionBank import KINDS
+
+# Width of the recall bars in the forgetting curve table
+BAR_WIDTH = 30
+
+
+class StatsWindow(QMainWindow):
+    """Learning statistics from the deck's answer log: weakest words and the forgetting curve."""
+
+    def __init__(self, answer_log: AnswerLog, mainWind=None):
+        super().__init__()
+        self.setWindowTitle("Statistics")
+        self.setMinimumSize(900, 600)
+        self.answer_log = answer_log
+        self.mainWind = mainWind
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        layout = QVBoxLayout(central_widget)
+
+        self.summary_label = QLabel()
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+        layout.addWidget(QLabel("Weakest words:"))
+        self.weakest_table = QTableWidget(0, 5)
+        self.weakest_table.setHorizontalHeaderLabels(["Word", "Answers", "Correct", "Avg. time", "Last asked"])
+        self.weakest_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.weakest_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.weakest_table.cellDoubleClicked.connect(self.show_word)
+        layout.addWidget(self.weakest_table)
+
+        self.curve_label = QLabel("Forgetting curve:")
+        layout.addWidget(self.curve_label)
+        self.curve_table = QTableWidget(0, 3)
+        self.curve_table.setHorizontalHeaderLabels(["Time since last asked", "Answers", "Recalled"])
+        self.curve_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.curve_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.curve_table)
+
+        button_layout = QHBoxLayout()
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.refresh)
+        button_layout.addWidget(refresh_button)
+        layout.addLayout(button_layout)
+
+        if self.mainWind is not None:
+            self.mainWind.deckChanged.connect(self.on_deck_changed)
+        self.refresh()
+
+    def on_deck_changed(self, deck):
+        self.answer_log = deck.get_answer_log()
+        self.setWindowTitle(f"Statistics - {deck.name}")
+        self.refresh()
+
+    def refresh(self):
+        start = time.perf_counter()
+        try:
+            with metrics.time("answer_stats_seconds"):
+                stats = self.answer_log.stats()
+        except ImportError:
+            self.summary_label.setText("Install numpy to see learning statistics.")
+            return
+        elapsed = time.perf_counter() - start
+        if not stats["answers"]:
+            self.summary_label.setText("No answers yet. Take a quiz to collect statistics.")
+        else:
+            kinds = ", ".join(f"{KINDS[kind]} {entry['accuracy']:.0%} ({entry['answers']})"
+                              for kind, entry in sorted(stats["by_kind"].items()))
+            self.summary_label.setText(
+                f"{stats['answers']} answers to {stats['words']} words, {stats['accuracy']:.0%} correct, "
+                f"{stats['mean_seconds']:.1f} s per answer on average.\n"
+                f"By question: {kinds}\n"
+                f"(computed in {elapsed * 1000:.0f} ms)")
+
+        self.weakest_table.setRowCount(len(stats["weakest"]))
+        for row, entry in enumerate(stats["weakest"]):
+            cells = [entry["word"], str(entry["answers"]), f"{entry['accuracy']:.0%}",
+                     f"{entry['mean_seconds']:.1f} s", "-" if entry["days_since"] is None else format_duration(entry["days_since"] * DAY) + " ago"]
+            for column, text in enumerate(cells):
+                self.weakest_table.setItem(row, column, QTableWidgetItem(text))
+
+        curve = stats["curve"]
+        half_life = curve["half_life"]
+        self.curve_label.setText("Forgetting curve" + (
+            f" (recall halves after about {format_duration(half_life)}):" if half_life else ":"))
+        self.curve_table.setRowCount(len(curve["bins"]))
+        for row, entry in enumerate(curve["bins"]):
+            recall = entry["recall"]
+            bar = "" if recall is None else "█" * round(recall * BAR_WIDTH) + f"  {recall:.0%}"
+            for column, text in enumerate([entry["label"], str(entry["answers"]), bar]):
+                self.curve_table.setItem(row, column, QTableWidgetItem(text))
+
+    def show_word(self, row: int, column: int):
+        item = self.weakest_table.item(row, 0)
+        if item is not None and self.mainWind is not None and item.text() in self.mainWind.learned_words:
+            self.mainWind.currentWord = item.text()
+            self.mainWind.display_word_info(item.text())
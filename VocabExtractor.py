@@ -0,0 +1,106 @@
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Container, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# PDF text extraction needs pypdf (pip install pypdf); it is only imported when used
+TOKEN_RE = re.compile(r"[a-z]+(?:['’][a-z]+)?")
+
+# Very common words that are never worth suggesting
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been
+before being below between both but by can could did do does doing down during each
+even few for from further had has have having he her here hers herself him himself his
+how however i if in into is it its itself just like made make many may me might more
+most much must my myself never new no nor not now of off on once one only or other our
+ours ourselves out over own said same say see she should so some such than that the
+their theirs them themselves then there these they this those through to too two under
+until up upon us use used very was way we well were what when where which while who
+whom why will with within without would yet you your yours yourself yourselves
+""".split())
+
+
+def normalize(token: str) -> str:
+    """Lowercases a token and strips possessives and simple plurals."""
+    token = token.replace("’", "'")
+    if token.endswith("'s"):
+        token = token[:-2]
+    elif "'" in token:
+        return ""
+    if len(token) > 4 and token.endswith("ies"):
+        token = token[:-3] + "y"
+    elif len(token) > 4 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        token = token[:-1]
+    return token
+
+
+def tokenize(text: str, min_length: int = 4) -> Iterator[str]:
+    """Yields normalized candidate words from a chunk of text."""
+    # Join words hyphenated across line breaks before splitting
+    text = text.replace("-\n", "").lower()
+    for match in TOKEN_RE.finditer(text):
+        word = normalize(match.group())
+        if len(word) >= min_length and word not in STOPWORDS:
+            yield word
+
+
+def page_count(pdf_path: str) -> int:
+    from pypdf import PdfReader
+    return len(PdfReader(pdf_path).pages)
+
+
+def extract_pages(pdf_path: str, start: int, stop: int) -> List[Tuple[int, Dict[str, int]]]:
+    """Returns word counts for each page in [start, stop). Runs in a worker process."""
+    from pypdf import PdfReader
+    reader = PdfReader(pdf_path)
+    results = []
+    for number in range(start, min(stop, len(reader.pages))):
+        text = reader.pages[number].extract_text() or ""
+        results.append((number, dict(Counter(tokenize(text)))))
+    return results
+
+
+def rank_candidates(counts: Counter, known: Container[str], limit: int = 200) -> List[Tuple[str, int]]:
+    """Ranks words not in the known set, most frequent first, longer words winning ties."""
+    candidates = [(word, count) for word, count in counts.items() if word not in known]
+    candidates.sort(key=lambda item: (-item[1], -len(item[0]), item[0]))
+    return candidates[:limit]
+
+
+class VocabExtractor:
+    """Extracts vocabulary from a PDF on a process pool, one batch of pages per task.
+
+    iter_pages() yields each page's word counts as soon as its batch finishes, so
+    callers can show results incrementally while the rest of the book is read.
+    """
+
+    def __init__(self, pdf_path: str, pages_per_task: int = 8, max_workers: Optional[int] = None):
+        self.pdf_path = pdf_path
+        self.pages_per_task = pages_per_task
+        self.max_workers = max_workers
+        self.counts: Counter = Counter()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def iter_pages(self, pages: Optional[Iterable[int]] = None) -> Iterator[Tuple[int, Dict[str, int]]]:
+        total = page_count(self.pdf_path)
+        starts = range(0, total, self.pages_per_task) if pages is None else sorted(
+            {page - page % self.pages_per_task for page in pages if 0 <= page < total})
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = [self._executor.submit(extract_pages, self.pdf_path, start,
+                                             start + self.pages_per_task)
+                       for start in starts]
+            for future in as_completed(futures):
+                for number, page_counts in future.result():
+                    self.counts.update(page_counts)
+                    yield number, page_counts
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def cancel(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def candidates(self, known: Container[str], limit: int = 200) -> List[Tuple[str, int]]:
+        return rank_candidates(self.counts, known, limit)
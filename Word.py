@@ -1,16 +1,19 @@
+import threading
 from dataclasses import dataclass
 from typing import List, Optional
-import requests
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Iterator, Tuple, Union
+from WordCache import WordCache
+from WordClient import WordClient, configured_base_url
+from Metrics import metrics
 
-@dataclass
+@dataclass(slots=True)
 class Phonetic:
     text: str
     audio: Optional[str] = None
     source_url: Optional[str] = None
     license: Optional[Dict[str, str]] = None
 
-@dataclass
+@dataclass(slots=True)
 class Definition:
     definition: str
     example: Optional[str] = None
@@ -21,7 +24,7 @@ class Definition:
         self.synonyms = self.synonyms or []
         self.antonyms = self.antonyms or []
 
-@dataclass
+@dataclass(slots=True)
 class Meaning:
     part_of_speech: str
     definitions: List[Definition]
@@ -33,7 +36,29 @@ class Meaning:
         self.antonyms = self.antonyms or []
 
 class Word:
-    def __init__(self, word: str):
+    """A dictionary entry.
+
+    Build one with from_response() or from_record(); these never touch the
+    network. Word(word) without data still fetches through the shared client,
+    but new code should go through WordRepository. The shared client (and its
+    on-disk cache) is created on first use by shared_client(), not on import.
+    """
+    __slots__ = ("word", "phonetic", "phonetics", "origin", "meanings", "license",
+                 "source_urls", "main_definition", "all_synonyms", "all_antonyms", "loose_examples")
+
+    # Shared pooled API client with an on-disk response cache; see shared_client()
+    _client: Optional[WordClient] = None
+    _client_lock = threading.Lock()
+
+    def __init__(self, word: str, data: Optional[Dict[str, Any]] = None):
+        self._reset(word)
+        if data is None:
+            self._fetch_data()
+        else:
+            self._parse_response(data)
+        self._process_data()
+
+    def _reset(self, word: str) -> None:
         self.word = word
         self.phonetic = ""
         self.phonetics: List[Phonetic] = []
@@ -46,18 +71,93 @@ class Word:
         self.main_definition: Optional[str] = None
         self.all_synonyms: List[str] = []
         self.all_antonyms: List[str] = []
-        
-        self._fetch_data()
+        # Examples of a stored record that cannot be told apart by definition
+        self.loose_examples: List[str] = []
+
+    @classmethod
+    def from_response(cls, word: str, data: Dict[str, Any]) -> "Word":
+        """Builds a Word from a raw dictionary API entry."""
+        return cls(word, data=data)
+
+    @classmethod
+    def from_record(cls, word: str, info: Dict[str, Any]) -> "Word":
+        """Builds a Word from a stored learned_words record (see to_record).
+
+        Consecutive definitions with the same part of speech form one meaning
+        (older records have no parts of speech and get a single meaning).
+        Records keep only the examples that exist, so they are attached to the
+        definitions only when there is one per definition; otherwise they are
+        kept in loose_examples.
+        """
+        self = cls.__new__(cls)
+        self._reset(word)
+        self.phonetic = info.get("phonetic", "")
+        audio = info.get("audio") or [None]
+        self.phonetics = [Phonetic(text=self.phonetic, audio=url) for url in audio]
+        examples = list(info.get("examples", []))
+        definitions = info.get("definition", [])
+        if len(examples) != len(definitions):
+            self.loose_examples = examples
+            examples = []
+        parts = info.get("partOfSpeech") or []
+        if isinstance(parts, str):
+            parts = [parts] * len(info.get("definition", []))
+        self.meanings = []
+        for i, text in enumerate(definitions):
+            part = parts[i] if i < len(parts) else ""
+            if not self.meanings or self.meanings[-1].part_of_speech != part:
+                self.meanings.append(Meaning(part_of_speech=part, definitions=[]))
+            self.meanings[-1].definitions.append(
+                Definition(definition=text, example=examples[i] if examples else None))
+        if not self.meanings:
+            self.meanings.append(Meaning(part_of_speech="", definitions=[]))
+        self.meanings[0].synonyms = list(info.get("synonyms", []))
+        self.meanings[0].antonyms = list(info.get("antonyms", []))
         self._process_data()
+        return self
+
+    def to_record(self) -> Dict[str, Any]:
+        """Returns the dict stored for this word in learned_words."""
+        definitions = []
+        parts = []
+        examples = []
+        for meaning in self.meanings:
+            for definition in meaning.definitions:
+                definitions.append(definition.definition)
+                parts.append(meaning.part_of_speech)
+                if definition.example is not None:
+                    examples.append(definition.example)
+        examples += self.loose_examples
+        return {
+            "definition": definitions,
+            "partOfSpeech": parts,
+            "synonyms": self.all_synonyms,
+            "antonyms": self.all_antonyms,
+            "phonetic": self.phonetic,
+            "examples": examples,
+            "audio": [phonetic.audio for phonetic in self.phonetics if phonetic.audio]
+        }
     
+    @classmethod
+    def shared_client(cls) -> WordClient:
+        """The shared dictionary API client, opening word_cache.sqlite the first time."""
+        with Word._client_lock:
+            if Word._client is None:
+                Word._client = WordClient(cache=WordCache(), base_url=configured_base_url())
+            return Word._client
+
     def _fetch_data(self) -> None:
-        """Fetches word data from the dictionary API."""
-        url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{self.word}"
-        response = requests.get(url)
-        if response.status_code == 200:
-            self._parse_response(response.json()[0])
-        else:
-            raise ValueError(f"Could not find word '{self.word}'")
+        """Fetches word data through the shared dictionary API client."""
+        with metrics.time("word_fetch_seconds"):
+            data = Word.shared_client().get(self.word)
+        self._parse_response(data)
+
+    @classmethod
+    def fetch_many(cls, words: Iterable[str],
+                   client: Optional[WordClient] = None) -> Iterator[Tuple[str, Union["Word", Exception]]]:
+        """Looks up many words concurrently, yielding (word, Word or error) as each completes."""
+        from WordRepository import WordRepository
+        yield from WordRepository(client or cls.shared_client()).get_many(words)
     
     def _parse_response(self, data: Dict[str, Any]) -> None:
         """Parses the API response and sets the class attributes."""
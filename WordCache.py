@@ -0,0 +1,121 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Sentinel returned by WordCache.get for a remembered "word not found" answer
+MISS = object()
+
+
+class WordCache:
+    """Persistent SQLite cache of raw dictionary API responses.
+
+    Found words and remembered misses are kept with separate TTLs. When the
+    cache grows past max_entries the least recently used rows are evicted.
+    """
+
+    def __init__(self, path="word_cache.sqlite", ttl: float = 30 * 24 * 3600,
+                 miss_ttl: float = 24 * 3600, max_entries: int = 50000):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # last_used updates are batched so a cache hit does not cost a write
+        self._touched: Dict[str, float] = {}
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " word TEXT PRIMARY KEY,"
+            " payload TEXT,"  # NULL means the API did not know the word
+            " fetched_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries(last_used)")
+        self._conn.commit()
+        self._size = self._count()
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get(self, word: str, allow_stale: bool = False) -> Any:
+        """Returns the cached response, MISS for a remembered miss, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, fetched_at FROM entries WHERE word = ?", (word,)
+            ).fetchone()
+            if row is not None:
+                self._touched[word] = time.time()
+                if len(self._touched) >= 256:
+                    self._flush_touched()
+                    self._conn.commit()
+        if row is None:
+            self.misses += 1
+            return None
+        payload, fetched_at = row
+        ttl = self.ttl if payload is not None else self.miss_ttl
+        if not allow_stale and time.time() - fetched_at > ttl:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return MISS if payload is None else json.loads(payload)
+
+    def put(self, word: str, data: Optional[Dict[str, Any]]) -> None:
+        """Stores a response; pass None to remember that the word was not found."""
+        now = time.time()
+        payload = None if data is None else json.dumps(data)
+        with self._lock:
+            exists = self._conn.execute(
+                "SELECT 1 FROM entries WHERE word = ?", (word,)
+            ).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (word, payload, fetched_at, last_used)"
+                " VALUES (?, ?, ?, ?)",
+                (word, payload, now, now),
+            )
+            self._touched.pop(word, None)
+            if not exists:
+                self._size += 1
+            if self._size > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _flush_touched(self) -> None:
+        self._conn.executemany(
+            "UPDATE entries SET last_used = ? WHERE word = ?",
+            [(used, word) for word, used in self._touched.items()],
+        )
+        self._touched.clear()
+
+    def _evict(self) -> None:
+        """Drops the least recently used rows, keeping 90% of max_entries."""
+        self._flush_touched()
+        keep = int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM entries WHERE word IN ("
+            " SELECT word FROM entries ORDER BY last_used ASC LIMIT ?)",
+            (self._size - keep,),
+        )
+        self._size = self._count()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": self._size}
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,178 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from WordCache import WordCache, MISS
+from Metrics import metrics
+
+DEFAULT_BASE_URL = "https://api.dictionaryapi.dev"
+API_PATH = "/api/v2/entries/en/{}"
+
+# Status codes worth retrying; anything else is a final answer
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def configured_base_url(settings_path="settings.json") -> str:
+    """The dictionary server to use: $LEARNWORDS_API_URL, then "apiUrl" in settings.json.
+
+    Point it at a replay server (see ReplayServer.py) to work offline or load test.
+    """
+    url = os.environ.get("LEARNWORDS_API_URL")
+    if not url:
+        try:
+            with open(settings_path, encoding="utf-8") as f:
+                url = json.load(f).get("apiUrl")
+        except (OSError, ValueError):
+            url = None
+    return (url or DEFAULT_BASE_URL).rstrip("/")
+
+
+class TokenBucket:
+    """Blocking token-bucket rate limiter shared by all worker threads."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+
+class WordClient:
+    """Dictionary API client with a pooled keep-alive session.
+
+    Single lookups go through get(); get_many() resolves a list of words on a
+    thread pool, limited by max_workers and a token-bucket rate limit, and
+    yields results as soon as each one completes.
+    """
+
+    def __init__(self, cache: Optional[WordCache] = None, max_workers: int = 8,
+                 rate: float = 20.0, burst: int = 10, retries: int = 3,
+                 backoff: float = 0.5, timeout: float = 10.0,
+                 base_url: Optional[str] = None, recorder=None):
+        self.cache = cache
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
+        # Anything with record(word, status, body), e.g. ReplayServer.FixtureArchive
+        self.recorder = recorder
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.limiter = TokenBucket(rate, burst)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if cache is not None:
+            metrics.gauge("word_cache_hits", lambda: cache.hits)
+            metrics.gauge("word_cache_misses", lambda: cache.misses)
+            metrics.gauge("word_cache_entries", lambda: cache.stats()["entries"])
+
+    def get(self, word: str) -> Dict[str, Any]:
+        """Returns the raw API entry for a word, raising ValueError if it is unknown."""
+        cache = self.cache
+        if cache is not None:
+            cached = cache.get(word)
+            if cached is MISS:
+                raise ValueError(f"Could not find word '{word}'")
+            if cached is not None:
+                return cached
+
+        try:
+            response = self._request(word)
+        except requests.RequestException:
+            # Offline: fall back to an expired cache entry if there is one
+            cached = cache.get(word, allow_stale=True) if cache is not None else None
+            if cached is None:
+                raise
+            if cached is MISS:
+                raise ValueError(f"Could not find word '{word}'")
+            return cached
+
+        if response.status_code == 200:
+            data = response.json()[0]
+            if cache is not None:
+                cache.put(word, data)
+            return data
+        # Only remember real "not found" answers, not server errors
+        if cache is not None and response.status_code == 404:
+            cache.put(word, None)
+        raise ValueError(f"Could not find word '{word}'")
+
+    def _request(self, word: str) -> requests.Response:
+        """Performs the HTTP request, retrying transient failures with backoff."""
+        url = self.base_url + API_PATH.format(word)
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            metrics.count("api_requests")
+            try:
+                with metrics.time("api_request_seconds"):
+                    response = self.session.get(url, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                metrics.count("api_network_errors")
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * 2 ** attempt
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    if self.recorder is not None:
+                        self._record(word, response)
+                    return response
+                metrics.count("api_retried_responses")
+                retry_after = response.headers.get("Retry-After", "")
+                delay = float(retry_after) if retry_after.isdigit() else self.backoff * 2 ** attempt
+            time.sleep(delay + random.uniform(0, self.backoff))
+
+    def _record(self, word: str, response: requests.Response) -> None:
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        self.recorder.record(word, response.status_code, body)
+
+    def get_many(self, words: Iterable[str]) -> Iterator[Tuple[str, Union[Dict[str, Any], Exception]]]:
+        """Looks up many words concurrently, yielding (word, entry or error) as they finish."""
+        # Keep a bounded window of pending lookups so huge lists are not queued all at once
+        window = self.max_workers * 2
+        seen = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {}
+            for word in words:
+                if word in seen:
+                    continue
+                seen.add(word)
+                pending[executor.submit(self.get, word)] = word
+                if len(pending) >= window:
+                    yield from self._drain(pending, FIRST_COMPLETED)
+            while pending:
+                yield from self._drain(pending, FIRST_COMPLETED)
+
+    @staticmethod
+    def _drain(pending: Dict, return_when) -> Iterator[Tuple[str, Union[Dict[str, Any], Exception]]]:
+        done, _ = wait(pending, return_when=return_when)
+        for future in done:
+            word = pending.pop(future)
+            error = future.exception()
+            yield word, error if error is not None else future.result()
+
+    def close(self) -> None:
+        self.session.close()
@@ -0,0 +1,160 @@
+from array import array
+from collections import deque
+from typing import Any, Container, Dict, List, Mapping, Optional, Tuple
+
+EMPTY = array("I")
+
+
+class WordGraph:
+    """Synonym/antonym graph over every stored entry.
+
+    Words are interned to integer ids. Each entry's own synonyms and antonyms
+    are kept as out-edges in compact unsigned-int arrays, with matching
+    in-edge arrays, so removing an entry only touches that entry's edges and
+    every query walks edges in both directions.
+    """
+
+    def __init__(self, words: Optional[Mapping[str, Mapping[str, Any]]] = None):
+        self.words = words
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.synonyms_out: List[array] = []
+        self.antonyms_out: List[array] = []
+        self.incoming: List[array] = []
+        if words is not None:
+            for word, info in words.items():
+                self.add(word, info)
+
+    def _id(self, word: str) -> int:
+        node = self.ids.get(word)
+        if node is None:
+            node = self.ids[word] = len(self.names)
+            self.names.append(word)
+            self.synonyms_out.append(EMPTY)
+            self.antonyms_out.append(EMPTY)
+            self.incoming.append(array("I"))
+        return node
+
+    def add(self, word: str, info: Mapping[str, Any]) -> None:
+        """Adds or replaces the edges contributed by one stored entry."""
+        node = self._id(word)
+        if self.synonyms_out[node] or self.antonyms_out[node]:
+            self.remove(word)
+        synonyms = array("I", dict.fromkeys(map(self._id, self._targets(info, "synonyms"))))
+        antonyms = array("I", dict.fromkeys(map(self._id, self._targets(info, "antonyms"))))
+        self.synonyms_out[node] = synonyms
+        self.antonyms_out[node] = antonyms
+        for target in set(synonyms) | set(antonyms):
+            if target != node:
+                self.incoming[target].append(node)
+
+    @staticmethod
+    def _targets(info: Mapping[str, Any], field: str) -> List[str]:
+        return [target.lower() for target in info.get(field, ()) if target]
+
+    def remove(self, word: str) -> None:
+        """Drops the edges contributed by an entry; edges from other entries to it stay."""
+        node = self.ids.get(word)
+        if node is None:
+            return
+        for target in set(self.synonyms_out[node]) | set(self.antonyms_out[node]):
+            incoming = self.incoming[target]
+            if node in incoming:
+                incoming.remove(node)
+        self.synonyms_out[node] = EMPTY
+        self.antonyms_out[node] = EMPTY
+
+    def clear(self) -> None:
+        self.ids.clear()
+        self.names.clear()
+        self.synonyms_out.clear()
+        self.antonyms_out.clear()
+        self.incoming.clear()
+
+    def neighbors(self, node: int, antonyms: bool = True):
+        yield from self.synonyms_out[node]
+        if antonyms:
+            yield from self.antonyms_out[node]
+        for source in self.incoming[node]:
+            # An in-edge counts as an antonym link if the source listed us as one
+            if antonyms or node in self.synonyms_out[source]:
+                yield source
+
+    def related(self, word: str, hops: int = 2, exclude: Container[str] = (),
+                limit: int = 20, antonyms: bool = True) -> List[Tuple[str, int]]:
+        """Words within a number of hops, nearest first, skipping excluded words."""
+        start = self.ids.get(word)
+        if start is None:
+            return []
+        found: List[Tuple[str, int]] = []
+        seen = {start}
+        frontier = [start]
+        for hop in range(1, hops + 1):
+            next_frontier = []
+            for node in frontier:
+                for other in self.neighbors(node, antonyms):
+                    if other in seen:
+                        continue
+                    seen.add(other)
+                    next_frontier.append(other)
+                    name = self.names[other]
+                    if name not in exclude:
+                        found.append((name, hop))
+                        if len(found) >= limit:
+                            return found
+            frontier = next_frontier
+        return found
+
+    def cluster(self, word: str, max_size: int = 500, antonyms: bool = False) -> List[str]:
+        """The connected group of words around a word (synonyms only by default)."""
+        start = self.ids.get(word)
+        if start is None:
+            return []
+        seen = {start}
+        queue = deque([start])
+        while queue and len(seen) < max_size:
+            for other in self.neighbors(queue.popleft(), antonyms):
+                if other not in seen:
+                    seen.add(other)
+                    queue.append(other)
+        return [self.names[node] for node in seen]
+
+    def shortest_path(self, source: str, target: str, antonyms: bool = True,
+                      max_hops: int = 8) -> Optional[List[str]]:
+        """Shortest chain of related words between two words, using bidirectional BFS."""
+        a, b = self.ids.get(source), self.ids.get(target)
+        if a is None or b is None:
+            return None
+        if a == b:
+            return [source]
+        parents = [{a: None}, {b: None}]
+        frontiers = [[a], [b]]
+        for _ in range(max_hops):
+            # Expand the smaller side
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            next_frontier = []
+            for node in frontiers[side]:
+                for other in self.neighbors(node, antonyms):
+                    if other in parents[side]:
+                        continue
+                    parents[side][other] = node
+                    if other in parents[1 - side]:
+                        return self._join(parents, other)
+                    next_frontier.append(other)
+            if not next_frontier:
+                return None
+            frontiers[side] = next_frontier
+        return None
+
+    def _join(self, parents, meet: int) -> List[str]:
+        path = []
+        node = meet
+        while node is not None:
+            path.append(node)
+            node = parents[0][node]
+        path.reverse()
+        node = parents[1][meet]
+        while node is not None:
+            path.append(node)
+            node = parents[1][node]
+        return [self.names[node] for node in path]
@@ -0,0 +1,197 @@
+import csv
+import html
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Any, Container, Dict, Iterator, List, Optional, Tuple
+
+# Word lists that can be imported into a deck (Anki "Notes in Plain Text" exports are .txt)
+IMPORT_SUFFIXES = (".txt", ".csv", ".tsv")
+# Words resolved per round of dictionary lookups; progress is checkpointed after each
+BATCH_SIZE = 200
+# First fields that name a column rather than hold a word
+HEADER_NAMES = {"word", "words", "term", "front", "vocabulary", "vocab"}
+# Delimiters named by an Anki export's "#separator:" header
+ANKI_SEPARATORS = {"tab": "\t", "comma": ",", "semicolon": ";", "space": " ", "pipe": "|", "colon": ":"}
+TAG_RE = re.compile(r"<[^>]*>")
+SOUND_RE = re.compile(r"\[sound:[^\]]*\]")
+WORD_RE = re.compile(r"[a-z](?:[a-z' -]*[a-z])?")
+MAX_WORD_LENGTH = 40
+
+
+def normalize_entry(text: str) -> Optional[str]:
+    """Turns a raw first field into a lookup word, or None if it is not a word."""
+    text = html.unescape(SOUND_RE.sub("", TAG_RE.sub(" ", text))).replace("’", "'")
+    text = " ".join(text.split()).lower()
+    if not text or len(text) > MAX_WORD_LENGTH or not WORD_RE.fullmatch(text):
+        return None
+    return text
+
+
+def read_entries(path, start: int = 0) -> Iterator[Tuple[str, int]]:
+    """Streams (first field, byte offset just past its line) from a word list.
+
+    Plain text has one word per line; CSV/TSV files and Anki exports have one
+    note per line and the word in the first column. Reading starts at byte
+    offset start, so an interrupted import can continue where it stopped.
+    """
+    path = Path(path)
+    delimiter = {".csv": ",", ".tsv": "\t"}.get(path.suffix.lower())
+    with open(path, "rb") as f:
+        # Anki header lines ("#separator:tab", "#html:true") are always read from the top
+        offset = 0
+        for raw in f:
+            line = raw.decode("utf-8", errors="replace").lstrip("\ufeff")
+            if not line.startswith("#"):
+                break
+            if line.startswith("#separator:"):
+                delimiter = ANKI_SEPARATORS.get(line.split(":", 1)[1].strip().lower(), delimiter)
+            offset += len(raw)
+        offset = max(offset, start)
+        f.seek(offset)
+        for raw in f:
+            offset += len(raw)
+            line = raw.decode("utf-8", errors="replace").lstrip("\ufeff").rstrip("\r\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            if delimiter is None and "\t" in line:
+                delimiter = "\t"
+            if delimiter is None:
+                yield line, offset
+                continue
+            fields = next(csv.reader([line], delimiter=delimiter), [])
+            if fields:
+                yield fields[0], offset
+
+
+class WordImporter:
+    """Imports a word list into a deck in batches, with a resumable checkpoint.
+
+    The source is streamed, so memory does not grow with its size. Entries are
+    normalized and skipped if already in the deck or the current batch; each
+    batch is resolved with one WordRepository.get_many call. After a batch is
+    stored, commit() records the byte offset reached in <source>.import.json,
+    and a later import of the same file into the same deck starts from there.
+    Words the dictionary does not know are listed in <source>.failed.txt.
+    """
+
+    def __init__(self, source, deck_path=None, batch_size: int = BATCH_SIZE):
+        self.source = Path(source)
+        self.deck_path = str(Path(deck_path).resolve()) if deck_path is not None else None
+        self.batch_size = batch_size
+        self.checkpoint_path = self.source.with_name(self.source.name + ".import.json")
+        self.failed_path = self.source.with_name(self.source.name + ".failed.txt")
+        self.size = self.source.stat().st_size
+        self.offset = 0
+        self.imported = 0
+        self.not_found = 0
+        self.resumed = self._load_checkpoint()
+
+    def _stamp(self) -> Dict[str, Any]:
+        stat = self.source.stat()
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "deck": self.deck_path}
+
+    def _load_checkpoint(self) -> bool:
+        try:
+            checkpoint = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        if checkpoint.get("stamp") != self._stamp():
+            # The list or the target deck changed; start over
+            return False
+        self.offset = checkpoint["offset"]
+        self.imported = checkpoint["imported"]
+        self.not_found = checkpoint["not_found"]
+        return True
+
+    @property
+    def percent(self) -> int:
+        return int(self.offset * 100 / self.size) if self.size else 100
+
+    def batches(self, known: Container[str]) -> Iterator[Tuple[List[str], int]]:
+        """Yields (new words, offset after the batch's last line) from the checkpointed offset on."""
+        batch: List[str] = []
+        first = self.offset == 0
+        offset = self.offset
+        for field, offset in read_entries(self.source, self.offset):
+            word = normalize_entry(field)
+            if first:
+                first = False
+                if word in HEADER_NAMES:
+                    continue
+            if word is None or word in known or word in batch:
+                continue
+            batch.append(word)
+            if len(batch) >= self.batch_size:
+                yield batch, offset
+                batch = []
+        if batch or offset != self.offset:
+            yield batch, offset
+
+    @staticmethod
+    def resolve(words: List[str], repository) -> Tuple[Dict[str, Dict[str, Any]], List[str], List[Exception]]:
+        """Looks up a batch; returns (records, words not found, other errors such as network failures)."""
+        records: Dict[str, Dict[str, Any]] = {}
+        not_found: List[str] = []
+        errors: List[Exception] = []
+        for word, result in repository.get_many(words):
+            if isinstance(result, ValueError):
+                not_found.append(word)
+            elif isinstance(result, Exception):
+                errors.append(result)
+            else:
+                records[word] = result.to_record()
+        return records, not_found, errors
+
+    def commit(self, offset: int, imported: int, not_found: List[str]) -> None:
+        """Records that everything before offset has been stored."""
+        self.offset = offset
+        self.imported += imported
+        self.not_found += len(not_found)
+        if not_found:
+            with open(self.failed_path, "a", encoding="utf-8") as f:
+                f.writelines(word + "\n" for word in not_found)
+        tmp = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        tmp.write_text(json.dumps({"stamp": self._stamp(), "offset": self.offset,
+                                   "imported": self.imported, "not_found": self.not_found}))
+        os.replace(tmp, self.checkpoint_path)
+
+    def finish(self) -> None:
+        """Removes the checkpoint once the whole list has been imported."""
+        try:
+            self.checkpoint_path.unlink()
+        except OSError:
+            pass
+
+    def run(self, words, store, repository) -> None:
+        """Imports everything into a deck mapping and its store (used by the command line)."""
+        for batch, offset in self.batches(words):
+            records, not_found, errors = self.resolve(batch, repository)
+            words.update(records)
+            store.put_many(records)
+            if errors:
+                raise errors[0]
+            store.flush()
+            self.commit(offset, len(records), not_found)
+            print(f"{self.percent:3d}%  {self.imported} imported, {self.not_found} not found", file=sys.stderr)
+        self.finish()
+
+
+if __name__ == "__main__":
+    # python WordImporter.py words.txt learned_words.json
+    if len(sys.argv) < 3:
+        print("usage: python WordImporter.py WORD_LIST DECK")
+        sys.exit(1)
+    from WordRepository import default_repository
+    from WordStore import open_store
+    deck_store = open_store(sys.argv[2])
+    deck_words = deck_store.load()
+    importer = WordImporter(sys.argv[1], sys.argv[2])
+    if importer.resumed:
+        print(f"Resuming at {importer.percent}%", file=sys.stderr)
+    importer.run(deck_words, deck_store, default_repository())
+    deck_store.close()
+    print(f"Imported {importer.imported} words into {sys.argv[2]}; "
+          f"{importer.not_found} not found (see {importer.failed_path})")
@@ -0,0 +1,161 @@
+from typing import Callable, Dict, List, Mapping, Optional, Set
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+SORT_ADDED = "Added date"
+SORT_ALPHABETICAL = "Alphabetical"
+SORT_ACCURACY = "Quiz accuracy"
+
+
+class WordListModel(QAbstractListModel):
+    """List model over the keys of a learned_words mapping.
+
+    Only the word keys are held; labels are formatted when the view asks for a
+    visible row and cached. Adds and deletes are applied as single-row changes;
+    a word's row is found by bisecting on the sort order (every word has a
+    distinct sort value), so they do not scan the list.
+    """
+
+    def __init__(self, words: Mapping, accuracy: Optional[Callable[[str], Optional[float]]] = None,
+                 parent=None):
+        super().__init__(parent)
+        self.words = words
+        self.accuracy = accuracy
+        self.sort_key = SORT_ADDED
+        self.filtered = False
+        self._labels: Dict[str, str] = {}
+        self._list_all()
+
+    def _list_all(self) -> None:
+        """Lists every word of the deck in the order added."""
+        self._keys: List[str] = list(self.words)
+        self._listed: Set[str] = set(self._keys)
+        # Position of each word in the order added, the sort value of SORT_ADDED
+        self._added: Dict[str, int] = {word: row for row, word in enumerate(self._keys)}
+        self._next_added = len(self._keys)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._keys)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        word = self._keys[index.row()]
+        if role == Qt.DisplayRole:
+            label = self._labels.get(word)
+            if label is None:
+                label = self.format_label(word)
+                self._labels[word] = label
+            return label
+        if role == Qt.UserRole:
+            return word
+        return None
+
+    def format_label(self, word: str) -> str:
+        info = self.words[word]
+        return f"{word} - {'; '.join(info['definition'])}"
+
+    def word_at(self, row: int) -> str:
+        return self._keys[row]
+
+    def _sort_value(self, word: str):
+        if self.sort_key == SORT_ADDED:
+            return self._added.get(word, self._next_added)
+        if self.sort_key == SORT_ALPHABETICAL:
+            return word
+        # Words never quizzed sort after every quizzed word; ties go alphabetically
+        accuracy = self.accuracy(word) if self.accuracy else None
+        return (2.0 if accuracy is None else accuracy, word)
+
+    def _bisect(self, value) -> int:
+        """The first row whose sort value is not below value."""
+        low, high = 0, len(self._keys)
+        while low < high:
+            mid = (low + high) // 2
+            if self._sort_value(self._keys[mid]) < value:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _row_of(self, word: str) -> Optional[int]:
+        if word not in self._listed:
+            return None
+        if not self.filtered:
+            row = self._bisect(self._sort_value(word))
+            if row < len(self._keys) and self._keys[row] == word:
+                return row
+        # Search results are in ranked order, and quiz answers since sorting may have moved a word's accuracy
+        return self._keys.index(word)
+
+    def insert_word(self, word: str) -> None:
+        if self.filtered:
+            # Search results are recomputed by the next query
+            return
+        if word in self._listed:
+            # The entry may have changed; a formatted label is formatted again
+            if self._labels.pop(word, None) is not None:
+                row = self._row_of(word)
+                self.dataChanged.emit(self.index(row), self.index(row))
+            return
+        self._added[word] = self._next_added
+        self._next_added += 1
+        row = len(self._keys) if self.sort_key == SORT_ADDED else self._bisect(self._sort_value(word))
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._keys.insert(row, word)
+        self._listed.add(word)
+        self.endInsertRows()
+
+    def remove_row(self, row: int) -> None:
+        self.beginRemoveRows(QModelIndex(), row, row)
+        word = self._keys.pop(row)
+        self._listed.discard(word)
+        self.endRemoveRows()
+        self._labels.pop(word, None)
+        self._added.pop(word, None)
+
+    def remove_word(self, word: str) -> None:
+        row = self._row_of(word)
+        if row is not None:
+            self.remove_row(row)
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._keys.clear()
+        self._listed.clear()
+        self._labels.clear()
+        self._added.clear()
+        self.endResetModel()
+
+    def set_words(self, words: Mapping) -> None:
+        """Shows another deck, keeping the sort order."""
+        self.beginResetModel()
+        self.words = words
+        self.filtered = False
+        self._list_all()
+        self._labels.clear()
+        self.endResetModel()
+        if self.sort_key != SORT_ADDED:
+            self.sort_by(self.sort_key)
+
+    def sort_by(self, sort_key: str) -> None:
+        """Reorders the rows; only the key list is sorted, the deck itself is untouched."""
+        self.beginResetModel()
+        self.sort_key = sort_key
+        if sort_key == SORT_ADDED and not self.filtered:
+            self._list_all()
+        elif sort_key != SORT_ADDED:
+            self._keys.sort(key=self._sort_value)
+        self.endResetModel()
+
+    def set_filter(self, words: Optional[List[str]]) -> None:
+        """Shows only the given words, in the given (ranked) order; None shows every word."""
+        self.beginResetModel()
+        self.filtered = words is not None
+        if words is None:
+            self._list_all()
+        else:
+            self._keys = list(words)
+            self._listed = set(self._keys)
+        self.endResetModel()
+        if words is None and self.sort_key != SORT_ADDED:
+            self.sort_by(self.sort_key)
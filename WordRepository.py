@@ -0,0 +1,61 @@
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Tuple, Union
+
+from Metrics import metrics
+from OfflineDictionary import OfflineDictionary, open_default
+from Word import Word
+from WordClient import WordClient
+
+
+class WordRepository:
+    """Resolves words to Word objects; the only layer that performs fetches.
+
+    Word itself just parses data, so stored records and cached responses can be
+    turned into Words without any network access. When an offline dictionary
+    pack is available it is checked first and the API is only used for words
+    the pack does not have.
+    """
+
+    def __init__(self, client: Optional[WordClient] = None,
+                 offline: Optional[OfflineDictionary] = None):
+        self.client = client or Word.shared_client()
+        self.offline = offline
+
+    def get(self, word: str) -> Word:
+        """Fetches one word, raising ValueError if the dictionary does not know it."""
+        with metrics.time("lookup_seconds"):
+            if self.offline is not None:
+                entry = self.offline.get(word)
+                if entry is not None:
+                    metrics.count("offline_hits")
+                    return Word.from_response(word, entry)
+            return Word.from_response(word, self.client.get(word))
+
+    def get_many(self, words: Iterable[str]) -> Iterator[Tuple[str, Union[Word, Exception]]]:
+        """Fetches many words concurrently, yielding (word, Word or error) as each completes."""
+        remote = words
+        if self.offline is not None:
+            remote = []
+            for word in words:
+                entry = self.offline.get(word)
+                if entry is None:
+                    remote.append(word)
+                else:
+                    yield word, Word.from_response(word, entry)
+        for word, result in self.client.get_many(remote):
+            yield word, result if isinstance(result, Exception) else Word.from_response(word, result)
+
+    @staticmethod
+    def from_records(records: Mapping[str, Dict[str, Any]]) -> Iterator[Word]:
+        """Builds Words from stored learned_words records without any network calls."""
+        for word, info in records.items():
+            yield Word.from_record(word, info)
+
+
+_default: Optional[WordRepository] = None
+
+
+def default_repository() -> WordRepository:
+    global _default
+    if _default is None:
+        _default = WordRepository(offline=open_default())
+    return _default
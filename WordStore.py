@@ -0,0 +1,455 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from LazyDeck import LazyDeck
+from Metrics import metrics
+
+# Per-word list fields and the table each one is stored in
+LIST_FIELDS = {
+    "definition": "definitions",
+    "partOfSpeech": "parts_of_speech",
+    "synonyms": "synonyms",
+    "antonyms": "antonyms",
+    "examples": "examples",
+    "audio": "audio",
+}
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+# Write-behind: changes are committed once no new ones arrived for COMMIT_DELAY
+# seconds, and at the latest MAX_COMMIT_DELAY seconds after the first one
+COMMIT_DELAY = 1.0
+MAX_COMMIT_DELAY = 10.0
+
+
+class WordStore:
+    """Storage backend for learned words.
+
+    Callers keep working on the dict returned by load() and report each change
+    with put() or delete() so the backend can persist just that change.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def load(self, progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Dict[str, Any]]:
+        """Reads the deck; progress, if given, is called with (done, total) along the way."""
+        raise NotImplementedError
+
+    def put(self, word: str, info: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def put_many(self, words: Dict[str, Dict[str, Any]]) -> None:
+        """Stores several words at once, e.g. a batch from the importer."""
+        for word, info in words.items():
+            self.put(word, info)
+
+    def delete(self, word: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def save_all(self, words: Dict[str, Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def commit(self, puts: Dict[str, Dict[str, Any]], deletes: Iterable[str], cleared: bool = False) -> None:
+        """Applies a group of changes: the clear first, then the deletes, then the puts."""
+        if cleared:
+            self.clear()
+        for word in deletes:
+            self.delete(word)
+        if puts:
+            self.put_many(puts)
+
+    def flush(self) -> None:
+        """Writes out changes that are still pending (see WriteBehindStore)."""
+
+    def export_json(self, path, words: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        """Writes the words as a JSON deck in the same format as learned_words.json."""
+        if words is None:
+            words = self.load()
+        if isinstance(words, LazyDeck):
+            words.dump(path)
+        else:
+            Path(path).write_text(json.dumps(words))
+
+    def close(self) -> None:
+        pass
+
+
+class JsonWordStore(WordStore):
+    """The original format: the whole file is rewritten on every change.
+
+    The deck is opened as a LazyDeck, so entries are only parsed when used and
+    untouched entries are copied through unchanged on save.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.words: Dict[str, Dict[str, Any]] = {}
+
+    def load(self, progress=None) -> LazyDeck:
+        """Load previously learned words from JSON file."""
+        self.close()
+        self.words = LazyDeck(self.path, progress)
+        return self.words
+
+    def put(self, word: str, info: Dict[str, Any]) -> None:
+        self.save_all(self.words)
+
+    def put_many(self, words: Dict[str, Dict[str, Any]]) -> None:
+        # One rewrite for the whole batch
+        self.save_all(self.words)
+
+    def delete(self, word: str) -> None:
+        self.save_all(self.words)
+
+    def clear(self) -> None:
+        self.save_all(self.words)
+
+    def commit(self, puts, deletes, cleared=False) -> None:
+        # However many changes there are, the file is written once
+        self.save_all(self.words)
+
+    def save_all(self, words: Dict[str, Dict[str, Any]]) -> None:
+        if isinstance(words, LazyDeck) and words.path == self.path:
+            words.dump()
+            return
+        self.words = words
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w") as f:
+            f.write(json.dumps(words))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def close(self) -> None:
+        if isinstance(self.words, LazyDeck):
+            self.words.close()
+
+
+class SqliteWordStore(WordStore):
+    """Indexed SQLite tables; each put or delete is a single small transaction."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        # Decks may be opened on a worker thread and then used on the GUI thread
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS words ("
+                " id INTEGER PRIMARY KEY,"
+                " word TEXT NOT NULL UNIQUE,"
+                " phonetic TEXT NOT NULL DEFAULT '',"
+                " added_at REAL NOT NULL)"
+            )
+            for table in LIST_FIELDS.values():
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ("
+                    " word_id INTEGER NOT NULL REFERENCES words(id) ON DELETE CASCADE,"
+                    " position INTEGER NOT NULL,"
+                    " text TEXT NOT NULL,"
+                    " PRIMARY KEY (word_id, position))"
+                )
+
+    def load(self, progress=None) -> Dict[str, Dict[str, Any]]:
+        words: Dict[str, Dict[str, Any]] = {}
+        by_id: Dict[int, Dict[str, Any]] = {}
+        for word_id, word, phonetic in self._conn.execute(
+                "SELECT id, word, phonetic FROM words ORDER BY id"):
+            info = {field: [] for field in LIST_FIELDS}
+            info["phonetic"] = phonetic
+            words[word] = by_id[word_id] = info
+        for step, (field, table) in enumerate(LIST_FIELDS.items(), 1):
+            if progress is not None:
+                progress(step, len(LIST_FIELDS) + 1)
+            for word_id, text in self._conn.execute(
+                    f"SELECT word_id, text FROM {table} ORDER BY word_id, position"):
+                by_id[word_id][field].append(text)
+        return words
+
+    def _insert(self, word: str, info: Dict[str, Any]) -> None:
+        row = self._conn.execute("SELECT id FROM words WHERE word = ?", (word,)).fetchone()
+        if row is None:
+            word_id = self._conn.execute(
+                "INSERT INTO words (word, phonetic, added_at) VALUES (?, ?, ?)",
+                (word, info.get("phonetic", ""), time.time()),
+            ).lastrowid
+        else:
+            word_id = row[0]
+            self._conn.execute("UPDATE words SET phonetic = ? WHERE id = ?",
+                               (info.get("phonetic", ""), word_id))
+            for table in LIST_FIELDS.values():
+                self._conn.execute(f"DELETE FROM {table} WHERE word_id = ?", (word_id,))
+        for field, table in LIST_FIELDS.items():
+            values: List[str] = info.get(field, [])
+            self._conn.executemany(
+                f"INSERT INTO {table} (word_id, position, text) VALUES (?, ?, ?)",
+                [(word_id, i, text) for i, text in enumerate(values)],
+            )
+
+    def put(self, word: str, info: Dict[str, Any]) -> None:
+        with self._conn:
+            self._insert(word, info)
+
+    def put_many(self, words: Dict[str, Dict[str, Any]]) -> None:
+        with self._conn:
+            for word, info in words.items():
+                self._insert(word, info)
+
+    def delete(self, word: str) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM words WHERE word = ?", (word,))
+
+    def clear(self) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM words")
+
+    def commit(self, puts, deletes, cleared=False) -> None:
+        """Applies a group of changes in one transaction."""
+        with self._conn:
+            if cleared:
+                self._conn.execute("DELETE FROM words")
+            self._conn.executemany("DELETE FROM words WHERE word = ?", [(word,) for word in deletes])
+            for word, info in puts.items():
+                self._insert(word, info)
+
+    def save_all(self, words: Dict[str, Dict[str, Any]]) -> None:
+        """Makes the database match the given dict in one transaction."""
+        with self._conn:
+            stored = {row[0] for row in self._conn.execute("SELECT word FROM words")}
+            self._conn.executemany("DELETE FROM words WHERE word = ?",
+                                   [(word,) for word in stored - words.keys()])
+            for word, info in words.items():
+                self._insert(word, info)
+
+    def import_json(self, json_path) -> int:
+        """Copies a JSON deck into the database and returns the number of words."""
+        words = json.loads(Path(json_path).read_text())
+        with self._conn:
+            for word, info in words.items():
+                self._insert(word, info)
+        return len(words)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class WriteBehindStore(WordStore):
+    """Defers another store's writes to a background thread.
+
+    put(), delete() and friends only record the change under a lock, so they
+    return in microseconds. A writer thread waits until the changes stop for
+    `delay` seconds (but no longer than `max_delay` after the first one) and
+    hands all of them to the inner store's commit() at once: one rewrite of a
+    JSON deck, one transaction for SQLite. A word changed several times in
+    that window is written once. flush() commits right away, close() flushes
+    first, and stores still open when the interpreter exits are flushed then.
+    A failed commit keeps its changes pending and is retried later. Changes
+    made after close() would never be written, so they raise ValueError.
+    """
+
+    def __init__(self, inner: WordStore, delay: float = COMMIT_DELAY, max_delay: float = MAX_COMMIT_DELAY):
+        super().__init__(inner.path)
+        self.inner = inner
+        self.delay = delay
+        self.max_delay = max_delay
+        self.last_error: Optional[Exception] = None
+        self._cond = threading.Condition()
+        # Held while the inner store is used, so commits never overlap a load or each other
+        self._io_lock = threading.Lock()
+        self._puts: Dict[str, Dict[str, Any]] = {}
+        self._deletes: Set[str] = set()
+        self._cleared = False
+        self._full: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+        self._first_change = self._last_change = 0.0
+        self._retry_at = 0.0
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        _open_stores.add(self)
+
+    def pending(self) -> int:
+        """Number of changes waiting to be committed."""
+        return len(self._puts) + len(self._deletes) + self._cleared + (self._full is not None)
+
+    def _check_open(self) -> None:
+        # Called with _cond held
+        if self._closed:
+            raise ValueError(f"{self.path} is closed")
+
+    def _changed(self) -> None:
+        # Called with _cond held
+        now = time.monotonic()
+        self._last_change = now
+        if not self._dirty:
+            self._dirty = True
+            self._first_change = now
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="store-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def load(self, progress=None):
+        self.flush()
+        with self._io_lock:
+            return self.inner.load(progress)
+
+    def put(self, word: str, info: Dict[str, Any]) -> None:
+        with self._cond:
+            self._check_open()
+            self._deletes.discard(word)
+            self._puts[word] = info
+            self._changed()
+
+    def put_many(self, words: Dict[str, Dict[str, Any]]) -> None:
+        with self._cond:
+            self._check_open()
+            self._deletes.difference_update(words)
+            self._puts.update(words)
+            self._changed()
+
+    def delete(self, word: str) -> None:
+        with self._cond:
+            self._check_open()
+            self._puts.pop(word, None)
+            self._deletes.add(word)
+            self._changed()
+
+    def clear(self) -> None:
+        with self._cond:
+            self._check_open()
+            self._puts.clear()
+            self._deletes.clear()
+            self._cleared = True
+            self._changed()
+
+    def save_all(self, words: Dict[str, Dict[str, Any]]) -> None:
+        # A LazyDeck can be written while it is edited; a plain dict is copied
+        snapshot = words if isinstance(words, LazyDeck) else dict(words)
+        with self._cond:
+            self._check_open()
+            self._puts.clear()
+            self._deletes.clear()
+            self._cleared = False
+            self._full = snapshot
+            self._changed()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return
+                    if not self._dirty:
+                        self._cond.wait()
+                        continue
+                    due = max(min(self._last_change + self.delay, self._first_change + self.max_delay),
+                              self._retry_at)
+                    remaining = due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            try:
+                self._commit()
+            except Exception:
+                # Counted and kept by _commit; try again after the longest delay
+                with self._cond:
+                    self._retry_at = time.monotonic() + self.max_delay
+
+    def _commit(self) -> None:
+        with self._io_lock:
+            with self._cond:
+                if not self._dirty:
+                    return
+                puts, deletes, cleared, full = self._puts, self._deletes, self._cleared, self._full
+                self._puts, self._deletes, self._cleared, self._full = {}, set(), False, None
+                self._dirty = False
+            try:
+                with metrics.time("store_commit_seconds"):
+                    if full is not None:
+                        self.inner.save_all(full)
+                    if puts or deletes or cleared:
+                        self.inner.commit(puts, deletes, cleared)
+            except Exception as e:
+                metrics.count("store_commit_errors")
+                self.last_error = e
+                self._restore(puts, deletes, cleared, full)
+                raise
+            metrics.count("store_commits")
+            metrics.count("store_committed_changes", len(puts) + len(deletes) + cleared + (full is not None))
+            self.last_error = None
+            self._retry_at = 0.0
+
+    def _restore(self, puts, deletes, cleared, full) -> None:
+        """Puts a failed group back in front of the changes recorded since."""
+        with self._cond:
+            if self._full is None and not self._cleared:
+                self._full = full
+                self._cleared = cleared
+                for word, info in puts.items():
+                    if word not in self._deletes:
+                        self._puts.setdefault(word, info)
+                self._deletes.update(word for word in deletes if word not in self._puts)
+            self._changed()
+
+    def flush(self) -> None:
+        """Commits pending changes on the calling thread; raises if the commit fails."""
+        self._commit()
+
+    def export_json(self, path, words=None) -> None:
+        self.flush()
+        with self._io_lock:
+            self.inner.export_json(path, words)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        try:
+            self.flush()
+        finally:
+            _open_stores.discard(self)
+            self.inner.close()
+
+
+_open_stores: "weakref.WeakSet[WriteBehindStore]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_stores() -> None:
+    for store in list(_open_stores):
+        try:
+            store.flush()
+        except Exception as e:
+            print(f"Could not save {store.path}: {e}")
+
+
+def open_store(path, write_behind: bool = True) -> WordStore:
+    """Picks a backend from the file suffix.
+
+    A new SQLite database is seeded once from a JSON file with the same name,
+    e.g. learned_words.db from learned_words.json. Unless write_behind is
+    False, writes go through a WriteBehindStore.
+    """
+    path = Path(path)
+    if path.suffix.lower() not in SQLITE_SUFFIXES:
+        store = JsonWordStore(path)
+    else:
+        legacy = path.with_suffix(".json")
+        migrate = not path.exists() and legacy.exists()
+        store = SqliteWordStore(path)
+        if migrate:
+            store.import_json(legacy)
+    return WriteBehindStore(store) if write_behind else store
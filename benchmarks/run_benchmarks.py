@@ -0,0 +1,307 @@
+"""Benchmarks for parsing, storage, quiz generation and rendering.
+
+Runs without a network or display: dictionary responses come from
+benchmarks/fixtures/api_responses.json and Qt uses the offscreen platform.
+Every benchmark runs once per synthetic deck size and the results are written
+as JSON, so runs on different commits can be compared with --compare.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1000,100000 --compare old.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "api_responses.json"
+DEFAULT_SIZES = (1000, 100000, 1000000)
+# Repeated single-word operations (quiz questions, displayed words) timed per deck size
+SAMPLES = 200
+# Whole-deck operations (load, save, list population) timed per deck size
+ROUNDS = 3
+# Size of the synthetic quiz answer log, per deck word
+ANSWERS_PER_WORD = 5
+
+sys.path.insert(0, str(ROOT))
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+FILLER = ("the", "a", "state", "of", "being", "to", "make", "or", "become", "quality", "act",
+          "something", "that", "is", "with", "without", "in", "manner", "person", "who")
+
+
+def make_word(rng: random.Random, i: int) -> str:
+    # A unique suffix keeps words distinct at any deck size
+    return "".join(rng.choice(LETTERS) for _ in range(rng.randint(4, 9))) + LETTERS[i % 26] + str(i)
+
+
+def make_deck(size: int, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    """A deterministic deck of learned_words records shaped like Word.to_record()."""
+    rng = random.Random(seed)
+    words = [make_word(rng, i) for i in range(size)]
+    deck = {}
+    for word in words:
+        definitions = [" ".join(rng.choice(FILLER) for _ in range(rng.randint(4, 14))).capitalize() + "."
+                       for _ in range(rng.randint(1, 3))]
+        deck[word] = {
+            "definition": definitions,
+            "synonyms": rng.sample(words, min(len(words), rng.randint(0, 4))),
+            "antonyms": rng.sample(words, min(len(words), rng.randint(0, 2))),
+            "phonetic": f"/{word[:4]}/",
+            "examples": [f"An example using {word}."] if rng.random() < 0.6 else [],
+            "audio": [],
+        }
+    return deck
+
+
+def deck_file(workdir: Path, size: int) -> Path:
+    """Writes the deck for a size once; later runs reuse it."""
+    path = workdir / f"deck_{size}.json"
+    if not path.exists():
+        tmp = path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(make_deck(size), f)
+        os.replace(tmp, path)
+    return path
+
+
+def summarize(name: str, size: int, timings: List[float]) -> Dict[str, Any]:
+    ordered = sorted(timings)
+    return {
+        "name": name,
+        "size": size,
+        "ops": len(timings),
+        "total_s": round(sum(timings), 6),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 4),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+    }
+
+
+def timed(operation: Callable[[], Any], count: int, after: Callable[[], Any] = None) -> List[float]:
+    """Times each call of operation; after (e.g. processing paint events) is included."""
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        operation()
+        if after is not None:
+            after()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_parsing(size: int) -> List[Dict[str, Any]]:
+    """Word._parse_response and Word._process_data over size fixture responses."""
+    from Word import Word
+    responses = [entries[0] for entries in json.loads(FIXTURES.read_text(encoding="utf-8")).values()]
+    words = []
+    for i in range(size):
+        word = Word.__new__(Word)
+        word._reset(f"word{i}")
+        words.append(word)
+    parse = []
+    for i, word in enumerate(words):
+        start = time.perf_counter()
+        word._parse_response(responses[i % len(responses)])
+        parse.append(time.perf_counter() - start)
+    process = []
+    for word in words:
+        start = time.perf_counter()
+        word._process_data()
+        process.append(time.perf_counter() - start)
+    return [summarize("Word._parse_response", size, parse),
+            summarize("Word._process_data", size, process)]
+
+
+def bench_answer_log(size: int, workdir: Path) -> List[Dict[str, Any]]:
+    """AnswerLog.append, and AnswerLog.stats over ANSWERS_PER_WORD answers per deck word."""
+    try:
+        import numpy as np
+    except ImportError:
+        print("  numpy is not installed; skipping the answer log", file=sys.stderr)
+        return []
+    from AnswerLog import AnswerLog, COLUMNS, DAY
+    path = workdir / f"deck_{size}.answers"
+    rows = size * ANSWERS_PER_WORD
+    if not (path / "word.bin").exists():
+        # Written column by column; appending millions of rows one by one would take minutes
+        rng = np.random.default_rng(0)
+        words = rng.integers(0, size, rows)
+        times = np.sort(rng.uniform(time.time() - 365 * DAY, time.time(), rows))
+        order = np.argsort(words, kind="stable")
+        gaps = np.full(rows, -1.0)
+        repeat = words[order][1:] == words[order][:-1]
+        gaps[order[1:][repeat]] = np.diff(times[order])[repeat]
+        columns = {"word": words, "time": times, "correct": rng.random(rows) < np.exp(-np.maximum(gaps, 0) / (30 * DAY)),
+                   "seconds": rng.uniform(1, 15, rows), "kind": rng.integers(0, 5, rows), "gap": gaps}
+        path.mkdir(exist_ok=True)
+        (path / "words.txt").write_text("".join(f"word{i}\n" for i in range(size)))
+        for name, code in COLUMNS.items():
+            columns[name].astype(np.dtype(code)).tofile(path / f"{name}.bin")
+    log = AnswerLog(path)
+    results = [summarize("AnswerLog.stats", size, timed(log.stats, ROUNDS))]
+    words = iter(range(SAMPLES))
+    results.append(summarize("AnswerLog.append", size,
+                             timed(lambda: log.append(f"word{next(words)}", True, 2.0, 0), SAMPLES)))
+    log.close()
+    # The appended rows would make the next run's log bigger
+    for name, code in COLUMNS.items():
+        with open(path / f"{name}.bin", "r+b") as f:
+            f.truncate(rows * np.dtype(code).itemsize)
+    return results
+
+
+def bench_window(app, size: int, workdir: Path) -> List[Dict[str, Any]]:
+    from MainWind import MainWind
+    from QuizWindow import QuizWindow
+    from InspectWords import InspectWordsWindow
+
+    results = []
+    path = deck_file(workdir, size)
+    rng = random.Random(1)
+
+    start = time.perf_counter()
+    window = MainWind(app, str(path))
+    window.show()
+    app.processEvents()
+    results.append(summarize("MainWind.__init__", size, [time.perf_counter() - start]))
+
+    results.append(summarize("MainWind.load_words", size, timed(window.load_words, ROUNDS)))
+
+    sample = rng.sample(list(window.learned_words), min(SAMPLES, size))
+    words = iter(sample)
+    results.append(summarize("MainWind.display_word_info", size,
+                             timed(lambda: window.display_word_info(next(words)), len(sample),
+                                   app.processEvents)))
+
+    # Saving a deck whose entries were never decoded is the common case at exit
+    results.append(summarize("MainWind.save_words", size, timed(window.save_words, ROUNDS)))
+
+    # An edit only queues the change; the deck is written by the store's writer thread
+    def put_next(words=iter(sample)):
+        word = next(words)
+        window.store.put(word, window.learned_words[word])
+    results.append(summarize("WordStore.put", size, timed(put_next, len(sample))))
+    results.append(summarize("WordStore.flush", size, timed(window.store.flush, 1)))
+    window.load_words()
+
+    # Compiled up front so the background build does not run during the timings below
+    bank = window.deck.get_question_bank()
+    index, bank.index = bank.index, None
+    results.append(summarize("QuestionBank.build", size, timed(bank.build, 1)))
+    if index is not None:
+        results.append(summarize("DistractorIndex.build", size, timed(lambda: index.build(bank.words), 1)))
+        bank.index = index
+
+        # Re-adding an unchanged word costs what adding a new one does
+        def add_next(words=iter(sample)):
+            word = next(words)
+            index.add(word, window.learned_words[word])
+        results.append(summarize("DistractorIndex.add", size, timed(add_next, len(sample))))
+    quiz = QuizWindow(window.learned_words, window.get_scheduler(), bank)
+    quiz.show()
+    app.processEvents()
+    results.append(summarize("QuizWindow.next_question", size,
+                             timed(quiz.next_question, SAMPLES, app.processEvents)))
+    results.append(summarize("QuizWindow.get_random_words", size,
+                             timed(lambda: quiz.get_random_words(rng.choice(sample)), SAMPLES)))
+    quiz.close()
+
+    inspect = InspectWordsWindow(window.learned_words, window)
+    inspect.show()
+    app.processEvents()
+    results.append(summarize("InspectWordsWindow.populate_word_list", size,
+                             timed(inspect.populate_word_list, ROUNDS, app.processEvents)))
+    inspect.close()
+
+    window.close()
+    window.decks.close_all()
+    app.processEvents()
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> bool:
+    """Prints mean-time ratios against a previous run; returns False on any regression."""
+    baseline = {(r["name"], r["size"]): r for r in json.loads(Path(baseline_path).read_text())["results"]}
+    ok = True
+    for result in results:
+        old = baseline.get((result["name"], result["size"]))
+        if old is None or old["mean_ms"] == 0:
+            continue
+        ratio = result["mean_ms"] / old["mean_ms"]
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"{result['name']:<40}{result['size']:>9}  {old['mean_ms']:>10.3f} -> "
+              f"{result['mean_ms']:>10.3f} ms  x{ratio:.2f}{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated deck sizes (default: %(default)s)")
+    parser.add_argument("--output", help="results file (default: benchmarks/results-<commit>.json)")
+    parser.add_argument("--workdir", help="where decks and caches are written (default: a temp dir)")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file of an earlier run")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="mean-time ratio reported as a regression (default: %(default)s)")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    commit = git_commit()
+    output = Path(args.output or ROOT / "benchmarks" / f"results-{commit}.json").resolve()
+    baseline = Path(args.compare).resolve() if args.compare else None
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="learnwords-bench-")).resolve()
+    workdir.mkdir(parents=True, exist_ok=True)
+    # The response cache, lexicon and review files are created in the working directory
+    os.chdir(workdir)
+
+    from PySide6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+
+    results = []
+    for size in sizes:
+        print(f"deck of {size} words", file=sys.stderr)
+        deck_file(workdir, size)
+        for result in bench_parsing(size) + bench_answer_log(size, workdir) + bench_window(app, size, workdir):
+            print(f"  {result['name']:<40}{result['mean_ms']:>10.3f} ms mean  "
+                  f"{result['p95_ms']:>10.3f} ms p95", file=sys.stderr)
+            results.append(result)
+
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "qt_platform": os.environ["QT_QPA_PLATFORM"],
+        "results": results,
+    }
+    output.write_text(json.dumps(report, indent=1))
+    print(f"Wrote {output}", file=sys.stderr)
+    if baseline is not None and not compare(results, baseline, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,30 @@
+from StartupProfile import profile
 import sys
 import json
 import random
 from pathlib import Path
 from typing import List, Dict
 from PySide6.QtWidgets import (QApplication,QStyleFactory)
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QFont
-from MainWind import MainWind
 from PySide6.QtGui import QIcon,QColor,QPalette
+profile.mark("import Qt")
+from MainWind import MainWind
+profile.mark("import MainWind")
+
+def first_paint():
+    """Runs once the event loop has painted the main window."""
+    profile.mark("first paint")
+    if profile.enabled:
+        print(profile.report(), file=sys.stderr)
+    # Warm the dictionary client (requests, response cache) in the background
+    MainWind.warm_up()
 
 def main():
+    profile.enabled = "--startup-profile" in sys.argv
     app = QApplication(sys.argv)
     icon = QIcon("imgs/ICON.png")
+    profile.mark("QApplication")
     
     
     settings = {}
@@ -34,10 +47,13 @@ def main():
     app.setWindowIcon(icon)
     app.setFont(font)
     app.setStyle(QStyleFactory.create(theme))
+    profile.mark("settings and theme")
 
 
     window = MainWind(app,settings["wordsFile"])
+    profile.mark("MainWind init")
     window.show()
+    QTimer.singleShot(0, first_paint)
     sys.exit(app.exec())
 
 if __name__ == "__main__":
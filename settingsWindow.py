@@ -5,6 +5,7 @@ from PySide6.QtWidgets import (QApplication,QWidget, QMainWindow, QVBoxLayout, Q
                                , QSpinBox, QComboBox, QPushButton,QStyleFactory,QLineEdit,QFileDialog)
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFontDatabase,QFont
+from WordImporter import IMPORT_SUFFIXES
 
 class SettingsWindow(QMainWindow):
     def __init__(self,app :QApplication,mainwind):
@@ -61,6 +62,16 @@ class SettingsWindow(QMainWindow):
         layout.addWidget(self.words_file_edit)
         layout.addWidget(self.words_file_button)
 
+        # Add the words of a word list (.txt, .csv or an Anki export) to the current deck
+        self.import_button = QPushButton("Import Word List")
+        self.import_button.clicked.connect(self.import_words)
+        layout.addWidget(self.import_button)
+
+        # Export the current words as a JSON deck
+        self.export_button = QPushButton("Export as JSON")
+        self.export_button.clicked.connect(self.export_words)
+        layout.addWidget(self.export_button)
+
         # Cancel button
         cancel_button = QPushButton("Cancel")
         cancel_button.clicked.connect(self.close)
@@ -93,13 +104,29 @@ class SettingsWindow(QMainWindow):
             self.app.setFont(QFont(self.settings["font"], self.settings["fontSize"]))
         elif self.sender() == self.words_file_button:
             # open a file dialog to select the words file (json or txt)
-            words_file, _ = QFileDialog.getOpenFileName(self, "Select Words File", "", "JSON and Text Files (*.json *.txt)")
+            words_file, _ = QFileDialog.getOpenFileName(self, "Select Words File", "",
+                                                        "Word Files (*.json *.db *.txt *.csv *.tsv)")
             if words_file:
+                if Path(words_file).suffix.lower() in IMPORT_SUFFIXES:
+                    # A word list becomes a deck of its own, filled in by the importer
+                    words_file = str(self.mainwind.import_as_deck(words_file))
+                else:
+                    # Loads in the background; every open window follows the switch
+                    self.mainwind.switch_deck(words_file)
                 self.settings["wordsFile"] = words_file
                 self.words_file_edit.setText(words_file)
-                self.mainwind.words_file = Path(words_file)
-                self.mainwind.learned_words = self.mainwind.load_words()
             
+    def import_words(self):
+        source, _ = QFileDialog.getOpenFileName(self, "Import Word List", "",
+                                                "Word Lists (*.txt *.csv *.tsv);;All Files (*)")
+        if source:
+            self.mainwind.import_words(source)
+
+    def export_words(self):
+        export_file, _ = QFileDialog.getSaveFileName(self, "Export Words", "", "JSON Files (*.json)")
+        if export_file:
+            self.mainwind.store.export_json(export_file, self.mainwind.learned_words)
+
     def save_settings(self):
         with open("settings.json", "w") as f:
             json.dump(self.settings, f)